@@ -1,12 +1,23 @@
 import os
+import sys
+import json
 import requests
 import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
-from concurrent.futures import ThreadPoolExecutor
-from queue import Queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Shared crawler components live in youtube_analyzer/crawler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler.image_probe import ImageProber
+from crawler.budget import CrawlBudget, BudgetExceeded
+from crawler.sitemap import SiteSeeder
+from crawler.logsink import LogPipeline
+from crawler.metrics import REGISTRY, MetricsExporter, DEFAULT_PORT
+from crawler.urls import link_kind, content_kind, PAGE, IMAGE
+from src.log_view import LogView
 
 
 class ImageScraperApp:
@@ -15,8 +26,9 @@ class ImageScraperApp:
         self.root.title("Advanced Image Scraper")
         self.root.geometry("800x600")
 
-        # Queue for logging
-        self.log_queue = Queue()
+        # Buffered log file writer and sampled GUI feed
+        self.logger = LogPipeline("scraper_log.jsonl")
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
         # Input URLs
         tk.Label(root, text="Enter URLs (one per line):").pack()
@@ -35,6 +47,24 @@ class ImageScraperApp:
         self.size_entry = tk.Entry(root, textvariable=self.size_var, width=10)
         self.size_entry.pack()
 
+        # Small Dimension Filter
+        tk.Label(root, text="Skip images smaller than (in pixels, shortest side):").pack()
+        self.min_side_var = tk.StringVar(value="0")
+        tk.Entry(root, textvariable=self.min_side_var, width=10).pack()
+
+        # Sitemap / robots.txt Seeding
+        self.seed_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(root, text="Seed pages from sitemaps (honours robots.txt disallow and crawl-delay)",
+                       variable=self.seed_var).pack()
+
+        # Crawl Budget (blank = unlimited)
+        tk.Label(root, text="Budget: max pages / image MB / minutes / KB/s (blank = unlimited):").pack()
+        budget_frame = tk.Frame(root)
+        budget_frame.pack()
+        self.budget_vars = [tk.StringVar() for _ in range(4)]
+        for var in self.budget_vars:
+            tk.Entry(budget_frame, textvariable=var, width=8).pack(side=tk.LEFT, padx=2)
+
         # Custom Output Path
         tk.Label(root, text="Output Folder:").pack()
         self.output_path = tk.StringVar(value="Downloaded_Images")
@@ -49,12 +79,17 @@ class ImageScraperApp:
         tk.Label(root, text="Logs:").pack()
         self.log_panel = tk.Text(root, height=15, width=100, state="disabled")
         self.log_panel.pack()
+        self.log_view = LogView(root, self.log_panel, source=self.logger.drain_gui)
+        self.log_view.level_selector(root).pack()
 
         # Buttons
         self.start_button = ttk.Button(root, text="Start Scraping", command=self.start_scraping)
         self.start_button.pack(side=tk.LEFT, padx=10, pady=10)
 
         self.stop_event = threading.Event()
+        self.prober = ImageProber()
+        self.seeder = None
+        self.budget = CrawlBudget()
 
     def select_output_folder(self):
         folder = filedialog.askdirectory()
@@ -62,20 +97,14 @@ class ImageScraperApp:
             self.output_path.set(folder)
 
     def log_message(self, message):
-        """Log messages to the GUI and save to a log file."""
-        self.log_queue.put(message)
-        with open("scraper_log.txt", "a") as log_file:
-            log_file.write(message + "\n")
-
-    def update_logs(self):
-        """Update the log panel with messages from the queue."""
-        while not self.log_queue.empty():
-            message = self.log_queue.get_nowait()
-            self.log_panel.config(state="normal")
-            self.log_panel.insert(tk.END, message + "\n")
-            self.log_panel.config(state="disabled")
-            self.log_panel.see(tk.END)
-        self.root.after(100, self.update_logs)
+        """Log messages; the writer thread saves them and the GUI shows a sample."""
+        self.logger.log(message)
+
+    def _on_close(self):
+        """Write out queued log lines before closing the window."""
+        self.log_view.close()
+        self.logger.close()
+        self.root.destroy()
 
     def clean_url(self, url):
         """Retain only the homepage."""
@@ -83,14 +112,42 @@ class ImageScraperApp:
         return f"{parsed_url.scheme}://{parsed_url.netloc}"
 
     def fetch_html(self, url):
-        """Fetch HTML content of a page."""
+        """Fetch a page, counted against the crawl budget: (content kind, HTML or None)."""
+        host = urlparse(url).netloc
+        if not self.budget.allow_page(url):
+            self.log_message(f"Budget reached ({self.budget.exhausted or 'max pages for ' + host}), not fetched: {url}")
+            return None, None
+        if self.seeder:
+            self.seeder.wait(url)
         try:
-            response = requests.get(url, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
+            with REGISTRY.timer("http_request_seconds", host=host):
+                response = requests.get(url, timeout=10, headers={"User-Agent": "Mozilla/5.0"}, stream=True)
+            REGISTRY.inc("http_requests_total", host=host, status=str(response.status_code))
             response.raise_for_status()
-            return response.content
+            kind = content_kind(response.headers.get("Content-Type"))
+            if kind != PAGE:
+                response.close()  # not HTML: don't download it just to parse it
+                if kind == IMAGE:
+                    return kind, None  # downloaded with the page's images
+                REGISTRY.inc("pages_skipped_total", reason=kind)
+                self.log_message(f"Skipped non-HTML: {url} ({response.headers.get('Content-Type')})")
+                return kind, None
+            content = bytearray()
+            with response:
+                for chunk in response.iter_content(64 * 1024):
+                    self.budget.consume(url, len(chunk))  # bandwidth ceiling and time limit
+                    content.extend(chunk)
+            REGISTRY.inc("pages_fetched_total", host=host)
+            REGISTRY.inc("bytes_downloaded_total", len(content), kind="page")
+            return kind, bytes(content)
+        except BudgetExceeded as e:
+            self.log_message(f"Budget reached ({e}) while fetching {url}")
+            return None, None
         except requests.RequestException as e:
+            if getattr(e, "response", None) is None:
+                REGISTRY.inc("http_requests_total", host=host, status="error")
             self.log_message(f"Failed to access {url}: {e}")
-            return None
+            return None, None
 
     def extract_links_from_menu(self, url, html_content):
         """Extract links from navigation menus."""
@@ -99,50 +156,66 @@ class ImageScraperApp:
         for nav in soup.find_all(["nav", "ul"]):
             for a_tag in nav.find_all("a", href=True):
                 link = urljoin(url, a_tag["href"])
-                if urlparse(link).netloc == urlparse(url).netloc:
+                if urlparse(link).netloc == urlparse(url).netloc and link_kind(link) == PAGE:
                     nav_links.add(link)
         return nav_links
 
     def fetch_images(self, url, html_content, page_name, min_size_kb):
-        """Fetch images from the current page."""
+        """
+        Collect the images on the current page, and links straight to images,
+        as (url, filename) pairs. The size filters are applied while
+        downloading, from each image's header bytes, so every image is
+        requested once.
+        """
         soup = BeautifulSoup(html_content, "html.parser")
-        images = soup.find_all("img")
         image_urls = []
-        for index, img in enumerate(images):
+        for index, img in enumerate(soup.find_all("img")):
             img_src = img.get("src")
             if img_src:
                 img_url = urljoin(url, img_src)
-                try:
-                    response = requests.head(img_url, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
-                    response.raise_for_status()
-                    size = int(response.headers.get("Content-Length", 0)) / 1024  # Size in KB
-                    if size >= min_size_kb:
-                        filename = f"{page_name}_img{index + 1}{os.path.splitext(img_url)[1]}"
-                        image_urls.append((img_url, filename))
-                except requests.RequestException:
-                    continue
+                image_urls.append((img_url, f"{page_name}_img{index + 1}{os.path.splitext(img_url)[1]}"))
+        linked = [urljoin(url, a_tag["href"]) for a_tag in soup.find_all("a", href=True)]
+        for index, img_url in enumerate(link for link in linked if link_kind(link) == IMAGE):
+            image_urls.append((img_url, f"{page_name}_link{index + 1}{os.path.splitext(urlparse(img_url).path)[1]}"))
         return image_urls
 
+    def linked_image(self, url, page_name):
+        """(url, filename) for a page URL that served an image instead of HTML."""
+        name = os.path.basename(urlparse(url).path.rstrip("/")) or "image"
+        return url, f"{page_name}_{name}" + ("" if os.path.splitext(name)[1] else ".jpg")
+
     def download_image(self, img_url, image_name, output_folder):
-        """Download an image."""
+        """
+        Download an image in one request: the prober reads its header first and
+        drops the connection there if it fails the size filters.
+        """
+        if not self.budget.allow_image(img_url):
+            return
         try:
-            response = requests.get(img_url, stream=True, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
-            response.raise_for_status()
             file_path = os.path.join(output_folder, image_name)
-            with open(file_path, "wb") as f:
-                for chunk in response.iter_content(1024):
-                    f.write(chunk)
-            self.log_message(f"Downloaded: {file_path}")
-        except requests.RequestException as e:
+            if self.prober.download(img_url, file_path):
+                REGISTRY.inc("images_saved_total", host=urlparse(img_url).netloc)
+                REGISTRY.inc("bytes_downloaded_total", os.path.getsize(file_path), kind="image")
+                self.log_message(f"Downloaded: {file_path}")
+            else:
+                self.log_message(f"Skipped (below size filter): {img_url}")
+        except BudgetExceeded as e:
+            self.log_message(f"Budget reached ({e}), stopped downloading: {img_url}")
+        except (requests.RequestException, OSError) as e:  # OSError: e.g. a body cut short, kept for resuming
             self.log_message(f"Failed to download {img_url}: {e}")
 
     def scrape_site_structure(self, url, base_folder, max_depth, visited, parent_name, min_size_kb):
         """Recursively scrape the site structure."""
-        if url in visited or max_depth == 0 or self.stop_event.is_set():
+        if url in visited or max_depth == 0 or self.stop_event.is_set() or self.budget.exhausted:
             return []
 
         visited.add(url)
-        html_content = self.fetch_html(url)
+        if self.seeder and not self.seeder.allowed(url):
+            self.log_message(f"Disallowed by robots.txt: {url}")
+            return []
+        kind, html_content = self.fetch_html(url)
+        if kind == IMAGE:
+            return [self.linked_image(url, parent_name)]
         if not html_content:
             return []
 
@@ -158,45 +231,117 @@ class ImageScraperApp:
 
         return all_images
 
+    def scrape_page_list(self, pages, min_size_kb):
+        """Scrape a known list of pages (from sitemaps) in order, without following links."""
+        all_images = []
+        for url in pages:
+            if self.stop_event.is_set() or self.budget.exhausted:
+                break
+            kind, html_content = self.fetch_html(url)
+            if kind == IMAGE:
+                all_images.append(self.linked_image(url, "home"))
+            if not html_content:
+                continue
+            page_name = urlparse(url).path.strip("/").replace("/", "-") or "home"
+            all_images.extend(self.fetch_images(url, html_content, page_name, min_size_kb))
+        return all_images
+
     def scrape_entire_site(self, urls, crawl_depth, min_size_kb):
         output_folder = self.output_path.get()
         if not os.path.exists(output_folder):
             os.makedirs(output_folder)
+        REGISTRY.reset()
+        exporter = MetricsExporter(REGISTRY, os.path.join(output_folder, "metrics.json"), port=DEFAULT_PORT,
+                                   log=self.log_message).start()
 
-        all_images = []
-        for url in urls:
-            clean_home = self.clean_url(url)
-            site_folder = os.path.join(output_folder, urlparse(clean_home).netloc.replace(".", "_"))
-            os.makedirs(site_folder, exist_ok=True)
-            all_images.extend(self.scrape_site_structure(clean_home, site_folder, crawl_depth, set(), "home", min_size_kb))
-
-        total_images = len(all_images)
-        self.progress_bar["maximum"] = total_images
-        self.progress_bar["value"] = 0
-
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            for img_url, image_name in all_images:
-                if self.stop_event.is_set():
-                    break
-                executor.submit(self.download_image, img_url, image_name, site_folder)
-                self.progress_bar["value"] += 1
-                self.root.update_idletasks()
-
-        messagebox.showinfo("Success", "Image scraping completed!")
+        try:
+            all_images = []
+            for url in urls:
+                clean_home = self.clean_url(url)
+                site_folder = os.path.join(output_folder, urlparse(clean_home).netloc.replace(".", "_"))
+                os.makedirs(site_folder, exist_ok=True)
+                pages = self.seeder.seed(clean_home) if self.seeder else []
+                if pages:
+                    all_images.extend(self.scrape_page_list(pages, min_size_kb))
+                else:
+                    all_images.extend(self.scrape_site_structure(clean_home, site_folder, crawl_depth, set(), "home",
+                                                                 min_size_kb))
+
+            self.set_progress(0, len(all_images))
+
+            with ThreadPoolExecutor(max_workers=10) as executor:
+                futures = []
+                for img_url, image_name in all_images:
+                    if self.stop_event.is_set() or self.budget.exhausted:
+                        break
+                    futures.append(executor.submit(self.download_image, img_url, image_name, site_folder))
+                # Advance the bar as downloads finish, not as they are queued
+                for done, _ in enumerate(as_completed(futures), 1):
+                    self.set_progress(done)
+                    REGISTRY.set_gauge("downloads_pending", len(futures) - done)
+
+            report = self.write_report(output_folder)
+        finally:
+            exporter.stop()
+        if report["partial"]:
+            self.root.after(0, messagebox.showinfo, "Stopped", f"Budget exhausted ({report['budget']['exhausted']}); "
+                                                               f"partial results saved in {output_folder}.")
+        else:
+            self.root.after(0, messagebox.showinfo, "Success", "Image scraping completed!")
+
+    def set_progress(self, value, maximum=None):
+        """Move the progress bar from the scraping thread, through the Tk loop."""
+        def apply():
+            if maximum is not None:
+                self.progress_bar["maximum"] = maximum
+            self.progress_bar["value"] = value
+        self.root.after(0, apply)
+
+    def write_report(self, output_folder):
+        """Save crawl_report.json (budget usage, partial or not) in the output folder and return it."""
+        budget = self.budget.report()
+        report = {
+            "partial": bool(budget["exhausted"] or budget["hosts_over_budget"] or self.stop_event.is_set()),
+            "budget": budget,
+        }
+        with open(os.path.join(output_folder, "crawl_report.json"), "w") as report_file:
+            json.dump(report, report_file, indent=2)
+        self.log_message(f"Crawl report: {budget['pages']} page(s), "
+                         f"{budget['image_bytes'] / (1024 * 1024):.1f} MB of images in {budget['seconds']}s.")
+        return report
+
+    def read_budget(self):
+        """CrawlBudget from the budget fields; raises ValueError on anything but numbers."""
+        pages, megabytes, minutes, kbps = (float(var.get()) if var.get().strip() else None
+                                           for var in self.budget_vars)
+        return CrawlBudget(
+            max_pages=int(pages) if pages is not None else None,
+            max_image_bytes=megabytes * 1024 * 1024 if megabytes is not None else None,
+            max_seconds=minutes * 60 if minutes is not None else None,
+            bytes_per_second=kbps * 1024 if kbps is not None else None,
+        )
 
     def start_scraping(self):
         urls = self.url_input.get("1.0", tk.END).strip().split("\n")
         urls = [self.clean_url(url.strip()) for url in urls if url.strip()]
         crawl_depth = int(self.depth_var.get())
         min_size_kb = int(self.size_var.get())
+        self.prober.min_kb = min_size_kb
+        self.prober.min_side = int(self.min_side_var.get() or 0)
 
         if not urls:
             messagebox.showerror("Error", "Please enter at least one URL.")
             return
+        try:
+            self.budget = self.read_budget()
+        except ValueError:
+            messagebox.showerror("Error", "Budget fields must be numbers (or blank for unlimited).")
+            return
+        self.prober.budget = self.budget
 
         self.stop_event.clear()
+        self.seeder = SiteSeeder(user_agent="Mozilla/5.0", log=self.log_message) if self.seed_var.get() else None
         threading.Thread(target=self.scrape_entire_site, args=(urls, crawl_depth, min_size_kb)).start()
-        self.update_logs()
 
 
 if __name__ == "__main__":
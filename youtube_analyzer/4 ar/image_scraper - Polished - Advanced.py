@@ -8,14 +8,23 @@ from urllib.parse import urljoin, urlparse
 from queue import Queue
 import random
 import csv
+import sys
 from PIL import Image, ImageTk
 import time
 
+# Shared crawler components live in youtube_analyzer/crawler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler.download import Downloader
+from crawler.linkfilter import LinkFilter
+from crawler.urls import link_kind, content_kind, PAGE, IMAGE
+
 class ImageScraperApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Advanced Image Scraper")
         self.root.geometry("900x700")
+        self.downloader = Downloader(timeout=10, log=self.log_message)
+        self.link_filter = LinkFilter(scope="host")
 
         # Queue for tasks and logs
         self.task_queue = Queue()
@@ -45,12 +54,12 @@ class ImageScraperApp:
         tk.Button(root, text="Browse", command=self.select_output_folder).pack()
 
         # Exclude Patterns
-        tk.Label(root, text="Exclude URLs containing (comma-separated):").pack()
+        tk.Label(root, text="Exclude URLs matching (comma-separated text, *glob, re:regex, domain:host, depth<=N):").pack()
         self.exclude_patterns = tk.StringVar(value="")
         tk.Entry(root, textvariable=self.exclude_patterns, width=50).pack()
 
         # Include Patterns
-        tk.Label(root, text="Include URLs containing (comma-separated):").pack()
+        tk.Label(root, text="Include URLs matching (comma-separated, same syntax):").pack()
         self.include_patterns = tk.StringVar(value="")
         tk.Entry(root, textvariable=self.include_patterns, width=50).pack()
 
@@ -103,9 +112,19 @@ class ImageScraperApp:
             return False
 
     def fetch_html(self, url):
+        """The page's HTML, or None. Non-HTML responses are dropped after the headers; images are downloaded."""
         try:
-            response = requests.get(url, timeout=10, headers={"User-Agent": random.choice(self.get_user_agents())})
+            response = requests.get(url, timeout=10, headers={"User-Agent": random.choice(self.get_user_agents())},
+                                    stream=True)
             response.raise_for_status()
+            kind = content_kind(response.headers.get("Content-Type"))
+            if kind != PAGE:
+                response.close()
+                if kind == IMAGE:
+                    self.download_image(url)
+                else:
+                    self.log_message(f"Skipped non-HTML: {url} ({response.headers.get('Content-Type')})")
+                return None
             return response.content
         except requests.RequestException:
             self.log_message(f"Failed to fetch: {url}")
@@ -121,9 +140,7 @@ class ImageScraperApp:
         return links
 
     def is_valid_link(self, link, base_url):
-        parsed_link = urlparse(link)
-        parsed_base = urlparse(base_url)
-        return parsed_link.netloc == parsed_base.netloc
+        return self.link_filter(link, base_url)
 
     def fetch_images(self, url, html_content):
         soup = BeautifulSoup(html_content, "html.parser")
@@ -145,19 +162,19 @@ class ImageScraperApp:
             for img in images:
                 self.download_image(img)
             for link in links:
-                self.task_queue.put((link, depth - 1))
+                kind = link_kind(link)
+                if kind == IMAGE:
+                    self.download_image(link)
+                elif kind == PAGE:
+                    self.task_queue.put((link, depth - 1))
 
     def download_image(self, url):
         try:
-            response = requests.get(url, stream=True, timeout=10, headers={"User-Agent": random.choice(self.get_user_agents())})
-            response.raise_for_status()
             filename = os.path.basename(urlparse(url).path)
             output_folder = self.output_path.get()
             os.makedirs(output_folder, exist_ok=True)
             filepath = os.path.join(output_folder, filename)
-            with open(filepath, "wb") as f:
-                for chunk in response.iter_content(1024):
-                    f.write(chunk)
+            self.downloader.fetch(url, filepath, headers={"User-Agent": random.choice(self.get_user_agents())})
             self.log_message(f"Downloaded: {filepath}")
         except requests.RequestException:
             self.log_message(f"Failed to download: {url}")
@@ -168,6 +185,13 @@ class ImageScraperApp:
         if not urls:
             messagebox.showerror("Error", "No URLs provided")
             return
+        # Compiled once here so the workers never read the Tk variables
+        try:
+            self.link_filter = LinkFilter(self.include_patterns.get().split(","),
+                                          self.exclude_patterns.get().split(","), scope="host")
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
         for url in urls:
             if self.validate_url(url):
                 self.task_queue.put((url, int(self.depth_var.get())))
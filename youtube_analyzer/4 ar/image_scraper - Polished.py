@@ -1,9 +1,17 @@
 import os
+import sys
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 from concurrent.futures import ThreadPoolExecutor
 
+# Shared crawler components live in youtube_analyzer/crawler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler.download import Downloader
+from crawler.urls import link_kind, content_kind, PAGE, IMAGE
+
+downloader = Downloader(timeout=10)
+
 
 def create_output_folder():
     folder = "Downloaded_Images"
@@ -13,14 +21,20 @@ def create_output_folder():
 
 
 def fetch_html(url):
-    """Fetch the HTML content of a page."""
+    """Fetch a page: (content kind, HTML or None). Images come back as IMAGE so they can be downloaded."""
     try:
-        response = requests.get(url, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
+        response = requests.get(url, timeout=10, headers={"User-Agent": "Mozilla/5.0"}, stream=True)
         response.raise_for_status()
-        return response.content
+        kind = content_kind(response.headers.get("Content-Type"))
+        if kind != PAGE:
+            response.close()  # not HTML: don't download it just to parse it
+            if kind != IMAGE:
+                print(f"Skipped non-HTML: {url} ({response.headers.get('Content-Type')})")
+            return kind, None
+        return kind, response.content
     except requests.RequestException as e:
         print(f"Failed to access {url}: {e}")
-        return None
+        return None, None
 
 
 def extract_links_from_menu(url, html_content):
@@ -32,14 +46,15 @@ def extract_links_from_menu(url, html_content):
     for nav in soup.find_all(["nav", "ul"]):
         for a_tag in nav.find_all("a", href=True):
             link = urljoin(url, a_tag["href"])
-            if urlparse(link).netloc == urlparse(url).netloc:  # Internal links only
+            # Internal pages only; images, documents and media aren't pages to crawl
+            if urlparse(link).netloc == urlparse(url).netloc and link_kind(link) == PAGE:
                 nav_links.add(link)
 
     return nav_links
 
 
 def fetch_images(url, html_content, page_name):
-    """Fetch images from the current page and name them after the page."""
+    """Fetch images from the current page, including links straight to images, and name them after the page."""
     soup = BeautifulSoup(html_content, "html.parser")
     images = soup.find_all("img")
     image_urls = []
@@ -51,19 +66,24 @@ def fetch_images(url, html_content, page_name):
             image_name = f"{page_name}_img{index + 1}.jpg"  # Naming format
             image_urls.append((img_url, image_name))
 
+    linked = [urljoin(url, a_tag["href"]) for a_tag in soup.find_all("a", href=True)]
+    for index, img_url in enumerate(link for link in linked if link_kind(link) == IMAGE):
+        image_urls.append((img_url, f"{page_name}_link{index + 1}{os.path.splitext(urlparse(img_url).path)[1]}"))
+
     return image_urls
 
 
+def linked_image(url, page_name):
+    """(url, image name) for a link that served an image instead of HTML."""
+    name = os.path.basename(urlparse(url).path.rstrip("/")) or "image"
+    return url, f"{page_name}_{name}" + ("" if os.path.splitext(name)[1] else ".jpg")
+
+
 def download_image(img_url, image_name, output_folder):
     """Download a single image with a specific name."""
     try:
-        response = requests.get(img_url, stream=True, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
-        response.raise_for_status()
         file_path = os.path.join(output_folder, image_name)
-
-        with open(file_path, "wb") as f:
-            for chunk in response.iter_content(1024):
-                f.write(chunk)
+        downloader.fetch(img_url, file_path, headers={"User-Agent": "Mozilla/5.0"})
         print(f"Downloaded: {file_path}")
     except requests.RequestException as e:
         print(f"Failed to download {img_url}: {e}")
@@ -78,7 +98,9 @@ def scrape_site_structure(url, base_folder, max_depth=2, visited=None, parent_na
         return []
 
     visited.add(url)
-    html_content = fetch_html(url)
+    kind, html_content = fetch_html(url)
+    if kind == IMAGE:
+        return [linked_image(url, parent_name)]
     if not html_content:
         return []
 
@@ -1,9 +1,16 @@
 import os
+import sys
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 from concurrent.futures import ThreadPoolExecutor
 
+# Shared crawler components live in youtube_analyzer/crawler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler.download import Downloader
+
+downloader = Downloader(timeout=10)
+
 
 def create_output_folder():
     folder = "Downloaded_Images"
@@ -39,16 +46,12 @@ def fetch_images_from_url(url, output_folder):
 
 def download_image(img_url, save_folder):
     try:
-        response = requests.get(img_url, stream=True, timeout=10)
-        response.raise_for_status()
         filename = os.path.basename(urlparse(img_url).path)
         if not filename:
             filename = "image_" + os.path.basename(img_url)
         file_path = os.path.join(save_folder, filename)
 
-        with open(file_path, "wb") as f:
-            for chunk in response.iter_content(1024):
-                f.write(chunk)
+        downloader.fetch(img_url, file_path)
         print(f"Downloaded: {file_path}")
     except requests.RequestException as e:
         print(f"Failed to download {img_url}: {e}")
@@ -7,7 +7,6 @@ import json
 import time
 import logging
 import threading
-from datetime import datetime
 import re
 
 # Data handling
@@ -23,6 +22,12 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selector_registry_module import SelectorRegistry
+
+# Shared components live one level up in youtube_analyzer/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.log_view import LogView
+from crawler.budget import CrawlBudget, BudgetExceeded
 
 
 class YouTubeAnalyzerDemo:
@@ -35,6 +40,9 @@ class YouTubeAnalyzerDemo:
         # Internal state
         self.is_running = False
         self.driver = None
+        self.selectors = SelectorRegistry("selector_stats.json")
+        # Page loads, thumbnail bytes and time for one run (set from the budget fields)
+        self.budget = CrawlBudget()
 
         # Setup logging
         self.setup_logging()
@@ -116,12 +124,24 @@ class YouTubeAnalyzerDemo:
         self.progress_bar = ttk.Progressbar(main_frame, variable=self.progress_var, maximum=100, length=300)
         self.progress_bar.grid(row=7, column=2, columnspan=3, sticky=tk.W, padx=5, pady=5)
 
+        # --- Row 8: Run budget, blank = unlimited ---
+        ttk.Label(main_frame, text="Budget (pages / MB / min / KB/s):").grid(row=8, column=0, sticky=tk.W, padx=5, pady=5)
+        budget_frame = ttk.Frame(main_frame)
+        budget_frame.grid(row=8, column=1, columnspan=3, sticky=tk.W, pady=5)
+        self.budget_entries = []
+        for _ in range(4):
+            entry = ttk.Entry(budget_frame, width=8)
+            entry.pack(side=tk.LEFT, padx=(0, 4))
+            self.budget_entries.append(entry)
+
         # --- Row 9: Log Text ---
         self.log_text = tk.Text(main_frame, height=15, wrap=tk.WORD)
         self.log_text.grid(row=9, column=0, columnspan=5, sticky="nsew", padx=5, pady=5)
         scroll_y = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=self.log_text.yview)
         scroll_y.grid(row=9, column=5, sticky=(tk.N, tk.S))
         self.log_text.configure(yscrollcommand=scroll_y.set)
+        # Bounded and batched: log() runs on the analysis thread and only queues lines
+        self.log_view = LogView(self.root, self.log_text, timestamps=True)
 
     def select_output_dir(self):
         """Prompt user for output directory."""
@@ -186,6 +206,12 @@ class YouTubeAnalyzerDemo:
             messagebox.showerror("Error", "Please enter positive integers for channels/videos counts.")
             return
 
+        try:
+            self.budget = self.read_budget()
+        except ValueError:
+            messagebox.showerror("Error", "Budget fields must be numbers (or blank for unlimited).")
+            return
+
         # Check & install dependencies if checkbox is selected
         if self.deps_check_var.get():
             if not self.check_and_install_dependencies():
@@ -195,7 +221,7 @@ class YouTubeAnalyzerDemo:
         self.start_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
         self.progress_var.set(0)
-        self.log_text.delete("1.0", tk.END)
+        self.log_view.clear()
 
         threading.Thread(target=self.run_analysis, daemon=True).start()
 
@@ -204,8 +230,30 @@ class YouTubeAnalyzerDemo:
         self.is_running = False
         self.log("Stop requested by user...")
 
+    def read_budget(self):
+        """CrawlBudget from the budget fields (pages, thumbnail MB, minutes, KB/s); raises ValueError."""
+        pages, megabytes, minutes, kbps = (float(e.get()) if e.get().strip() else None for e in self.budget_entries)
+        return CrawlBudget(
+            max_pages=int(pages) if pages is not None else None,
+            max_image_bytes=megabytes * 1024 * 1024 if megabytes is not None else None,
+            max_seconds=minutes * 60 if minutes is not None else None,
+            bytes_per_second=kbps * 1024 if kbps is not None else None,
+        )
+
+    def charge_page(self, url):
+        """Count a page load against the budget; BudgetExceeded once it is used up."""
+        if not self.budget.allow_page(url):
+            raise BudgetExceeded(self.budget.exhausted or "host page budget")
+
+    def open_page(self, url):
+        """driver.get(url), counted against the run's page budget."""
+        self.charge_page(url)
+        self.driver.get(url)
+
     def run_analysis(self):
         """Main scraping logic."""
+        analysis_dir = None
+        all_channel_data = []
         try:
             if not self.setup_browser():
                 self.log("Failed to launch browser driver. Stopping.")
@@ -225,11 +273,13 @@ class YouTubeAnalyzerDemo:
             channels_data = self.search_channels_demo(keyword, max_channels)
 
             total_channels = len(channels_data)
-            all_channel_data = []
 
             for idx, channel_info in enumerate(channels_data, start=1):
                 if not self.is_running:
                     break
+                if self.budget.exhausted:
+                    self.log(f"Budget exhausted ({self.budget.exhausted}): stopping analysis.", level="warning")
+                    break
                 self.update_progress((idx / total_channels) * 100)
 
                 channel_name = channel_info.get("channel_name", "UnknownChannel")
@@ -267,15 +317,34 @@ class YouTubeAnalyzerDemo:
                 self.log("No channel data to save.")
                 messagebox.showinfo("No Data", "No valid channels were found or analyzed.")
 
+        except BudgetExceeded as e:
+            self.log(f"Budget exhausted ({e}) before any channel was analyzed.", level="warning")
         except Exception as e:
             self.log(f"Analysis failed: {e}", level="error")
             messagebox.showerror("Error", f"Analysis failed:\n{str(e)}")
         finally:
+            if analysis_dir:
+                self.write_report(analysis_dir, len(all_channel_data))
             self.cleanup_browser()
+            self.selectors.save()
             self.is_running = False
             self.start_button.config(state=tk.NORMAL)
             self.stop_button.config(state=tk.DISABLED)
-            self.progress_var.set(0)
+            self.update_progress(0)  # queued after the last progress update, so it isn't overwritten
+
+    def write_report(self, base_dir, channels):
+        """Save analysis_report.json: budget usage and whether the run stopped early (partial)."""
+        usage = self.budget.report()
+        report = {
+            "partial": bool(usage["exhausted"] or usage["hosts_over_budget"] or not self.is_running),
+            "channels": channels,
+            "budget": usage,
+        }
+        try:
+            with open(os.path.join(base_dir, "analysis_report.json"), "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        except Exception as e:
+            self.log(f"Failed to save analysis_report.json: {e}", level="error")
 
     def setup_browser(self):
         """Initialize undetected Chrome driver."""
@@ -300,7 +369,7 @@ class YouTubeAnalyzerDemo:
     def search_channels_demo(self, keyword, max_channels):
         """Search YouTube by keyword, gather up to max_channels from ytd-channel-renderer (demo)."""
         search_url = f"https://www.youtube.com/results?search_query={keyword}"
-        self.driver.get(search_url)
+        self.open_page(search_url)
         time.sleep(2)
 
         found_channels = []
@@ -352,22 +421,22 @@ class YouTubeAnalyzerDemo:
         }
         try:
             about_url = channel_url.rstrip('/') + "/about"
-            self.driver.get(about_url)
+            self.open_page(about_url)
             time.sleep(2)
 
             # For demonstration, we try #subscriber-count
             # If that fails, we do Q-menu fallback
-            sub_elem = self.safe_find_element("css", "#subscriber-count", qprompt_name="Subscriber Count", wait_secs=3)
+            sub_elem = self.safe_find_element("css", "#subscriber-count", qprompt_name="Subscriber Count", wait_secs=3, field="subscriber_count")
             if sub_elem:
                 stats["subscribers"] = sub_elem.text.strip()
 
             # total_videos might be in #videos-count or in some other new snippet
-            vid_elem = self.safe_find_element("css", "#videos-count", qprompt_name="Channel videos count", wait_secs=2)
+            vid_elem = self.safe_find_element("css", "#videos-count", qprompt_name="Channel videos count", wait_secs=2, field="videos_count")
             if vid_elem:
                 stats["total_videos"] = vid_elem.text.strip()
 
             # Possibly the channel description is found in #description
-            desc_elem = self.safe_find_element("css", "#description", qprompt_name="Channel Description", wait_secs=2)
+            desc_elem = self.safe_find_element("css", "#description", qprompt_name="Channel Description", wait_secs=2, field="channel_description")
             if desc_elem:
                 stats["description"] = desc_elem.text.strip()
 
@@ -381,14 +450,14 @@ class YouTubeAnalyzerDemo:
         videos_data = []
         try:
             videos_url = channel_url.rstrip('/') + "/videos"
-            self.driver.get(videos_url)
+            self.open_page(videos_url)
             time.sleep(2)
 
             # Attempt to click "Popular" tab
             try:
                 popular_tab = self.safe_find_element(
                     "xpath", '//yt-formatted-string[@title="Popular"]',
-                    qprompt_name="Popular Tab", wait_secs=3
+                    qprompt_name="Popular Tab", wait_secs=3, field="popular_tab"
                 )
                 if popular_tab:
                     popular_tab.click()
@@ -398,15 +467,17 @@ class YouTubeAnalyzerDemo:
 
             # Gather up to max_videos
             scroll_attempts = 0
-            while len(videos_data) < max_videos and scroll_attempts < 8 and self.is_running:
+            while (len(videos_data) < max_videos and scroll_attempts < 8 and self.is_running
+                   and not self.budget.exhausted):
                 grid_items = self.driver.find_elements(By.CSS_SELECTOR, "ytd-grid-video-renderer")
                 for gi in grid_items:
-                    if len(videos_data) >= max_videos:
+                    if len(videos_data) >= max_videos or self.budget.exhausted:
                         break
                     try:
                         vid_title_elem = gi.find_element(By.CSS_SELECTOR, "a#video-title")
                         vid_title = vid_title_elem.text.strip()
                         vid_url = vid_title_elem.get_attribute("href")
+                        self.charge_page(vid_url)
 
                         data_dict = self.scrape_video_details(vid_url, vid_title)
                         videos_data.append(data_dict)
@@ -448,7 +519,8 @@ class YouTubeAnalyzerDemo:
                 "css",
                 "span.yt-core-attributed-string.yt-core-attributed-string--white-space-pre-wrap",
                 qprompt_name="Video Channel Span",
-                wait_secs=3
+                wait_secs=3,
+                field="video_channel"
             )
             if chan_elem:
                 result["channel"] = chan_elem.text.strip()
@@ -459,7 +531,8 @@ class YouTubeAnalyzerDemo:
                 "css",
                 "yt-formatted-string.style-scope.ytd-watch-metadata",
                 qprompt_name="Video Title",
-                wait_secs=3
+                wait_secs=3,
+                field="video_title"
             )
             if title_elem:
                 result["title"] = title_elem.text.strip()
@@ -473,7 +546,8 @@ class YouTubeAnalyzerDemo:
                 "css",
                 "yt-formatted-string#info.style-scope.ytd-watch-info-text",
                 qprompt_name="Views/Date info",
-                wait_secs=3
+                wait_secs=3,
+                field="video_info"
             )
             if info_elem:
                 text_info = info_elem.text.strip()  # e.g. "19K views  1 day ago  #asknk #something"
@@ -495,7 +569,8 @@ class YouTubeAnalyzerDemo:
                 "css",
                 'button[aria-label^="like this video along"] div.yt-spec-button-shape-next__button-text-content',
                 qprompt_name="Likes Button Div",
-                wait_secs=3
+                wait_secs=3,
+                field="video_likes"
             )
             if like_btn:
                 result["likes"] = like_btn.text.strip()
@@ -516,48 +591,42 @@ class YouTubeAnalyzerDemo:
 
         return result
 
-    def safe_find_element(self, by_method, selector, qprompt_name="Element", wait_secs=5):
+    def safe_find_element(self, by_method, selector, qprompt_name="Element", wait_secs=5, field=None):
         """
-        Attempt a find_element with the given by_method & selector.
-        If fails and Q-menu is enabled, prompt user for a new selector, then retry.
+        Find an element for a logical field through the selector registry.
+        The given selector is added as a candidate; known candidates are tried
+        in order of recent success and dead ones are skipped without waiting.
+        If nothing matches and Q-menu is enabled, prompt user for a new
+        selector, which is remembered for later videos and runs.
         """
-        try:
-            if by_method == "css":
-                elem = WebDriverWait(self.driver, wait_secs).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                )
-            elif by_method == "xpath":
-                elem = WebDriverWait(self.driver, wait_secs).until(
-                    EC.presence_of_element_located((By.XPATH, selector))
-                )
-            else:
-                raise ValueError("Unsupported by_method")
-            return elem
-        except:
-            self.log(f"Could not find {qprompt_name} with {by_method}='{selector}'", "debug")
-            if self.qmenu_var.get():
-                # Q-menu: ask user for a new selector
-                new_selector = simpledialog.askstring(
-                    "Q-Menu: Missing Element",
-                    f"Failed to find {qprompt_name}.\n\nEnter a new {by_method.upper()} selector or 'skip':",
-                    parent=self.root
-                )
-                if new_selector and new_selector.lower() != "skip":
-                    try:
-                        if by_method == "css":
-                            elem = WebDriverWait(self.driver, wait_secs).until(
-                                EC.presence_of_element_located((By.CSS_SELECTOR, new_selector))
-                            )
-                        else:
-                            elem = WebDriverWait(self.driver, wait_secs).until(
-                                EC.presence_of_element_located((By.XPATH, new_selector))
-                            )
-                        return elem
-                    except:
-                        self.log(f"Q-menu: Still cannot find {qprompt_name}. Skipping...", "debug")
-                        return None
+        field = field or qprompt_name
+        self.selectors.register(field, by_method, selector)
+        if self.selectors.is_dead(field):
+            self.log(f"Skipping {qprompt_name}: all known selectors are dead this session", "debug")
             return None
 
+        elem = self.selectors.find(self.driver, field, wait_secs)
+        if elem is not None:
+            return elem
+
+        self.log(f"Could not find {qprompt_name} with {by_method}='{selector}'", "debug")
+        if self.qmenu_var.get() and not self.selectors.is_muted(field):
+            # Q-menu: ask user for a new selector
+            new_selector = simpledialog.askstring(
+                "Q-Menu: Missing Element",
+                f"Failed to find {qprompt_name}.\n\nEnter a new {by_method.upper()} selector or 'skip':",
+                parent=self.root
+            )
+            if new_selector and new_selector.lower() != "skip":
+                key = self.selectors.register(field, by_method, new_selector, version="qmenu")
+                elem = self.selectors.find(self.driver, field, wait_secs, only_key=key)
+                if elem is None:
+                    self.log(f"Q-menu: Still cannot find {qprompt_name}. Skipping...", "debug")
+                return elem
+            # Don't ask again for this field during this session
+            self.selectors.mute(field)
+        return None
+
     def save_channel_data(self, base_dir, channel_data):
         """
         Save data for a single channel:
@@ -629,14 +698,21 @@ class YouTubeAnalyzerDemo:
 
     def download_thumbnail(self, url, path):
         """Download thumbnail from url to path. Return path if OK, else None."""
-        if not url:
+        if not url or not self.budget.allow_image(url):
             return None
         try:
-            r = requests.get(url, timeout=10)
-            if r.status_code == 200:
-                with open(path, "wb") as f:
-                    f.write(r.content)
-                return path
+            with requests.get(url, timeout=10, stream=True) as r:
+                if r.status_code == 200:
+                    # Streamed so the image byte and bandwidth budgets apply chunk by chunk
+                    content = bytearray()
+                    for chunk in r.iter_content(64 * 1024):
+                        self.budget.consume(url, len(chunk), image=True)
+                        content.extend(chunk)
+                    with open(path, "wb") as f:
+                        f.write(content)
+                    return path
+        except BudgetExceeded as e:
+            self.log(f"Budget reached ({e}), thumbnail not downloaded: {url}", level="warning")
         except Exception as e:
             self.log(f"Thumbnail download error: {e}", level="debug")
         return None
@@ -684,18 +760,14 @@ class YouTubeAnalyzerDemo:
             self.log(f"Error creating analysis_summary.xlsx: {e}", level="error")
 
     def update_progress(self, value):
-        """Update progress bar safely."""
-        self.progress_var.set(value)
-        self.root.update_idletasks()
+        """Update progress bar safely: called from the analysis thread, applied on the Tk loop."""
+        self.root.after(0, self.progress_var.set, value)
 
     def log(self, message, level="info"):
         """
-        Log to console/file and add to the text widget.
+        Log to console/file and queue the line for the text widget.
         levels: "info", "debug", "error", etc.
         """
-        timestamp = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
-        full_message = f"{timestamp} {message}\n"
-
         if level == "debug":
             self.logger.debug(message)
         elif level == "warning":
@@ -705,8 +777,7 @@ class YouTubeAnalyzerDemo:
         else:
             self.logger.info(message)
 
-        self.log_text.insert(tk.END, full_message)
-        self.log_text.see(tk.END)
+        self.log_view.push(message, level.upper())
 
     def on_closing(self):
         """Confirm quit if analysis is running."""
@@ -716,6 +787,7 @@ class YouTubeAnalyzerDemo:
             self.is_running = False
 
         self.cleanup_browser()
+        self.log_view.close()
         self.root.destroy()
 
     def run(self):
@@ -7,7 +7,6 @@ import json
 import time
 import logging
 import threading
-from datetime import datetime
 import re
 
 # Data handling
@@ -23,10 +22,18 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selector_registry_module import SelectorRegistry
 
-# OCR and image processing
-import pytesseract
-from PIL import Image
+# Shared components live one level up in youtube_analyzer/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.log_view import LogView
+from crawler.budget import CrawlBudget, BudgetExceeded
+
+# OCR and image processing (runs in a worker process pool)
+from ocr_module import OCRWorkerPool
+
+# Watch-page JSON extraction
+from watch_page_module import extract_watch_page
 
 class YouTubeAnalyzerDemo:
     def __init__(self):
@@ -38,6 +45,10 @@ class YouTubeAnalyzerDemo:
         # Internal state
         self.is_running = False
         self.driver = None
+        self.selectors = SelectorRegistry("selector_stats.json")
+        # Page loads, thumbnail bytes and time for one run (set from the budget fields)
+        self.budget = CrawlBudget()
+        self.ocr_pool = OCRWorkerPool()
 
         # Setup logging
         self.setup_logging()
@@ -119,12 +130,24 @@ class YouTubeAnalyzerDemo:
         self.progress_bar = ttk.Progressbar(main_frame, variable=self.progress_var, maximum=100, length=300)
         self.progress_bar.grid(row=7, column=2, columnspan=3, sticky=tk.W, padx=5, pady=5)
 
+        # --- Row 8: Run budget, blank = unlimited ---
+        ttk.Label(main_frame, text="Budget (pages / MB / min / KB/s):").grid(row=8, column=0, sticky=tk.W, padx=5, pady=5)
+        budget_frame = ttk.Frame(main_frame)
+        budget_frame.grid(row=8, column=1, columnspan=3, sticky=tk.W, pady=5)
+        self.budget_entries = []
+        for _ in range(4):
+            entry = ttk.Entry(budget_frame, width=8)
+            entry.pack(side=tk.LEFT, padx=(0, 4))
+            self.budget_entries.append(entry)
+
         # --- Row 9: Log Text ---
         self.log_text = tk.Text(main_frame, height=15, wrap=tk.WORD)
         self.log_text.grid(row=9, column=0, columnspan=5, sticky="nsew", padx=5, pady=5)
         scroll_y = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=self.log_text.yview)
         scroll_y.grid(row=9, column=5, sticky=(tk.N, tk.S))
         self.log_text.configure(yscrollcommand=scroll_y.set)
+        # Bounded and batched: log() runs on the analysis thread and only queues lines
+        self.log_view = LogView(self.root, self.log_text, timestamps=True)
 
     def select_output_dir(self):
         """Prompt user for output directory."""
@@ -190,6 +213,12 @@ class YouTubeAnalyzerDemo:
             messagebox.showerror("Error", "Please enter positive integers for channels/videos counts.")
             return
 
+        try:
+            self.budget = self.read_budget()
+        except ValueError:
+            messagebox.showerror("Error", "Budget fields must be numbers (or blank for unlimited).")
+            return
+
         # Check & install dependencies if checkbox is selected
         if self.deps_check_var.get():
             if not self.check_and_install_dependencies():
@@ -199,7 +228,7 @@ class YouTubeAnalyzerDemo:
         self.start_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
         self.progress_var.set(0)
-        self.log_text.delete("1.0", tk.END)
+        self.log_view.clear()
 
         threading.Thread(target=self.run_analysis, daemon=True).start()
 
@@ -208,8 +237,30 @@ class YouTubeAnalyzerDemo:
         self.is_running = False
         self.log("Stop requested by user...")
 
+    def read_budget(self):
+        """CrawlBudget from the budget fields (pages, thumbnail MB, minutes, KB/s); raises ValueError."""
+        pages, megabytes, minutes, kbps = (float(e.get()) if e.get().strip() else None for e in self.budget_entries)
+        return CrawlBudget(
+            max_pages=int(pages) if pages is not None else None,
+            max_image_bytes=megabytes * 1024 * 1024 if megabytes is not None else None,
+            max_seconds=minutes * 60 if minutes is not None else None,
+            bytes_per_second=kbps * 1024 if kbps is not None else None,
+        )
+
+    def charge_page(self, url):
+        """Count a page load against the budget; BudgetExceeded once it is used up."""
+        if not self.budget.allow_page(url):
+            raise BudgetExceeded(self.budget.exhausted or "host page budget")
+
+    def open_page(self, url):
+        """driver.get(url), counted against the run's page budget."""
+        self.charge_page(url)
+        self.driver.get(url)
+
     def run_analysis(self):
         """Main scraping logic."""
+        analysis_dir = None
+        all_channel_data = []
         try:
             if not self.setup_browser():
                 self.log("Failed to launch browser driver. Stopping.")
@@ -229,11 +280,13 @@ class YouTubeAnalyzerDemo:
             channels_data = self.search_channels_demo(keyword, max_channels)
 
             total_channels = len(channels_data)
-            all_channel_data = []
 
             for idx, channel_info in enumerate(channels_data, start=1):
                 if not self.is_running:
                     break
+                if self.budget.exhausted:
+                    self.log(f"Budget exhausted ({self.budget.exhausted}): stopping analysis.", level="warning")
+                    break
                 self.update_progress((idx / total_channels) * 100)
 
                 channel_name = channel_info.get("channel_name", "UnknownChannel")
@@ -244,11 +297,12 @@ class YouTubeAnalyzerDemo:
                     self.log("No channel URL found, skipping.")
                     continue
 
-                # Step 2) Channel stats
-                stats = self.scrape_channel_stats(channel_url)
+                # Step 2) Channel stats (OCR keeps running while videos are scraped)
+                stats_job = self.scrape_channel_stats(channel_url)
 
                 # Step 3) "Popular" tab -> top N videos
                 videos_data = self.scrape_popular_videos(channel_url, top_videos_count)
+                stats = self.collect_channel_stats(stats_job)
 
                 # Combine
                 full_data = {
@@ -271,15 +325,34 @@ class YouTubeAnalyzerDemo:
                 self.log("No channel data to save.")
                 messagebox.showinfo("No Data", "No valid channels were found or analyzed.")
 
+        except BudgetExceeded as e:
+            self.log(f"Budget exhausted ({e}) before any channel was analyzed.", level="warning")
         except Exception as e:
             self.log(f"Analysis failed: {e}", level="error")
             messagebox.showerror("Error", f"Analysis failed:\n{str(e)}")
         finally:
+            if analysis_dir:
+                self.write_report(analysis_dir, len(all_channel_data))
             self.cleanup_browser()
+            self.selectors.save()
             self.is_running = False
             self.start_button.config(state=tk.NORMAL)
             self.stop_button.config(state=tk.DISABLED)
-            self.progress_var.set(0)
+            self.update_progress(0)  # queued after the last progress update, so it isn't overwritten
+
+    def write_report(self, base_dir, channels):
+        """Save analysis_report.json: budget usage and whether the run stopped early (partial)."""
+        usage = self.budget.report()
+        report = {
+            "partial": bool(usage["exhausted"] or usage["hosts_over_budget"] or not self.is_running),
+            "channels": channels,
+            "budget": usage,
+        }
+        try:
+            with open(os.path.join(base_dir, "analysis_report.json"), "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        except Exception as e:
+            self.log(f"Failed to save analysis_report.json: {e}", level="error")
 
     def setup_browser(self):
         """Initialize undetected Chrome driver."""
@@ -304,7 +377,7 @@ class YouTubeAnalyzerDemo:
     def search_channels_demo(self, keyword, max_channels):
         """Search YouTube by keyword, gather up to max_channels from ytd-channel-renderer (demo)."""
         search_url = f"https://www.youtube.com/results?search_query={keyword}"
-        self.driver.get(search_url)
+        self.open_page(search_url)
         time.sleep(2)
 
         found_channels = []
@@ -342,47 +415,30 @@ class YouTubeAnalyzerDemo:
 
     def scrape_channel_stats(self, channel_url):
         """
-        Attempt to parse:
-         - channel name (if needed)
+        Capture the /about page and queue it for OCR. Returns the OCR job;
+        pass it to collect_channel_stats() to get:
          - subscriber count
          - total videos
          - description
-        from the /about page or from the new snippet if needed.
         """
-        stats = {
-            "subscribers": "N/A",
-            "total_videos": "N/A",
-            "description": "N/A"
-        }
         try:
             about_url = channel_url.rstrip('/') + "/about"
-            self.driver.get(about_url)
+            self.open_page(about_url)
             time.sleep(2)
 
-            # Capture screenshot of the about page
-            screenshot_path = "about_section.png"
-            self.driver.save_screenshot(screenshot_path)
-
-            # Use OCR to extract text from the screenshot
-            text = self.extract_text_from_image(screenshot_path)
-
-            # Parse the extracted text
-            stats = self.parse_channel_stats(text)
+            # Screenshot goes straight to the OCR pool as PNG bytes, so each
+            # request has its own image instead of a shared about_section.png.
+            screenshot = self.driver.get_screenshot_as_png()
+            return self.ocr_pool.submit_png(screenshot)
 
         except Exception as e:
             self.log(f"Channel stats error: {e}", level="error")
+            return None
 
-        return stats
-
-    def extract_text_from_image(self, image_path):
-        """Use OCR to extract text from an image."""
-        try:
-            image = Image.open(image_path)
-            text = pytesseract.image_to_string(image)
-            return text
-        except Exception as e:
-            self.log(f"OCR error: {e}", level="error")
-            return ""
+    def collect_channel_stats(self, stats_job):
+        """Wait for a queued about-page OCR job and parse the stats out of it."""
+        text = self.ocr_pool.result(stats_job)
+        return self.parse_channel_stats(text)
 
     def parse_channel_stats(self, text):
         """Parse the extracted text to get channel stats."""
@@ -417,14 +473,14 @@ class YouTubeAnalyzerDemo:
         videos_data = []
         try:
             videos_url = channel_url.rstrip('/') + "/videos"
-            self.driver.get(videos_url)
+            self.open_page(videos_url)
             time.sleep(2)
 
             # Attempt to click "Popular" tab
             try:
                 popular_tab = self.safe_find_element(
                     "xpath", '//yt-formatted-string[@title="Popular"]',
-                    qprompt_name="Popular Tab", wait_secs=3
+                    qprompt_name="Popular Tab", wait_secs=3, field="popular_tab"
                 )
                 if popular_tab:
                     popular_tab.click()
@@ -434,15 +490,17 @@ class YouTubeAnalyzerDemo:
 
             # Gather up to max_videos
             scroll_attempts = 0
-            while len(videos_data) < max_videos and scroll_attempts < 8 and self.is_running:
+            while (len(videos_data) < max_videos and scroll_attempts < 8 and self.is_running
+                   and not self.budget.exhausted):
                 grid_items = self.driver.find_elements(By.CSS_SELECTOR, "ytd-grid-video-renderer")
                 for gi in grid_items:
-                    if len(videos_data) >= max_videos:
+                    if len(videos_data) >= max_videos or self.budget.exhausted:
                         break
                     try:
                         vid_title_elem = gi.find_element(By.CSS_SELECTOR, "a#video-title")
                         vid_title = vid_title_elem.text.strip()
                         vid_url = vid_title_elem.get_attribute("href")
+                        self.charge_page(vid_url)
 
                         data_dict = self.scrape_video_details(vid_url, vid_title)
                         videos_data.append(data_dict)
@@ -460,17 +518,21 @@ class YouTubeAnalyzerDemo:
 
     def scrape_video_details(self, video_url, video_title):
         """
-        Open video, parse (1) 'channel' snippet, (2) 'title' snippet,
-        (3) 'views & upload date', (4) 'likes', (5) 'thumbnailUrl' etc.
+        Open video and read channel, title, views, exact publish date, likes,
+        duration and thumbnails from the page's embedded player JSON in a single
+        page_source parse. Selector lookups only run for fields it missed.
         """
         result = {
             "title": video_title,
             "url": video_url,
             "channel": "N/A",
+            "channel_id": "N/A",
             "views": "N/A",
             "upload_date": "N/A",
             "likes": "N/A",
-            "thumbnail_url": "N/A"
+            "duration": "N/A",
+            "thumbnail_url": "N/A",
+            "thumbnails": []
         }
         try:
             main_handle = self.driver.current_window_handle
@@ -478,70 +540,81 @@ class YouTubeAnalyzerDemo:
             self.driver.switch_to.window(self.driver.window_handles[-1])
             time.sleep(2)
 
-            # 1) Channel name (from new snippet):
-            #   e.g. <span class="yt-core-attributed-string ...">askNK ...</span>
-            chan_elem = self.safe_find_element(
-                "css",
-                "span.yt-core-attributed-string.yt-core-attributed-string--white-space-pre-wrap",
-                qprompt_name="Video Channel Span",
-                wait_secs=3
-            )
-            if chan_elem:
-                result["channel"] = chan_elem.text.strip()
-
-            # 2) Title (from new snippet):
-            #   e.g. <yt-formatted-string class="style-scope ytd-watch-metadata">Title here</yt-formatted-string>
-            title_elem = self.safe_find_element(
-                "css",
-                "yt-formatted-string.style-scope.ytd-watch-metadata",
-                qprompt_name="Video Title",
-                wait_secs=3
-            )
-            if title_elem:
-                result["title"] = title_elem.text.strip()
-
-            # 3) Views & Upload date together:
-            #   e.g. <yt-formatted-string id="info" class="style-scope ytd-watch-info-text">
-            #          <span dir="auto" ...>19K views</span>
-            #          <span dir="auto" ...>1 day ago</span>
-            #        </yt-formatted-string>
-            info_elem = self.safe_find_element(
-                "css",
-                "yt-formatted-string#info.style-scope.ytd-watch-info-text",
-                qprompt_name="Views/Date info",
-                wait_secs=3
-            )
-            if info_elem:
-                text_info = info_elem.text.strip()  # e.g. "19K views  1 day ago  #asknk #something"
-                # Quick parse or regex for "(\S+ views).*(\d+ day[s]? ago|...)"
-                # For demonstration:
-                match_views = re.search(r'(\S+\sviews)', text_info)
-                match_date = re.search(r'(\d+\s\w+\sago|\d+\sday[s]?\sago)', text_info)
-                if match_views:
-                    result["views"] = match_views.group(1)
-                if match_date:
-                    result["upload_date"] = match_date.group(1)
-
-            # 4) Likes:
-            #   e.g. <button ... aria-label="like this video along with 836 other people" ...>
-            #         <div class="yt-spec-button-shape-next__button-text-content">836</div>
-            #       ...
-            # We'll attempt a direct approach:
-            like_btn = self.safe_find_element(
-                "css",
-                'button[aria-label^="like this video along"] div.yt-spec-button-shape-next__button-text-content',
-                qprompt_name="Likes Button Div",
-                wait_secs=3
-            )
-            if like_btn:
-                result["likes"] = like_btn.text.strip()
-
-            # 5) Check page source for "thumbnailUrl" (like in the original script)
+            # 1) Structured data from ytInitialPlayerResponse / ytInitialData
             page_source = self.driver.page_source
-            match_thumb = re.search(r'"thumbnailUrl":"([^"]+)"', page_source)
-            if match_thumb:
-                thumb_url = match_thumb.group(1)
-                result["thumbnail_url"] = thumb_url
+            page = extract_watch_page(page_source)
+            for key, page_key in (("title", "title"), ("channel", "channel"),
+                                  ("channel_id", "channel_id"), ("views", "views"),
+                                  ("upload_date", "publish_date"), ("likes", "likes"),
+                                  ("duration", "duration_seconds"),
+                                  ("thumbnail_url", "thumbnail_url")):
+                if page.get(page_key) is not None:
+                    result[key] = page[page_key]
+            result["thumbnails"] = page.get("thumbnails", [])
+
+            # 2) Fallbacks for anything the JSON did not provide
+            if result["channel"] == "N/A":
+                #   e.g. <span class="yt-core-attributed-string ...">askNK ...</span>
+                chan_elem = self.safe_find_element(
+                    "css",
+                    "span.yt-core-attributed-string.yt-core-attributed-string--white-space-pre-wrap",
+                    qprompt_name="Video Channel Span",
+                    wait_secs=3,
+                    field="video_channel"
+                )
+                if chan_elem:
+                    result["channel"] = chan_elem.text.strip()
+
+            if not page.get("title"):
+                #   e.g. <yt-formatted-string class="style-scope ytd-watch-metadata">Title here</yt-formatted-string>
+                title_elem = self.safe_find_element(
+                    "css",
+                    "yt-formatted-string.style-scope.ytd-watch-metadata",
+                    qprompt_name="Video Title",
+                    wait_secs=3,
+                    field="video_title"
+                )
+                if title_elem:
+                    result["title"] = title_elem.text.strip()
+
+            if result["views"] == "N/A" or result["upload_date"] == "N/A":
+                #   e.g. <yt-formatted-string id="info" class="style-scope ytd-watch-info-text">
+                #          <span dir="auto" ...>19K views</span>
+                #          <span dir="auto" ...>1 day ago</span>
+                #        </yt-formatted-string>
+                info_elem = self.safe_find_element(
+                    "css",
+                    "yt-formatted-string#info.style-scope.ytd-watch-info-text",
+                    qprompt_name="Views/Date info",
+                    wait_secs=3,
+                    field="video_info"
+                )
+                if info_elem:
+                    text_info = info_elem.text.strip()  # e.g. "19K views  1 day ago  #asknk #something"
+                    match_views = re.search(r'(\S+\sviews)', text_info)
+                    match_date = re.search(r'(\d+\s\w+\sago|\d+\sday[s]?\sago)', text_info)
+                    if match_views and result["views"] == "N/A":
+                        result["views"] = match_views.group(1)
+                    if match_date and result["upload_date"] == "N/A":
+                        result["upload_date"] = match_date.group(1)
+
+            if result["likes"] == "N/A":
+                #   e.g. <button ... aria-label="like this video along with 836 other people" ...>
+                #         <div class="yt-spec-button-shape-next__button-text-content">836</div>
+                like_btn = self.safe_find_element(
+                    "css",
+                    'button[aria-label^="like this video along"] div.yt-spec-button-shape-next__button-text-content',
+                    qprompt_name="Likes Button Div",
+                    wait_secs=3,
+                    field="video_likes"
+                )
+                if like_btn:
+                    result["likes"] = like_btn.text.strip()
+
+            if result["thumbnail_url"] == "N/A":
+                match_thumb = re.search(r'"thumbnailUrl":"([^"]+)"', page_source)
+                if match_thumb:
+                    result["thumbnail_url"] = match_thumb.group(1)
 
         except Exception as e:
             self.log(f"scrape_video_details error: {e}", level="debug")
@@ -552,48 +625,42 @@ class YouTubeAnalyzerDemo:
 
         return result
 
-    def safe_find_element(self, by_method, selector, qprompt_name="Element", wait_secs=5):
+    def safe_find_element(self, by_method, selector, qprompt_name="Element", wait_secs=5, field=None):
         """
-        Attempt a find_element with the given by_method & selector.
-        If fails and Q-menu is enabled, prompt user for a new selector, then retry.
+        Find an element for a logical field through the selector registry.
+        The given selector is added as a candidate; known candidates are tried
+        in order of recent success and dead ones are skipped without waiting.
+        If nothing matches and Q-menu is enabled, prompt user for a new
+        selector, which is remembered for later videos and runs.
         """
-        try:
-            if by_method == "css":
-                elem = WebDriverWait(self.driver, wait_secs).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                )
-            elif by_method == "xpath":
-                elem = WebDriverWait(self.driver, wait_secs).until(
-                    EC.presence_of_element_located((By.XPATH, selector))
-                )
-            else:
-                raise ValueError("Unsupported by_method")
-            return elem
-        except:
-            self.log(f"Could not find {qprompt_name} with {by_method}='{selector}'", "debug")
-            if self.qmenu_var.get():
-                # Q-menu: ask user for a new selector
-                new_selector = simpledialog.askstring(
-                    "Q-Menu: Missing Element",
-                    f"Failed to find {qprompt_name}.\n\nEnter a new {by_method.upper()} selector or 'skip':",
-                    parent=self.root
-                )
-                if new_selector and new_selector.lower() != "skip":
-                    try:
-                        if by_method == "css":
-                            elem = WebDriverWait(self.driver, wait_secs).until(
-                                EC.presence_of_element_located((By.CSS_SELECTOR, new_selector))
-                            )
-                        else:
-                            elem = WebDriverWait(self.driver, wait_secs).until(
-                                EC.presence_of_element_located((By.XPATH, new_selector))
-                            )
-                        return elem
-                    except:
-                        self.log(f"Q-menu: Still cannot find {qprompt_name}. Skipping...", "debug")
-                        return None
+        field = field or qprompt_name
+        self.selectors.register(field, by_method, selector)
+        if self.selectors.is_dead(field):
+            self.log(f"Skipping {qprompt_name}: all known selectors are dead this session", "debug")
             return None
 
+        elem = self.selectors.find(self.driver, field, wait_secs)
+        if elem is not None:
+            return elem
+
+        self.log(f"Could not find {qprompt_name} with {by_method}='{selector}'", "debug")
+        if self.qmenu_var.get() and not self.selectors.is_muted(field):
+            # Q-menu: ask user for a new selector
+            new_selector = simpledialog.askstring(
+                "Q-Menu: Missing Element",
+                f"Failed to find {qprompt_name}.\n\nEnter a new {by_method.upper()} selector or 'skip':",
+                parent=self.root
+            )
+            if new_selector and new_selector.lower() != "skip":
+                key = self.selectors.register(field, by_method, new_selector, version="qmenu")
+                elem = self.selectors.find(self.driver, field, wait_secs, only_key=key)
+                if elem is None:
+                    self.log(f"Q-menu: Still cannot find {qprompt_name}. Skipping...", "debug")
+                return elem
+            # Don't ask again for this field during this session
+            self.selectors.mute(field)
+        return None
+
     def save_channel_data(self, base_dir, channel_data):
         """
         Save data for a single channel:
@@ -651,6 +718,8 @@ class YouTubeAnalyzerDemo:
                 "Views": vid.get("views", "N/A"),
                 "Likes": vid.get("likes", "N/A"),
                 "Upload Date": vid.get("upload_date", "N/A"),
+                "Duration (s)": vid.get("duration", "N/A"),
+                "Channel ID": vid.get("channel_id", "N/A"),
                 "Thumbnail URL": thumb_url,
                 "Thumbnail Path": saved_thumb if saved_thumb else "Not downloaded"
             })
@@ -665,14 +734,21 @@ class YouTubeAnalyzerDemo:
 
     def download_thumbnail(self, url, path):
         """Download thumbnail from url to path. Return path if OK, else None."""
-        if not url:
+        if not url or not self.budget.allow_image(url):
             return None
         try:
-            r = requests.get(url, timeout=10)
-            if r.status_code == 200:
-                with open(path, "wb") as f:
-                    f.write(r.content)
-                return path
+            with requests.get(url, timeout=10, stream=True) as r:
+                if r.status_code == 200:
+                    # Streamed so the image byte and bandwidth budgets apply chunk by chunk
+                    content = bytearray()
+                    for chunk in r.iter_content(64 * 1024):
+                        self.budget.consume(url, len(chunk), image=True)
+                        content.extend(chunk)
+                    with open(path, "wb") as f:
+                        f.write(content)
+                    return path
+        except BudgetExceeded as e:
+            self.log(f"Budget reached ({e}), thumbnail not downloaded: {url}", level="warning")
         except Exception as e:
             self.log(f"Thumbnail download error: {e}", level="debug")
         return None
@@ -720,18 +796,14 @@ class YouTubeAnalyzerDemo:
             self.log(f"Error creating analysis_summary.xlsx: {e}", level="error")
 
     def update_progress(self, value):
-        """Update progress bar safely."""
-        self.progress_var.set(value)
-        self.root.update_idletasks()
+        """Update progress bar safely: called from the analysis thread, applied on the Tk loop."""
+        self.root.after(0, self.progress_var.set, value)
 
     def log(self, message, level="info"):
         """
-        Log to console/file and add to the text widget.
+        Log to console/file and queue the line for the text widget.
         levels: "info", "debug", "error", etc.
         """
-        timestamp = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
-        full_message = f"{timestamp} {message}\n"
-
         if level == "debug":
             self.logger.debug(message)
         elif level == "warning":
@@ -741,8 +813,7 @@ class YouTubeAnalyzerDemo:
         else:
             self.logger.info(message)
 
-        self.log_text.insert(tk.END, full_message)
-        self.log_text.see(tk.END)
+        self.log_view.push(message, level.upper())
 
     def on_closing(self):
         """Confirm quit if analysis is running."""
@@ -752,6 +823,8 @@ class YouTubeAnalyzerDemo:
             self.is_running = False
 
         self.cleanup_browser()
+        self.ocr_pool.shutdown(wait=False)
+        self.log_view.close()
         self.root.destroy()
 
     def run(self):
@@ -2,13 +2,12 @@ import os
 import time
 import re
 import requests
-from PIL import Image
-import pytesseract
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from ocr_module import OCRWorkerPool
 
 # Setup directories
 output_dir = "youtube_analysis"
@@ -17,22 +16,32 @@ screenshot_dir = os.path.join(output_dir, "screenshots")
 os.makedirs(thumbnail_dir, exist_ok=True)
 os.makedirs(screenshot_dir, exist_ok=True)
 
-# Initialize browser
-options = webdriver.ChromeOptions()
-options.add_argument('--no-sandbox')
-options.add_argument('--disable-gpu')
-driver = webdriver.Chrome(options=options)
-driver.set_window_size(1280, 800)
-
-def extract_text_from_image(image_path):
-    """Use OCR to extract text from an image."""
-    try:
-        image = Image.open(image_path)
-        text = pytesseract.image_to_string(image)
-        return text
-    except Exception as e:
-        print(f"OCR error: {e}")
-        return ""
+# Browser is created in main(); OCR worker processes re-import this module
+# and must not launch Chrome themselves.
+driver = None
+ocr_pool = OCRWorkerPool()
+
+def init_browser():
+    """Start the Chrome driver used by the scraping functions."""
+    global driver
+    options = webdriver.ChromeOptions()
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-gpu')
+    driver = webdriver.Chrome(options=options)
+    driver.set_window_size(1280, 800)
+
+def queue_ocr(screenshot_path, text_path):
+    """Queue OCR for a saved screenshot; the text file is written when it finishes."""
+    future = ocr_pool.submit_file(screenshot_path)
+
+    def _write_text(f):
+        if not f.cancelled() and f.exception() is None:
+            save_text_to_file(f.result(), text_path)
+        else:
+            print(f"OCR error: {f.exception()}")
+
+    future.add_done_callback(_write_text)
+    return future
 
 def download_thumbnail(url, path):
     """Download thumbnail from url to path. Return path if OK, else None."""
@@ -54,7 +63,10 @@ def save_text_to_file(text, file_path):
         f.write(text)
 
 def scrape_channel_details(channel_url):
-    """Scrape channel details from the 'About' page."""
+    """
+    Screenshot the 'About' page and queue it for OCR.
+    Returns the OCR job; call ocr_pool.result() on it for the text.
+    """
     try:
         about_url = channel_url.rstrip('/') + "/about"
         driver.get(about_url)
@@ -64,14 +76,11 @@ def scrape_channel_details(channel_url):
         screenshot_path = os.path.join(screenshot_dir, f"{channel_url.split('/')[-1]}_about.png")
         driver.save_screenshot(screenshot_path)
 
-        # Extract text from the screenshot
-        text = extract_text_from_image(screenshot_path)
-        save_text_to_file(text, os.path.join(screenshot_dir, f"{channel_url.split('/')[-1]}_about.txt"))
-
-        return text
+        # OCR runs in the worker pool while scraping carries on
+        return queue_ocr(screenshot_path, os.path.join(screenshot_dir, f"{channel_url.split('/')[-1]}_about.txt"))
     except Exception as e:
         print(f"Channel details error: {e}")
-        return ""
+        return None
 
 def scrape_popular_videos(channel_url, max_videos):
     """Scrape popular videos from the channel."""
@@ -138,9 +147,8 @@ def scrape_video_details(video_url, video_title):
         screenshot_path = os.path.join(screenshot_dir, f"{video_url.split('=')[-1]}_video.png")
         driver.save_screenshot(screenshot_path)
 
-        # Extract text from the screenshot
-        text = extract_text_from_image(screenshot_path)
-        save_text_to_file(text, os.path.join(screenshot_dir, f"{video_url.split('=')[-1]}_video.txt"))
+        # Queue OCR of the screenshot without waiting for it
+        queue_ocr(screenshot_path, os.path.join(screenshot_dir, f"{video_url.split('=')[-1]}_video.txt"))
 
         # Extract thumbnail URL
         page_source = driver.page_source
@@ -165,16 +173,20 @@ def main():
     channel_url = "https://www.youtube.com/@askNK"
     max_videos = 5
 
-    # Scrape channel details
-    channel_details = scrape_channel_details(channel_url)
-    print("Channel Details:", channel_details)
+    init_browser()
+
+    # Scrape channel details (OCR finishes in the background)
+    channel_job = scrape_channel_details(channel_url)
 
     # Scrape popular videos
     popular_videos = scrape_popular_videos(channel_url, max_videos)
     print("Popular Videos:", popular_videos)
 
-    # Close browser
+    print("Channel Details:", ocr_pool.result(channel_job))
+
+    # Close browser and wait for outstanding OCR jobs
     driver.quit()
+    ocr_pool.shutdown()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,144 @@
+import hashlib
+import io
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from PIL import Image, ImageOps
+import pytesseract
+
+# Regions are (left, top, right, bottom) fractions of the screenshot, so the
+# same layout works for any window size.
+DEFAULT_REGIONS = {
+    "channel_header": (0.0, 0.10, 1.0, 0.45),
+    "about_body": (0.0, 0.35, 1.0, 1.0),
+}
+
+
+def _preprocess(image, box, max_width, threshold):
+    """Crop to a fractional box, downsample and binarise for Tesseract."""
+    width, height = image.size
+    left, top, right, bottom = box
+    region = image.crop((
+        int(left * width), int(top * height),
+        int(right * width), int(bottom * height)
+    ))
+
+    region = region.convert("L")
+    if region.width > max_width:
+        ratio = max_width / region.width
+        region = region.resize((max_width, max(1, int(region.height * ratio))), Image.LANCZOS)
+
+    region = ImageOps.autocontrast(region)
+    # Dark theme pages have light text; Tesseract wants dark on light.
+    histogram = region.histogram()
+    pixels = sum(histogram) or 1
+    mean = sum(value * count for value, count in enumerate(histogram)) / pixels
+    if mean < 128:
+        region = ImageOps.invert(region)
+
+    return region.point(lambda p: 255 if p > threshold else 0, mode="1")
+
+
+def _ocr_worker(png_bytes, regions, max_width, threshold, config):
+    """Run in a worker process: decode once, OCR every region, join the text."""
+    image = Image.open(io.BytesIO(png_bytes))
+    image.load()
+    texts = []
+    for name, box in regions:
+        prepared = _preprocess(image, box, max_width, threshold)
+        texts.append(pytesseract.image_to_string(prepared, config=config))
+    return "\n".join(texts)
+
+
+class OCRWorkerPool:
+    """
+    Region-of-interest OCR in a process pool with a result cache.
+
+    Screenshots are passed as PNG bytes (driver.get_screenshot_as_png()), so
+    every request carries its own image and nothing is shared on disk.
+    Results are cached by a hash of the image and the OCR settings, and
+    identical requests that are still running share one Future.
+    """
+
+    def __init__(self, regions=None, max_workers=None, max_width=1280,
+                 threshold=150, config="--psm 6", cache_size=256):
+        self.regions = dict(regions or DEFAULT_REGIONS)
+        self.max_workers = max_workers
+        self.max_width = max_width
+        self.threshold = threshold
+        self.config = config
+        self.cache_size = cache_size
+
+        self._executor = None
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Created lazily so importing this module never spawns processes.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _cache_key(self, png_bytes, regions):
+        digest = hashlib.sha1(png_bytes)
+        digest.update(repr((regions, self.max_width, self.threshold, self.config)).encode("utf-8"))
+        return digest.hexdigest()
+
+    def submit_png(self, png_bytes, region_names=None):
+        """
+        Queue OCR for a PNG screenshot. Returns a Future resolving to the text
+        of the selected regions (all configured regions by default).
+        """
+        names = region_names or list(self.regions)
+        regions = tuple((name, tuple(self.regions[name])) for name in names)
+        key = self._cache_key(png_bytes, regions)
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                done = Future()
+                done.set_result(self._cache[key])
+                return done
+            if key in self._pending:
+                return self._pending[key]
+
+            future = self._get_executor().submit(
+                _ocr_worker, png_bytes, regions, self.max_width, self.threshold, self.config
+            )
+            self._pending[key] = future
+
+        future.add_done_callback(lambda f, key=key: self._store(key, f))
+        return future
+
+    def submit_file(self, image_path, region_names=None):
+        """Queue OCR for an image already saved on disk."""
+        with open(image_path, "rb") as f:
+            return self.submit_png(f.read(), region_names)
+
+    def _store(self, key, future):
+        with self._lock:
+            self._pending.pop(key, None)
+            if future.cancelled() or future.exception() is not None:
+                return
+            self._cache[key] = future.result()
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def result(self, future, timeout=60):
+        """Wait for a submitted OCR job, returning "" on failure."""
+        if future is None:
+            return ""
+        try:
+            return future.result(timeout=timeout)
+        except Exception as e:
+            logging.error(f"OCR error: {e}")
+            return ""
+
+    def shutdown(self, wait=True):
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
@@ -0,0 +1,250 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+BY_METHODS = {
+    "css": By.CSS_SELECTOR,
+    "xpath": By.XPATH
+}
+
+# Candidate selectors per logical field, newest layout first. Each entry is
+# (layout version, by_method, selector).
+DEFAULT_SELECTORS = {
+    "subscriber_count": [
+        ("2024", "css", "yt-content-metadata-view-model span[role='text']"),
+        ("2023", "css", "#subscriber-count"),
+    ],
+    "videos_count": [
+        ("2024", "css", "yt-content-metadata-view-model span:nth-of-type(3)"),
+        ("2023", "css", "#videos-count"),
+    ],
+    "channel_description": [
+        ("2024", "css", "yt-description-preview-view-model"),
+        ("2023", "css", "#description"),
+    ],
+    "popular_tab": [
+        ("2024", "xpath", '//yt-chip-cloud-chip-renderer[.//*[normalize-space(text())="Popular"]]'),
+        ("2023", "xpath", '//yt-formatted-string[@title="Popular"]'),
+    ],
+    "video_channel": [
+        ("2024", "css", "ytd-channel-name#channel-name a"),
+        ("2023", "css", "span.yt-core-attributed-string.yt-core-attributed-string--white-space-pre-wrap"),
+    ],
+    "video_title": [
+        ("2024", "css", "h1.ytd-watch-metadata yt-formatted-string"),
+        ("2023", "css", "yt-formatted-string.style-scope.ytd-watch-metadata"),
+    ],
+    "video_info": [
+        ("2024", "css", "#info-container yt-formatted-string#info"),
+        ("2023", "css", "yt-formatted-string#info.style-scope.ytd-watch-info-text"),
+    ],
+    "video_likes": [
+        ("2024", "css", "like-button-view-model button div.yt-spec-button-shape-next__button-text-content"),
+        ("2023", "css", 'button[aria-label^="like this video along"] div.yt-spec-button-shape-next__button-text-content'),
+    ],
+}
+
+
+class SelectorRegistry:
+    """
+    Versioned candidate selectors per logical field.
+
+    Candidates are tried in order of recent success (an exponential moving
+    hit rate), all within a single wait. A selector that was tried and found
+    nothing while another candidate for the same field did find it has
+    missed for sure; after dead_after such misses in a row it is marked
+    dead for the session and no longer waited on. When no candidate finds
+    anything the field may just not be on the page, so those misses only
+    lower the scores and never kill a selector; but after absent_after such
+    passes in a row (a layout change none of the candidates knows) the field
+    is only waited on for absent_wait seconds until one of them hits again.
+    Hit/miss stats and selectors learned through the Q-menu are saved to
+    stats_path so the order carries over between runs.
+    """
+
+    def __init__(self, stats_path="selector_stats.json", defaults=None,
+                 dead_after=3, decay=0.3, absent_after=3, absent_wait=0.5):
+        self.stats_path = stats_path
+        self.dead_after = dead_after
+        self.decay = decay
+        self.absent_after = absent_after
+        self.absent_wait = absent_wait
+
+        self._fields = {}
+        self._dead = set()
+        self._muted = set()
+        self._misses_in_row = {}
+        self._absent_in_row = {}
+        self._lock = threading.Lock()
+
+        for field, candidates in (defaults or DEFAULT_SELECTORS).items():
+            for version, by_method, selector in candidates:
+                self.register(field, by_method, selector, version=version)
+        self.load()
+
+    def register(self, field, by_method, selector, version="inline"):
+        """Add a candidate for field if it is not already known."""
+        if by_method not in BY_METHODS:
+            raise ValueError("Unsupported by_method")
+        with self._lock:
+            candidates = self._fields.setdefault(field, {})
+            key = f"{by_method}:{selector}"
+            if key not in candidates:
+                candidates[key] = {
+                    "by": by_method,
+                    "selector": selector,
+                    "version": version,
+                    "order": len(candidates),
+                    "hits": 0,
+                    "misses": 0,
+                    "score": 0.5,
+                    "last_hit": None
+                }
+            return key
+
+    def candidates(self, field):
+        """Live candidates for field, best first."""
+        with self._lock:
+            entries = [
+                (key, info) for key, info in self._fields.get(field, {}).items()
+                if (field, key) not in self._dead
+            ]
+        entries.sort(key=lambda item: (-item[1]["score"], item[1]["order"]))
+        return entries
+
+    def is_dead(self, field):
+        """True once every candidate for field has been marked dead."""
+        return not self.candidates(field)
+
+    def effective_wait(self, field, wait_secs):
+        """wait_secs, cut to absent_wait once field has been absent absent_after times in a row."""
+        if self._absent_in_row.get(field, 0) >= self.absent_after:
+            return min(wait_secs, self.absent_wait)
+        return wait_secs
+
+    def mute(self, field):
+        """Stop offering the Q-menu for field for the rest of the session."""
+        self._muted.add(field)
+
+    def is_muted(self, field):
+        return field in self._muted
+
+    def record_hit(self, field, key):
+        with self._lock:
+            info = self._fields[field][key]
+            info["hits"] += 1
+            info["score"] = info["score"] * (1 - self.decay) + self.decay
+            info["last_hit"] = datetime.now().isoformat(timespec="seconds")
+            self._misses_in_row[(field, key)] = 0
+            self._absent_in_row[field] = 0
+
+    def record_miss(self, field, key, conclusive=True):
+        """
+        Count a miss; returns True if this miss marked the selector dead.
+        Only conclusive misses (another candidate hit) count towards that.
+        """
+        with self._lock:
+            info = self._fields[field][key]
+            info["misses"] += 1
+            info["score"] = info["score"] * (1 - self.decay)
+            if not conclusive:
+                return False
+            streak = self._misses_in_row.get((field, key), 0) + 1
+            self._misses_in_row[(field, key)] = streak
+            if streak >= self.dead_after:
+                self._dead.add((field, key))
+                return True
+            return False
+
+    def find(self, driver, field, wait_secs=5, only_key=None):
+        """
+        Wait up to wait_secs for any live candidate of field to appear.
+        Returns the element or None. On a hit, the candidates tried before it
+        in the same pass are recorded as misses and those ranked after it are
+        left alone (they were not tried); on a timeout every candidate gets
+        an inconclusive miss. A Q-menu check (only_key) always waits in full.
+        """
+        entries = self.candidates(field)
+        if only_key is not None:
+            entries = [(key, info) for key, info in entries if key == only_key]
+        if not entries:
+            return None
+        if only_key is None:
+            wait_secs = self.effective_wait(field, wait_secs)
+
+        def _first_present(d):
+            for key, info in entries:
+                try:
+                    found = d.find_elements(BY_METHODS[info["by"]], info["selector"])
+                except WebDriverException:
+                    found = []
+                if found:
+                    return key, found[0]
+            return False
+
+        try:
+            hit_key, elem = WebDriverWait(driver, wait_secs).until(_first_present)
+        except TimeoutException:
+            hit_key, elem = None, None
+
+        if hit_key is None:
+            for key, _ in entries:
+                self.record_miss(field, key, conclusive=False)
+            if only_key is None:
+                with self._lock:
+                    absent = self._absent_in_row[field] = self._absent_in_row.get(field, 0) + 1
+                if absent == self.absent_after:
+                    logging.debug(f"No selector for {field} matched {absent} times in a row; "
+                                  f"waiting {self.absent_wait}s for it from now on")
+            return None
+
+        for key, info in entries:
+            if key == hit_key:
+                self.record_hit(field, key)
+                break
+            if self.record_miss(field, key):
+                logging.debug(f"Selector for {field} marked dead this session: {info['selector']}")
+        return elem
+
+    def load(self):
+        """Merge saved stats (and learned selectors) from stats_path."""
+        if not self.stats_path or not os.path.exists(self.stats_path):
+            return
+        try:
+            with open(self.stats_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not read selector stats: {e}")
+            return
+
+        for field, candidates in saved.get("fields", {}).items():
+            for info in candidates.values():
+                try:
+                    key = self.register(field, info["by"], info["selector"], info.get("version", "learned"))
+                except (KeyError, ValueError):
+                    continue
+                current = self._fields[field][key]
+                for stat in ("hits", "misses", "score", "last_hit"):
+                    if stat in info:
+                        current[stat] = info[stat]
+
+    def save(self):
+        """Write hit-rate stats to stats_path."""
+        if not self.stats_path:
+            return
+        with self._lock:
+            data = {"saved_at": time.time(), "fields": self._fields}
+            try:
+                tmp_path = self.stats_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=4)
+                os.replace(tmp_path, self.stats_path)
+            except OSError as e:
+                logging.warning(f"Could not save selector stats: {e}")
@@ -0,0 +1,109 @@
+import json
+import re
+
+PLAYER_RESPONSE_MARKERS = ("var ytInitialPlayerResponse = ", "ytInitialPlayerResponse = ")
+INITIAL_DATA_MARKERS = ("var ytInitialData = ", 'window["ytInitialData"] = ', "ytInitialData = ")
+
+LIKES_LABEL_RE = re.compile(r"like this video along with ([\d,.]+) other", re.IGNORECASE)
+
+
+def _extract_json(page_source, markers):
+    """Decode the JSON object assigned after the first marker found in page_source."""
+    decoder = json.JSONDecoder()
+    for marker in markers:
+        pos = page_source.find(marker)
+        if pos == -1:
+            continue
+        start = page_source.find("{", pos + len(marker))
+        if start == -1:
+            continue
+        try:
+            obj, _ = decoder.raw_decode(page_source, start)
+            return obj
+        except ValueError:
+            continue
+    return None
+
+
+def _walk(obj):
+    """Yield every (key, value) pair in a nested JSON structure."""
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            for key, value in current.items():
+                yield key, value
+                if isinstance(value, (dict, list)):
+                    stack.append(value)
+        elif isinstance(current, list):
+            stack.extend(item for item in current if isinstance(item, (dict, list)))
+
+
+def _to_int(value):
+    if value is None:
+        return None
+    digits = re.sub(r"[^\d]", "", str(value))
+    return int(digits) if digits else None
+
+
+def _find_likes(initial_data):
+    """Pull the like count out of ytInitialData's like button labels."""
+    if not initial_data:
+        return None
+    for key, value in _walk(initial_data):
+        if key in ("accessibilityText", "label") and isinstance(value, str):
+            match = LIKES_LABEL_RE.search(value)
+            if match:
+                return _to_int(match.group(1))
+        elif key == "likeCount" and isinstance(value, (str, int)):
+            return _to_int(value)
+    return None
+
+
+def _collect_thumbnails(*sources):
+    """Merge thumbnail lists, dropping duplicates, sorted smallest to largest."""
+    seen = {}
+    for source in sources:
+        for thumb in (source or {}).get("thumbnails", []):
+            url = thumb.get("url")
+            if url and url not in seen:
+                seen[url] = {
+                    "url": url,
+                    "width": thumb.get("width", 0),
+                    "height": thumb.get("height", 0)
+                }
+    return sorted(seen.values(), key=lambda t: t["width"] * t["height"])
+
+
+def extract_watch_page(page_source):
+    """
+    Parse a watch page's embedded ytInitialPlayerResponse / ytInitialData.
+
+    Returns a dict with video_id, title, channel, channel_id, views, likes,
+    publish_date, upload_date, duration_seconds, thumbnails (every
+    resolution) and thumbnail_url (the largest). Fields that could not be
+    found are None; the dict is empty if no player response was present.
+    """
+    player = _extract_json(page_source, PLAYER_RESPONSE_MARKERS)
+    if not player:
+        return {}
+    initial_data = _extract_json(page_source, INITIAL_DATA_MARKERS)
+
+    details = player.get("videoDetails", {})
+    micro = player.get("microformat", {}).get("playerMicroformatRenderer", {})
+
+    thumbnails = _collect_thumbnails(details.get("thumbnail"), micro.get("thumbnail"))
+
+    return {
+        "video_id": details.get("videoId"),
+        "title": details.get("title") or micro.get("title", {}).get("simpleText"),
+        "channel": details.get("author") or micro.get("ownerChannelName"),
+        "channel_id": details.get("channelId") or micro.get("externalChannelId"),
+        "views": _to_int(details.get("viewCount") or micro.get("viewCount")),
+        "likes": _find_likes(initial_data),
+        "publish_date": micro.get("publishDate"),
+        "upload_date": micro.get("uploadDate"),
+        "duration_seconds": _to_int(details.get("lengthSeconds") or micro.get("lengthSeconds")),
+        "thumbnails": thumbnails,
+        "thumbnail_url": thumbnails[-1]["url"] if thumbnails else None
+    }
@@ -13,6 +13,7 @@ from datetime import datetime
 import requests
 import re
 import time
+from urllib.parse import urlparse
 import pyautogui
 import win32gui
 import win32con
@@ -29,6 +30,12 @@ from selenium.webdriver.common.action_chains import ActionChains
 import numpy as np
 import cv2
 
+# Background thumbnail decoding for the preview label
+from src.preview import PreviewService
+from src.log_view import LogView
+from crawler.metrics import REGISTRY, MetricsExporter, DEFAULT_PORT
+from crawler.budget import CrawlBudget, BudgetExceeded
+
 
 class DependencyManager:
     def __init__(self):
@@ -119,6 +126,8 @@ class AdvancedYouTubeAnalyzer:
         self.driver = None
         self.wait = None
         self.stop_flag = False
+        # Page loads, thumbnail bytes and time for one run; unlimited until the GUI sets one
+        self.budget = CrawlBudget()
         # Default output directory
         self.output_dir = os.path.join(os.path.expanduser("~"), "Documents", "YouTube_Analysis")
         self.create_directory_structure()
@@ -169,12 +178,34 @@ class AdvancedYouTubeAnalyzer:
             logging.error(f"Failed to setup driver: {str(e)}")
             return False
 
+    def charge_page(self, url):
+        """
+        Counts a page load against the budget; raises BudgetExceeded instead
+        once the run (or url's host) has used up its pages or time.
+        """
+        if not self.budget.allow_page(url):
+            raise BudgetExceeded(self.budget.exhausted or f"max pages for {urlparse(url).netloc}")
+
+    def load_page(self, url, kind):
+        """
+        driver.get(url), recording the page load time and outcome in the
+        metrics registry under the given kind (search, channel, videos, about).
+        """
+        self.charge_page(url)
+        try:
+            with REGISTRY.timer("youtube_page_load_seconds", kind=kind):
+                self.driver.get(url)
+            REGISTRY.inc("youtube_pages_total", kind=kind, status="ok")
+        except Exception:
+            REGISTRY.inc("youtube_pages_total", kind=kind, status="error")
+            raise
+
     def search_channels(self, keyword, num_channels):
         """
         Searches YouTube by keyword, aiming to gather channel links.
         Returns up to num_channels channel URLs.
         """
-        self.driver.get(f"https://www.youtube.com/results?search_query={keyword}&sp=CAMSAhAB")
+        self.load_page(f"https://www.youtube.com/results?search_query={keyword}&sp=CAMSAhAB", "search")
         channels = []
         while len(channels) < num_channels and not self.stop_flag:
             try:
@@ -229,6 +260,7 @@ class AdvancedYouTubeAnalyzer:
         Opens a new browser tab for the given video URL and waits for the page to load.
         """
         try:
+            self.charge_page(video_url)
             self.driver.execute_script(f'window.open("{video_url}", "_blank");')
             self.driver.switch_to.window(self.driver.window_handles[-1])
 
@@ -373,17 +405,29 @@ class AdvancedYouTubeAnalyzer:
     def download_thumbnail(self, url, title):
         """
         Downloads the thumbnail from the given URL and optionally enhances it with OpenCV.
+        The body is streamed against the image byte and bandwidth budgets.
         """
+        if not self.budget.allow_image(url):
+            return None
         try:
-            response = requests.get(url, timeout=10)
+            with REGISTRY.timer("http_request_seconds", host="thumbnails"):
+                response = requests.get(url, timeout=10, stream=True)
+            REGISTRY.inc("http_requests_total", host="thumbnails", status=str(response.status_code))
+            with response:
+                content = bytearray()
+                if response.status_code == 200:
+                    for chunk in response.iter_content(64 * 1024):
+                        self.budget.consume(url, len(chunk), image=True)
+                        content.extend(chunk)
             if response.status_code == 200:
+                REGISTRY.inc("bytes_downloaded_total", len(content), kind="image")
                 safe_title = re.sub(r'[\\/*?:"<>|]', "", title)
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 filepath = os.path.join(self.output_dir, 'Thumbnails', f"{safe_title}_{timestamp}.jpg")
                 os.makedirs(os.path.join(self.output_dir, 'Thumbnails'), exist_ok=True)
 
                 with open(filepath, 'wb') as f:
-                    f.write(response.content)
+                    f.write(content)
 
                 # Check and enhance thumbnail if needed
                 img = cv2.imread(filepath)
@@ -397,6 +441,8 @@ class AdvancedYouTubeAnalyzer:
                     cv2.imwrite(filepath, img)
 
                 return filepath
+        except BudgetExceeded as e:
+            logging.warning(f"Budget reached ({e}), thumbnail not downloaded: {url}")
         except Exception as e:
             logging.error(f"Error downloading thumbnail: {str(e)}")
         return None
@@ -410,12 +456,12 @@ class AdvancedYouTubeAnalyzer:
           4. Return both channel data and videos data.
         """
         try:
-            self.driver.get(channel_url)
+            self.load_page(channel_url, "channel")
             channel_data = self.extract_channel_data()
 
             # Construct "Videos" URL + sort by popularity (sort=p)
             videos_url = f"{channel_url}/videos?view=0&sort=p"
-            self.driver.get(videos_url)
+            self.load_page(videos_url, "videos")
             time.sleep(2)
 
             # Gather the top N video elements
@@ -425,6 +471,8 @@ class AdvancedYouTubeAnalyzer:
 
             videos_data = []
             for video_element in video_elements:
+                if self.budget.exhausted:
+                    break
                 video_data = self.extract_video_data(video_element)
                 if video_data:
                     videos_data.append(video_data)
@@ -460,7 +508,7 @@ class EnhancedYouTubeAnalyzer(AdvancedYouTubeAnalyzer):
         """
         try:
             videos_url = f"{channel_url}/videos?view=0&sort=p"
-            self.driver.get(videos_url)
+            self.load_page(videos_url, "videos")
             time.sleep(2)
 
             video_elements = self.wait.until(EC.presence_of_all_elements_located(
@@ -469,6 +517,8 @@ class EnhancedYouTubeAnalyzer(AdvancedYouTubeAnalyzer):
 
             videos_data = []
             for index, video_element in enumerate(video_elements, start=1):
+                if self.budget.exhausted:
+                    break
                 vid_data = self.process_single_video(video_element, index)
                 if vid_data:
                     videos_data.append(vid_data)
@@ -486,6 +536,7 @@ class EnhancedYouTubeAnalyzer(AdvancedYouTubeAnalyzer):
         try:
             video_title_el = video_element.find_element(By.ID, "video-title")
             video_link = video_title_el.get_attribute("href")
+            self.charge_page(video_link)
 
             # Right-click and open in new tab via pyautogui
             actions = ActionChains(self.driver)
@@ -510,7 +561,7 @@ class EnhancedYouTubeAnalyzer(AdvancedYouTubeAnalyzer):
             channel_link = self.wait.until(EC.presence_of_element_located(
                 (By.CSS_SELECTOR, "#channel-name a")
             )).get_attribute("href")
-            self.driver.get(f"{channel_link}/about")
+            self.load_page(f"{channel_link}/about", "about")
             time.sleep(2)
 
             # Screenshot of About page
@@ -802,18 +853,28 @@ class AnalyzerGUI:
         self.videos_entry = ctk.CTkEntry(search_frame)
         self.videos_entry.grid(row=3, column=1, padx=5, pady=5)
 
+        # Run budget: page loads / thumbnail MB / minutes / KB/s, blank = unlimited
+        ctk.CTkLabel(search_frame, text="Budget (pages / MB / min / KB/s):").grid(row=4, column=0, padx=5, pady=5, sticky="e")
+        budget_frame = ctk.CTkFrame(search_frame)
+        budget_frame.grid(row=4, column=1, padx=5, pady=5)
+        self.budget_entries = []
+        for placeholder in ("pages", "MB", "min", "KB/s"):
+            entry = ctk.CTkEntry(budget_frame, width=50, placeholder_text=placeholder)
+            entry.pack(side=tk.LEFT, padx=1)
+            self.budget_entries.append(entry)
+
         # Output directory selector
         dir_button = ctk.CTkButton(
             search_frame, text="Select Output Directory", command=self.select_output_dir
         )
-        dir_button.grid(row=4, column=0, columnspan=2, pady=10)
+        dir_button.grid(row=5, column=0, columnspan=2, pady=10)
 
         # Start/Stop buttons
         self.start_button = ctk.CTkButton(search_frame, text="Start Analysis", command=self.start_analysis)
-        self.start_button.grid(row=5, column=0, pady=10)
+        self.start_button.grid(row=6, column=0, pady=10)
 
         self.stop_button = ctk.CTkButton(search_frame, text="Stop", command=self.stop_analysis)
-        self.stop_button.grid(row=5, column=1, pady=10)
+        self.stop_button.grid(row=6, column=1, pady=10)
 
         # ==== Right Frame: Progress & Status ====
         progress_frame = ctk.CTkFrame(self.root)
@@ -826,10 +887,13 @@ class AnalyzerGUI:
         # Status text
         self.status_text = tk.Text(progress_frame, height=18, width=50)
         self.status_text.grid(row=1, column=0, padx=5, pady=5, sticky="nsew")
+        self.status_view = LogView(self.root, self.status_text, timestamps=True)
+        self.status_view.level_selector(progress_frame).grid(row=3, column=0, padx=5, pady=5, sticky="w")
 
         # Thumbnail preview label
         self.preview_label = ctk.CTkLabel(progress_frame, text="")
         self.preview_label.grid(row=2, column=0, padx=5, pady=5)
+        self.preview = PreviewService(self.root, self.preview_label)
 
         # Make the second column (progress_frame) expand
         progress_frame.grid_rowconfigure(1, weight=1)
@@ -866,13 +930,18 @@ class AnalyzerGUI:
 
         num_channels = int(num_channels)
         num_videos = int(num_videos)
+        try:
+            budget = self.read_budget()
+        except ValueError:
+            messagebox.showerror("Error", "Budget fields must be numbers (or blank for unlimited).")
+            return
 
         # Disable start button while thread is active
         self.start_button.configure(state=tk.DISABLED)
 
         self.analysis_thread = threading.Thread(
             target=self.run_analysis,
-            args=(keyword, num_channels, num_videos),
+            args=(keyword, num_channels, num_videos, budget),
             daemon=True
         )
         self.analysis_thread.start()
@@ -892,10 +961,30 @@ class AnalyzerGUI:
             self.update_status("Analysis stopped by user.")
             self.start_button.configure(state=tk.NORMAL)
 
-    def run_analysis(self, keyword, num_channels, num_videos):
+    def read_budget(self):
+        """
+        A CrawlBudget from the budget fields (page loads, thumbnail MB,
+        minutes, KB/s); blank fields are unlimited. Raises ValueError.
+        """
+        values = [entry.get().strip() for entry in self.budget_entries]
+        pages, megabytes, minutes, kbps = (float(value) if value else None for value in values)
+        return CrawlBudget(
+            max_pages=int(pages) if pages is not None else None,
+            max_image_bytes=megabytes * 1024 * 1024 if megabytes is not None else None,
+            max_seconds=minutes * 60 if minutes is not None else None,
+            bytes_per_second=kbps * 1024 if kbps is not None else None,
+        )
+
+    def run_analysis(self, keyword, num_channels, num_videos, budget):
         """
-        Main analysis logic: search channels → analyze each.
+        Main analysis logic: search channels → analyze each. Once the budget
+        runs out the results so far are saved and the report is marked partial.
         """
+        REGISTRY.reset()
+        self.analyzer.budget = budget
+        exporter = MetricsExporter(REGISTRY, os.path.join(self.analyzer.output_dir, "metrics.json"),
+                                   port=DEFAULT_PORT, log=self.update_status).start()
+        all_data = []
         try:
             driver_ok = self.analyzer.setup_driver()
             if not driver_ok:
@@ -906,12 +995,14 @@ class AnalyzerGUI:
             channels = self.analyzer.search_channels(keyword, num_channels)
             self.update_status(f"Found {len(channels)} channel(s).")
 
-            self.progress_bar["maximum"] = len(channels)
-            all_data = []
+            self.set_progress(0, len(channels))
 
             for i, channel_url in enumerate(channels):
                 if self.analyzer.stop_flag:
                     break
+                if budget.exhausted:
+                    self.update_status(f"Budget exhausted ({budget.exhausted}): stopping analysis.")
+                    break
 
                 self.update_status(f"Analyzing channel {i+1}/{len(channels)}: {channel_url}")
                 channel_data, videos_data = self.analyzer.analyze_channel(channel_url, num_videos)
@@ -936,21 +1027,43 @@ class AnalyzerGUI:
                         }
                         all_data.append(merged)
 
-                self.progress_bar["value"] = i + 1
-                self.root.update()
+                self.set_progress(i + 1)
+                REGISTRY.inc("channels_analyzed_total")
 
             self.update_status("Analysis complete. Saving results...")
             self.save_results(all_data)
             self.update_status("All done!")
+        except BudgetExceeded as e:
+            self.update_status(f"Budget exhausted ({e}) before any channel was analyzed.")
         except Exception as e:
             self.update_status(f"Error: {str(e)}")
         finally:
+            self.write_report(budget, len(all_data))
+            exporter.stop()
             try:
                 if self.analyzer.driver:
                     self.analyzer.driver.quit()
             except:
                 pass
-            self.start_button.configure(state=tk.NORMAL)
+            self.root.after(0, lambda: self.start_button.configure(state=tk.NORMAL))
+
+    def write_report(self, budget, videos):
+        """
+        Saves analysis_report.json in the output directory: what the run
+        used of its budget and whether it stopped early (partial).
+        """
+        usage = budget.report()
+        report = {
+            "partial": bool(usage["exhausted"] or usage["hosts_over_budget"] or self.analyzer.stop_flag),
+            "videos": videos,
+            "budget": usage,
+        }
+        os.makedirs(self.analyzer.output_dir, exist_ok=True)
+        report_path = os.path.join(self.analyzer.output_dir, "analysis_report.json")
+        with open(report_path, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+        if report["partial"]:
+            self.update_status(f"Partial report written to {report_path}")
 
     def save_results(self, all_data):
         """
@@ -1016,28 +1129,32 @@ class AnalyzerGUI:
         if all_data and all_data[0].get("thumbnail_path"):
             self.update_preview(all_data[0]["thumbnail_path"])
 
+    def set_progress(self, value, maximum=None):
+        """
+        Moves the progress bar. Safe to call from the analysis thread: the
+        change is handed to the Tk loop instead of touching the widget here.
+        """
+        def apply():
+            if maximum is not None:
+                self.progress_bar["maximum"] = maximum
+            self.progress_bar["value"] = value
+        self.root.after(0, apply)
+
     def update_status(self, message):
         """
-        Writes a timestamped message to the status_text box in the GUI.
+        Queues a timestamped message for the status_text box. Safe to call from
+        the analysis thread; the Tk loop shows queued lines in batches.
         """
-        self.status_text.insert(tk.END, f"{datetime.now().strftime('%H:%M:%S')} - {message}\n")
-        self.status_text.see(tk.END)
-        self.root.update()
+        self.status_view.push(message)
 
     def update_preview(self, image_path):
         """
-        Displays a small thumbnail preview in the GUI.
+        Displays a small thumbnail preview in the GUI. Safe to call from the
+        analysis thread: decoding runs in the background and the label is
+        updated from the Tk main loop.
         """
-        try:
-            if not os.path.isfile(image_path):
-                return
-            image = Image.open(image_path)
-            image.thumbnail((200, 200))
-            photo = ImageTk.PhotoImage(image)
-            self.preview_label.configure(image=photo, text="")
-            self.preview_label.image = photo
-        except Exception as e:
-            logging.error(f"Error updating preview: {str(e)}")
+        if os.path.isfile(image_path):
+            self.preview.show(image_path)
 
     def run(self):
         self.root.mainloop()
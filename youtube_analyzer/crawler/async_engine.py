@@ -0,0 +1,424 @@
+import asyncio
+import hashlib
+import os
+import random
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+from crawler.budget import BudgetExceeded
+from crawler.download import PartialDownload, IncompleteDownload, DEFAULT_CHUNK_SIZE
+from crawler.metrics import REGISTRY
+from crawler.ratelimit import HostRateLimiter, RetryPolicy, RETRY_STATUSES, THROTTLE_STATUSES, parse_retry_after
+from crawler.state import conditional_headers, UNCHANGED
+from crawler.urls import VisitedSet, link_kind, content_kind, PAGE, IMAGE, SKIP
+
+try:
+    import aiohttp
+except ImportError:  # optional: only needed when the asyncio engine is selected
+    aiohttp = None
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)",
+    "Mozilla/5.0 (X11; Linux x86_64)",
+]
+
+
+class AsyncCrawlEngine:
+    """
+    Single-threaded asyncio crawler for thousands of concurrent requests.
+
+    One aiohttp session with a pooled connector is shared by every request,
+    bounded by a global concurrency limit and a per-host limit. Page and
+    image bodies are streamed. Link and image discovery is the caller's
+    function:
+
+        extract_page(url, html) -> (absolute links, absolute image URLs)
+
+    Images are saved into store (a ContentStore), so each distinct file is
+    written once. accept_link(link, page_url) filters which links are followed, on_image(path)
+    is called after every saved image and log(message) for progress lines.
+    Pass visited to share the already-crawled set with the caller, and state
+    (a CrawlStateStore) to record progress and downloaded images on disk;
+    requests are then conditional on the previous crawl's validators and
+    self.changes counts new, changed and unchanged resources. With seeder (a
+    SiteSeeder) robots.txt disallow rules and Crawl-delay are honoured.
+    Requests go through limiter (a HostRateLimiter) and are retried per
+    retry_policy; both default to no rate limit and 3 retries. A budget (a
+    CrawlBudget) is charged for every page and streamed chunk, and the crawl
+    stops like a stop_event once it is exhausted. Requests, latencies, bytes
+    and queue depth are recorded in metrics (a MetricsRegistry). Links to
+    hosts a router (see crawler.shard) does not own are forwarded.
+    on_saved(saved) receives the store's result for each downloaded image
+    (e.g. ImageClassifier.submit). Pages a renderer (a PageRenderer) thinks
+    incomplete are rendered on a worker thread, and state, store and
+    part-file writes run on worker threads too so SQLite commits and disk
+    I/O never stall the event loop. Pages over max_page_bytes are cut there
+    with a warning. Setting stop_event stops
+    the crawl after in-flight requests finish; run() then returns the tasks
+    that were never started.
+    """
+
+    def __init__(self, extract_page, store, accept_link=None, on_image=None, log=print,
+                 stop_event=None, visited=None, state=None, seeder=None, limiter=None, retry_policy=None,
+                 budget=None, metrics=REGISTRY, router=None, renderer=None, on_saved=None,
+                 max_concurrency=500, per_host=8, timeout=15, chunk_size=64 * 1024,
+                 max_page_bytes=5 * 1024 * 1024, download_chunk_size=DEFAULT_CHUNK_SIZE, attempts=3):
+        if aiohttp is None:
+            raise RuntimeError("The asyncio engine needs aiohttp: pip install aiohttp")
+        self.extract_page = extract_page
+        self.store = store
+        self.accept_link = accept_link
+        self.on_image = on_image
+        self.log = log
+        self.stop_event = stop_event
+        self.state = state
+        self.seeder = seeder
+        self.limiter = limiter or HostRateLimiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.budget = budget
+        self.metrics = metrics
+        self.router = router
+        self.renderer = renderer
+        self.on_saved = on_saved
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.max_page_bytes = max_page_bytes
+        self.download_chunk_size = download_chunk_size
+        self.attempts = attempts
+
+        self.visited = visited if visited is not None else VisitedSet()
+        self.seen_images = set()
+        self.pages_fetched = 0
+        self.images_saved = 0
+        self.changes = Counter()
+
+    def run(self, tasks):
+        """
+        Crawl (url, remaining_depth) tasks, blocking the calling thread until
+        done. Returns the tasks left unvisited if stop_event was set.
+        """
+        return asyncio.run(self.crawl(tasks))
+
+    def _stopped(self):
+        if self.budget is not None and self.budget.exhausted:
+            return True
+        return self.stop_event is not None and self.stop_event.is_set()
+
+    async def _charge(self, url, nbytes, image=False):
+        self.metrics.inc("bytes_downloaded_total", nbytes, kind="image" if image else "page")
+        if self.budget is not None:
+            wait = self.budget.charge(url, nbytes, image)
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+    def _headers(self):
+        return {"User-Agent": random.choice(USER_AGENTS)}
+
+    async def crawl(self, tasks):
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.per_host,
+                                         ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._queue = asyncio.Queue()
+        self._image_tasks = set()
+        self.pending = []
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            self._session = session
+            for task in tasks:
+                self._queue.put_nowait(task)
+
+            workers = [asyncio.create_task(self._page_worker()) for _ in range(self.max_concurrency)]
+            await self._queue.join()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            if self._image_tasks:
+                await asyncio.gather(*self._image_tasks, return_exceptions=True)
+
+        self.log(f"Async crawl finished: {self.pages_fetched} page(s), {self.images_saved} image(s).")
+        return self.pending
+
+    async def _page_worker(self):
+        while True:
+            url, depth = await self._queue.get()
+            self.metrics.set_gauge("frontier_queued", self._queue.qsize())
+            try:
+                if self._stopped():
+                    self.pending.append((url, depth))
+                else:
+                    await self._crawl_page(url, depth)
+            except Exception as e:
+                self.log(f"Error: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _crawl_page(self, url, depth):
+        if depth == 0 or url in self.visited:
+            return
+        if self.budget is not None and not self.budget.allow_page(url):
+            if self.budget.exhausted:
+                self.pending.append((url, depth))
+            return
+        if not self.visited.add(url):
+            return
+        if self.state:
+            await asyncio.to_thread(self.state.start, url, depth)
+        if self.seeder:
+            if not await asyncio.to_thread(self.seeder.allowed, url):
+                self.log(f"Disallowed by robots.txt: {url}")
+                if self.state:
+                    await asyncio.to_thread(self.state.finish, url, False)
+                return
+            pause = self.seeder.reserve(url)
+            if pause > 0:
+                await asyncio.sleep(pause)
+        self.log(f"Scraping: {url}")
+
+        page = await self._fetch_page(url)
+        if page is None:
+            if self.state and not self._stopped():
+                await asyncio.to_thread(self.state.finish, url, False)
+            return
+        links, images = page
+        self.pages_fetched += 1
+        self.metrics.inc("pages_fetched_total", host=urlparse(url).netloc)
+        links, linked_images = self._screen_links(links, url)
+
+        for img_url in images + linked_images:
+            if img_url not in self.seen_images:
+                self.seen_images.add(img_url)
+                task = asyncio.create_task(self._download_image(img_url))
+                self._image_tasks.add(task)
+                task.add_done_callback(self._image_tasks.discard)
+
+        if depth > 1:
+            foreign, queued = [], []
+            for link in links:
+                if link not in self.visited:
+                    if self.router is not None and not self.router.owns(link):
+                        foreign.append((link, depth - 1))
+                        continue
+                    self._queue.put_nowait((link, depth - 1))
+                    queued.append((link, depth - 1))
+            if queued and self.state:
+                await asyncio.to_thread(self.state.enqueue_many, queued)
+            if foreign:
+                self.router.forward(foreign)
+        if self.state:
+            await asyncio.to_thread(self.state.finish, url)
+
+    async def _request(self, url, headers):
+        """
+        GET url through the rate limiter, retrying transient failures. Returns
+        the response (use it with async with) or raises the last error.
+        """
+        policy = self.retry_policy
+        host = urlparse(url).netloc
+        for attempt in range(policy.retries + 1):
+            if attempt:
+                self.metrics.inc("http_retries_total", host=host)
+            wait = self.limiter.reserve(url)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            start = time.perf_counter()
+            try:
+                response = await self._session.get(url, headers=headers)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                self.metrics.inc("http_requests_total", host=host, status="error")
+                if attempt == policy.retries:
+                    raise
+                await asyncio.sleep(policy.backoff(attempt))
+                continue
+            self.metrics.observe("http_request_seconds", time.perf_counter() - start, host=host)
+            self.metrics.inc("http_requests_total", host=host, status=str(response.status))
+
+            if response.status not in RETRY_STATUSES:
+                self.limiter.reward(url)
+                return response
+            retry_after = pause = parse_retry_after(response.headers.get("Retry-After"))
+            if response.status in THROTTLE_STATUSES:
+                pause = self.limiter.penalize(url, retry_after)
+            if attempt == policy.retries:
+                return response
+            if policy.gives_up(retry_after):
+                self.log(f"Not retrying {url}: HTTP {response.status} asks to wait {retry_after:.0f}s")
+                return response
+            response.release()
+            self.log(f"Retrying {url} after HTTP {response.status}")
+            await asyncio.sleep(policy.backoff(attempt, pause))
+
+    def _screen_links(self, links, base_url):
+        """(pages, images) among the accepted links, by extension; see ImageCrawler._screen_links."""
+        pages, images = [], []
+        for link in links:
+            if self.accept_link is not None and not self.accept_link(link, base_url):
+                continue
+            kind = link_kind(link)
+            if kind == PAGE:
+                pages.append(link)
+            elif kind == IMAGE:
+                images.append(link)
+            else:
+                self.metrics.inc("links_skipped_total", reason="extension")
+        return pages, images
+
+    async def _fetch_page(self, url):
+        """
+        (links, images) for a page, or None on failure. With a state store the
+        request is conditional and unchanged pages reuse the saved results.
+        """
+        previous = await asyncio.to_thread(self.state.resource, url) if self.state else None
+        headers = self._headers()
+        headers.update(conditional_headers(previous))
+        async with self._semaphore:
+            try:
+                async with await self._request(url, headers) as response:
+                    if response.status == 304 and previous and previous["links"] is not None:
+                        self.changes[UNCHANGED] += 1
+                        return previous["links"], previous["images"]
+                    response.raise_for_status()
+                    kind = content_kind(response.headers.get("Content-Type"))
+                    if kind != PAGE:
+                        response.close()  # drop the connection rather than read the body
+                        self.metrics.inc("pages_skipped_total", reason=kind)
+                        if kind == SKIP:
+                            self.log(f"Skipped non-HTML: {url} ({response.headers.get('Content-Type')})")
+                        return [], [url] if kind == IMAGE else []
+                    body = bytearray()
+                    async for chunk in response.content.iter_chunked(self.chunk_size):
+                        await self._charge(url, len(chunk))
+                        body.extend(chunk)
+                        if len(body) >= self.max_page_bytes:
+                            if not response.content.at_eof():
+                                self.metrics.inc("pages_truncated_total", host=urlparse(url).netloc)
+                                self.log(f"Warning: page over {self.max_page_bytes // 1024} KB, "
+                                         f"only its start is used: {url}")
+                            break
+                    base_url = str(response.url)  # after redirects
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                self.log(f"Failed to fetch: {url}")
+                return None
+            except BudgetExceeded:
+                return None
+
+        html_content = bytes(body)
+        sha1 = hashlib.sha1(html_content).hexdigest()
+        if previous and previous["sha1"] == sha1 and previous["links"] is not None:
+            links, images = previous["links"], previous["images"]
+        else:
+            links, images = self.extract_page(base_url, html_content)
+            if self.renderer is not None:
+                links, images = await asyncio.to_thread(self.renderer.improve, url, html_content, links, images,
+                                                        self.extract_page)
+        if self.state:
+            self.changes[await asyncio.to_thread(self.state.record_resource, url, etag, last_modified, sha1,
+                                                 links, images)] += 1
+        return links, images
+
+    async def _fetch_resumable(self, url, headers):
+        """
+        Stream url into the store's partial file for it (see
+        crawler.download.PartialDownload), resuming with Range after a
+        dropped connection or an earlier run. Returns the finished download
+        plus "status" and "headers", or None if the part had to be restarted
+        too often.
+        """
+        for attempt in range(self.attempts):
+            part = await asyncio.to_thread(PartialDownload, url, self.store.partial_path(url), sha1=True)
+            try:
+                async with await self._request(url, part.headers(headers)) as response:
+                    if response.status == 304:
+                        return {"status": 304, "headers": response.headers}
+                    if not (response.status == 416 and part.offset):
+                        response.raise_for_status()
+                    if not await asyncio.to_thread(part.begin, response.status, response.headers):
+                        continue
+                    if response.status != 416:
+                        async for chunk in response.content.iter_chunked(self.download_chunk_size):
+                            await self._charge(url, len(chunk), image=True)
+                            await asyncio.to_thread(part.write, chunk)
+                    return dict(await asyncio.to_thread(part.finish), status=response.status, headers=response.headers)
+            except (aiohttp.ClientPayloadError, aiohttp.ClientConnectionError, asyncio.TimeoutError,
+                    IncompleteDownload):
+                part.abort()
+                if attempt + 1 == self.attempts:
+                    raise
+                self.log(f"Download of {url} interrupted; resuming")
+            except BaseException:
+                part.abort()
+                raise
+        self.log(f"Failed to download: {url}")
+        return None
+
+    def _previous_image(self, url):
+        """The last crawl's record of url if its content is still stored (or was discarded), else None."""
+        previous = self.state.resource(url)
+        if previous is None:
+            return None
+        previous["discarded"] = self.state.is_discarded(previous["sha1"])
+        if not (previous["discarded"] or self.store.has_object(previous["sha1"])):
+            return None
+        return previous
+
+    async def _download_image(self, url):
+        if self._stopped():
+            return
+        if self.state and await asyncio.to_thread(self.state.has_image, url):
+            return
+        if self.budget is not None and not self.budget.allow_image(url):
+            return
+        previous = await asyncio.to_thread(self._previous_image, url) if self.state else None
+        headers = self._headers()
+        headers.update(conditional_headers(previous))
+        async with self._semaphore:
+            try:
+                result = await self._fetch_resumable(url, headers)
+                if result is None:
+                    return
+                if result["status"] == 304:
+                    if previous is None:
+                        self.log(f"Failed to download: {url} (304 with nothing stored)")
+                        return
+                    self.changes[UNCHANGED] += 1
+                    if previous["discarded"]:
+                        return
+                    saved = await asyncio.to_thread(self.store.link, url, previous["sha1"])
+                    await asyncio.to_thread(self.state.record_image, url, saved["path"], saved["sha1"],
+                                            saved["bytes"])
+                    return
+                if self.state and await asyncio.to_thread(self.state.is_discarded, result["sha1"]):
+                    await asyncio.to_thread(os.remove, result["path"])
+                    self.log(f"Discarded earlier, not saved: {url}")
+                    return
+                saved = await asyncio.to_thread(self.store.commit_file, url, result["path"], result["sha1"],
+                                                result["bytes"], result["headers"].get("Content-Type"))
+                etag = result["headers"].get("ETag")
+                last_modified = result["headers"].get("Last-Modified")
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+                self.log(f"Failed to download: {url}")
+                return
+            except BudgetExceeded as e:
+                self.log(f"Budget reached ({e}), not downloaded: {url}")
+                return
+
+        self.images_saved += 1
+        self.metrics.inc("images_saved_total", host=urlparse(url).netloc)
+        if self.state:
+            await asyncio.to_thread(self.state.record_image, url, saved["path"], saved["sha1"], saved["bytes"])
+            self.changes[await asyncio.to_thread(self.state.record_resource, url, etag, last_modified,
+                                                 saved["sha1"])] += 1
+        if self.on_saved:
+            self.on_saved(saved)
+        if saved["duplicate"]:
+            self.log(f"Already stored: {url} -> {saved['path']}")
+        else:
+            self.log(f"Downloaded: {saved['path']}")
+        if self.on_image:
+            self.on_image(saved["path"])
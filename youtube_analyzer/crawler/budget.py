@@ -0,0 +1,142 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class BudgetExceeded(Exception):
+    """Raised by CrawlBudget.charge() when a download would overrun a budget."""
+
+
+class TokenBucket:
+    """Byte-rate bucket: reserve(n) books n bytes and returns the seconds to wait."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= amount
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+
+class CrawlBudget:
+    """
+    Hard limits for one crawl, globally and per host.
+
+    max_pages, max_image_bytes and max_seconds end the whole crawl once
+    used up: exhausted is set to the reason and callers should stop and
+    write a partial report. host_max_pages and host_max_image_bytes only
+    stop the host that ran out. bytes_per_second and host_bytes_per_second
+    cap bandwidth through token buckets that streaming readers charge
+    chunk by chunk. None means unlimited everywhere. Thread-safe.
+    """
+
+    def __init__(self, max_pages=None, max_image_bytes=None, max_seconds=None, bytes_per_second=None,
+                 host_max_pages=None, host_max_image_bytes=None, host_bytes_per_second=None):
+        self.max_pages = max_pages
+        self.max_image_bytes = max_image_bytes
+        self.max_seconds = max_seconds
+        self.host_max_pages = host_max_pages
+        self.host_max_image_bytes = host_max_image_bytes
+        self.host_bytes_per_second = host_bytes_per_second
+
+        self.started = time.monotonic()
+        self.exhausted = None
+        self.pages = 0
+        self.image_bytes = 0
+        self.total_bytes = 0
+        self.host_pages = {}
+        self.host_image_bytes = {}
+        self.hosts_over_budget = set()
+        self._bucket = TokenBucket(bytes_per_second) if bytes_per_second else None
+        self._host_buckets = {}
+        self._lock = threading.Lock()
+
+    def _expire(self, reason):
+        if self.exhausted is None:
+            self.exhausted = reason
+
+    def _check_time(self):
+        if self.max_seconds and time.monotonic() - self.started >= self.max_seconds:
+            self._expire("max duration")
+
+    def allow_page(self, url):
+        """Count a page fetch against the budgets; False if it must not be fetched."""
+        host = urlparse(url).netloc
+        with self._lock:
+            self._check_time()
+            if self.max_pages is not None and self.pages >= self.max_pages:
+                self._expire("max pages")
+            if self.exhausted or host in self.hosts_over_budget:
+                return False
+            if self.host_max_pages is not None and self.host_pages.get(host, 0) >= self.host_max_pages:
+                self.hosts_over_budget.add(host)
+                return False
+            self.pages += 1
+            self.host_pages[host] = self.host_pages.get(host, 0) + 1
+            return True
+
+    def allow_image(self, url):
+        """False once the crawl or url's host has no image budget left."""
+        with self._lock:
+            self._check_time()
+            return not self.exhausted and urlparse(url).netloc not in self.hosts_over_budget
+
+    def charge(self, url, nbytes, image=False):
+        """
+        Account for nbytes read from url and return the seconds to wait to
+        stay under the bandwidth ceilings. Raises BudgetExceeded before an
+        image chunk would overrun an image byte budget, and for any read once
+        the duration or image byte budget is used up (pages already started
+        when max_pages runs out are allowed to finish).
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            self._check_time()
+            if self.exhausted in ("max duration", "max image bytes"):
+                raise BudgetExceeded(self.exhausted)
+            if image:
+                if self.max_image_bytes is not None and self.image_bytes + nbytes > self.max_image_bytes:
+                    self._expire("max image bytes")
+                    raise BudgetExceeded(self.exhausted)
+                host_bytes = self.host_image_bytes.get(host, 0) + nbytes
+                if self.host_max_image_bytes is not None and host_bytes > self.host_max_image_bytes:
+                    self.hosts_over_budget.add(host)
+                    raise BudgetExceeded(f"max image bytes for {host}")
+                self.image_bytes += nbytes
+                self.host_image_bytes[host] = host_bytes
+            self.total_bytes += nbytes
+
+            wait = self._bucket.reserve(nbytes) if self._bucket else 0.0
+            if self.host_bytes_per_second:
+                bucket = self._host_buckets.get(host)
+                if bucket is None:
+                    bucket = self._host_buckets[host] = TokenBucket(self.host_bytes_per_second)
+                wait = max(wait, bucket.reserve(nbytes))
+            if self.max_seconds and time.monotonic() + wait - self.started >= self.max_seconds:
+                # The bandwidth wait alone would run past the deadline
+                self._expire("max duration")
+                raise BudgetExceeded(self.exhausted)
+            return wait
+
+    def consume(self, url, nbytes, image=False):
+        """charge() and sleep off the bandwidth wait (for thread-based readers)."""
+        wait = self.charge(url, nbytes, image)
+        if wait > 0:
+            time.sleep(wait)
+
+    def report(self):
+        with self._lock:
+            return {
+                "exhausted": self.exhausted,
+                "pages": self.pages,
+                "image_bytes": self.image_bytes,
+                "total_bytes": self.total_bytes,
+                "seconds": round(time.monotonic() - self.started, 1),
+                "hosts_over_budget": sorted(self.hosts_over_budget),
+            }
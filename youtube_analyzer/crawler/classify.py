@@ -0,0 +1,213 @@
+import importlib
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from crawler.metrics import REGISTRY
+
+DEFAULT_BATCH_SIZE = 16
+DEFAULT_INPUT_SIZE = 224
+BATCH_WAIT = 0.5  # seconds to wait for a batch to fill before classifying what there is
+_STOP = object()
+
+_predict = None  # the loaded model; only ever set in the worker process
+
+
+def read_labels(labels):
+    """Class names in model output order: a list, or a text file with one per line."""
+    if isinstance(labels, str):
+        with open(labels, encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+    return list(labels or ())
+
+
+def load_model(model, labels=(), input_size=DEFAULT_INPUT_SIZE):
+    """
+    predict(paths) -> [(label, score) or None per path] for a model spec:
+    an .onnx file (onnxruntime), a Keras model file or SavedModel folder
+    (TensorFlow), or "module:factory" where factory(labels) returns such a
+    predict. The ML libraries are imported here, so this should only run
+    in the classifier's worker process.
+    """
+    labels = read_labels(labels)
+    if ":" in model and not os.path.exists(model):
+        module_name, factory = model.split(":", 1)
+        return getattr(importlib.import_module(module_name), factory)(labels)
+
+    import numpy as np
+    from PIL import Image
+
+    if model.lower().endswith(".onnx"):
+        import onnxruntime
+        session = onnxruntime.InferenceSession(model, providers=["CPUExecutionProvider"])
+        model_input = session.get_inputs()[0]
+        shape = model_input.shape
+        channels_first = shape[1] in (1, 3)
+        height, width = shape[2:4] if channels_first else shape[1:3]
+
+        def run(batch):
+            return session.run(None, {model_input.name: batch})[0]
+    else:
+        import tensorflow as tf
+        keras_model = tf.keras.models.load_model(model, compile=False)
+        _, height, width, _ = keras_model.input_shape
+        channels_first = False
+
+        def run(batch):
+            return keras_model.predict(batch, verbose=0)
+
+    # Dynamic dimensions come through as None or a name
+    height = height if isinstance(height, int) else input_size
+    width = width if isinstance(width, int) else input_size
+
+    def load(path):
+        with Image.open(path) as image:
+            array = np.asarray(image.convert("RGB").resize((width, height)), dtype=np.float32) / 255.0
+        return array.transpose(2, 0, 1) if channels_first else array
+
+    def predict(paths):
+        arrays, readable = [], []
+        for index, path in enumerate(paths):
+            try:
+                arrays.append(load(path))
+                readable.append(index)
+            except (OSError, ValueError):
+                pass  # not an image PIL can read (e.g. SVG): left unlabelled
+        results = [None] * len(paths)
+        if arrays:
+            for index, row in zip(readable, run(np.stack(arrays))):
+                best = int(row.argmax())
+                results[index] = (labels[best] if best < len(labels) else str(best), float(row[best]))
+        return results
+
+    return predict
+
+
+def _init_worker(model, labels, input_size):
+    global _predict
+    _predict = load_model(model, labels, input_size)
+
+
+def _classify(paths):
+    return _predict(paths)
+
+
+class ImageClassifier:
+    """
+    Labels saved images with a small local model, in batches, on the CPU.
+
+    submit() only queues the store's result for an image; a thread groups
+    up to batch_size of them (or whatever arrived within BATCH_WAIT) and
+    sends the batch to one worker process, which loads the model with
+    load_model() the first time a batch is ready. Crawls that don't
+    classify never start the process or import an ML library.
+
+    Each label is appended to the store's manifest (see
+    ContentStore.annotate). Images labelled with one of the discard classes
+    at discard_score or more are deleted from the output folder and the
+    store (ContentStore.discard) and passed to on_discard(saved, label). Content
+    already labelled (same sha1) is not classified again. If the model
+    can't be loaded the stage logs the error and stops; the crawl goes on.
+    wait() blocks until everything submitted is labelled, close() also
+    stops the worker.
+    """
+
+    def __init__(self, model, store, labels=(), discard=(), discard_score=0.5, batch_size=DEFAULT_BATCH_SIZE,
+                 input_size=DEFAULT_INPUT_SIZE, log=print, metrics=REGISTRY, on_discard=None):
+        self.model = model
+        self.store = store
+        self.labels = read_labels(labels)
+        self.discard = {label.strip() for label in discard if label.strip()}
+        self.discard_score = discard_score
+        self.batch_size = max(1, int(batch_size))
+        self.input_size = input_size
+        self.log = log
+        self.metrics = metrics
+        self.on_discard = on_discard
+        self.failed = False
+        self.known = {}  # sha1 -> (label, score)
+
+        self._queue = queue.Queue()
+        self._executor = None
+        self._thread = threading.Thread(target=self._batcher, name="image-classifier", daemon=True)
+        self._thread.start()
+
+    def submit(self, saved):
+        """Queue a saved image ({"url", "sha1", "path", ...} from the ContentStore)."""
+        if not self.failed:
+            self._queue.put(saved)
+
+    def wait(self):
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _batcher(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            batch, stopping = [item], False
+            deadline = time.monotonic() + BATCH_WAIT
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                self._label_batch(batch)
+            except Exception as e:
+                self.log(f"Error: classification failed ({e}); images are no longer classified.")
+                self.failed = True
+            finally:
+                for _ in range(len(batch) + stopping):
+                    self._queue.task_done()
+            if stopping:
+                return
+
+    def _label_batch(self, batch):
+        if self.failed:
+            return
+        new = list({saved["sha1"]: saved["path"] for saved in batch if saved["sha1"] not in self.known}.items())
+        if new:
+            if self._executor is None:
+                self.log(f"Loading classification model {self.model}")
+                self._executor = ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn"),
+                                                     initializer=_init_worker,
+                                                     initargs=(self.model, self.labels, self.input_size))
+            start = time.perf_counter()
+            results = self._executor.submit(_classify, [path for _, path in new]).result()
+            self.metrics.observe("classify_batch_seconds", time.perf_counter() - start)
+            for (sha1, _), result in zip(new, results):
+                self.known[sha1] = result
+        for saved in batch:
+            result = self.known.get(saved["sha1"])
+            if result is not None:
+                self._apply(saved, *result)
+
+    def _apply(self, saved, label, score):
+        discarded = label in self.discard and score >= self.discard_score
+        if discarded:
+            self.store.discard(saved["url"], saved["sha1"], saved["path"], label=label, score=round(score, 4))
+            if self.on_discard is not None:
+                self.on_discard(saved, label)
+        else:
+            self.store.annotate(saved["url"], saved["sha1"], saved["path"], label=label, score=round(score, 4),
+                                discarded=False)
+        self.metrics.inc("images_classified_total", label=label)
+        if discarded:
+            self.metrics.inc("images_discarded_total", label=label)
+            self.log(f"Discarded ({label} {score:.2f}): {saved['path']}")
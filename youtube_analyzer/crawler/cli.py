@@ -0,0 +1,232 @@
+"""
+Headless image crawler.
+
+    python -m crawler sites.txt --depth 3 --output out --engine asyncio
+
+An unfinished crawl in the output folder is resumed unless --restart is
+given. With --processes N the hosts are split between N crawler processes
+(see crawler.shard), each with its own folder under the output folder.
+Seeds come from files (one URL per line, # comments) and/or URLs on the
+command line. Settings come from a JSON config file (keys of
+crawler.engine.DEFAULT_CONFIG) overridden by flags. Nothing here imports
+Tk or any ML library (--classify loads its model in a separate process),
+so it runs on a bare server.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+
+from crawler.engine import ImageCrawler, DEFAULT_CONFIG, make_config
+from crawler.frontier import PRIORITIES
+from crawler.logsink import LogPipeline
+from crawler.shard import run_sharded
+
+EXIT_OK = 0
+EXIT_PARTIAL = 3
+
+HOST_RE = re.compile(r"^[A-Za-z0-9-]+(\.[A-Za-z0-9-]+)*(:\d+)?$")
+SEED_FILE_EXTENSIONS = {".txt", ".csv", ".lst", ".list", ".json"}
+
+
+def _looks_like_host(value):
+    """example.com or localhost:8000, but not sites.txt or seeds/list."""
+    return bool(HOST_RE.match(value)) and os.path.splitext(value)[1].lower() not in SEED_FILE_EXTENSIONS
+
+
+def read_seeds(sources):
+    """
+    URLs from seed files, literal URLs and bare host names, in order and
+    without repeats. Anything else that is not an existing file raises
+    ValueError rather than being crawled as https://<typo>.
+    """
+    seeds = []
+    for source in sources:
+        if "://" in source:
+            seeds.append(source)
+            continue
+        if not os.path.isfile(source):
+            if not _looks_like_host(source):
+                raise ValueError(f"seed file not found: {source}")
+            seeds.append("https://" + source)
+            continue
+        with open(source, encoding="utf-8") as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    seeds.append(line if "://" in line else "https://" + line)
+    return list(dict.fromkeys(seeds))
+
+
+def _patterns(value):
+    return [pattern.strip() for pattern in value.split(",") if pattern.strip()]
+
+
+def _labels(value):
+    # A labels file, or the class names themselves
+    return value if os.path.isfile(value) else _patterns(value)
+
+
+def _kilobytes(value):
+    return int(float(value) * 1024)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m crawler", description="Crawl sites and download their images.")
+    parser.add_argument("seeds", nargs="+", help="seed URLs, host names, or files with one URL per line")
+    parser.add_argument("--config", help="JSON file with crawl settings (flags override it)")
+    parser.add_argument("-o", "--output", help="output folder for images, state and reports")
+    parser.add_argument("-d", "--depth", type=int)
+    parser.add_argument("--include", type=_patterns,
+                        help="comma-separated: follow only links matching one (text, glob, re:, domain:, depth<=N)")
+    parser.add_argument("--exclude", type=_patterns, help="comma-separated: never follow links matching one")
+    parser.add_argument("--scope", choices=["host", "domain"], dest="link_scope",
+                        help="only follow links on the host/domain of the page they are on")
+    parser.add_argument("--engine", choices=["threads", "asyncio"])
+    parser.add_argument("--threads", type=int, help="worker threads for the threads engine")
+    parser.add_argument("--connections", type=int, dest="async_connections", help="asyncio: total connections")
+    parser.add_argument("--per-host", type=int, dest="async_per_host", help="asyncio: connections per host")
+    parser.add_argument("--priority", choices=list(PRIORITIES))
+    parser.add_argument("--delay", type=float, dest="request_delay", help="seconds between requests to one host")
+    parser.add_argument("--retries", type=int)
+    parser.add_argument("--chunk-kb", type=_kilobytes, dest="download_chunk_size", metavar="KB",
+                        help="read/write size for image downloads (default 1024)")
+    parser.add_argument("--sitemaps", action="store_true", default=None, help="seed from sitemaps, honour robots.txt")
+    parser.add_argument("--bloom", action="store_true", default=None, dest="bloom_visited",
+                        help="bounded-memory visited set for very large crawls")
+    parser.add_argument("--no-validate", action="store_false", default=None, dest="validate_seeds",
+                        help="skip the reachability check of each seed")
+    parser.add_argument("--render", action="store_true", default=None,
+                        help="render JavaScript-built pages in headless Chrome when plain HTTP finds too little")
+    parser.add_argument("--browsers", type=int, dest="render_browsers", help="headless browsers for --render")
+    parser.add_argument("--metrics-port", type=int, help="Prometheus endpoint port on localhost, 0 = off")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="crawler processes; hosts are assigned to them by hash")
+
+    budget = parser.add_argument_group("budgets (unlimited when omitted)")
+    budget.add_argument("--max-pages", type=int)
+    budget.add_argument("--max-image-mb", type=float)
+    budget.add_argument("--max-minutes", type=float)
+    budget.add_argument("--kbps", type=float, help="total bandwidth ceiling")
+    budget.add_argument("--host-max-pages", type=int)
+    budget.add_argument("--host-max-image-mb", type=float)
+    budget.add_argument("--host-kbps", type=float)
+
+    classify = parser.add_argument_group("image classification (off unless --classify is given)")
+    classify.add_argument("--classify", dest="classify_model", metavar="MODEL",
+                          help="label saved images: .onnx file, Keras model, or module:factory")
+    classify.add_argument("--labels", type=_labels, dest="classify_labels",
+                          help="class names in model output order (comma-separated or a file, one per line)")
+    classify.add_argument("--discard", type=_patterns, dest="classify_discard",
+                          help="comma-separated labels whose images are deleted")
+    classify.add_argument("--discard-score", type=float, dest="classify_discard_score",
+                          help="minimum model score for --discard (default 0.5)")
+    classify.add_argument("--classify-batch", type=int, dest="classify_batch", help="images per inference batch")
+
+    parser.add_argument("--restart", action="store_true",
+                        help="discard an unfinished crawl in the output folder instead of resuming it")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print warnings and errors")
+    return parser
+
+
+def config_from_args(args):
+    """Crawl config: defaults, then the config file, then flags."""
+    config = {}
+    if args.config:
+        with open(args.config, encoding="utf-8") as f:
+            config.update(json.load(f))
+    for key in DEFAULT_CONFIG:
+        value = getattr(args, key, None)
+        if value is not None:
+            config[key] = value
+    if args.metrics_port is not None:
+        config["metrics_port"] = args.metrics_port or None
+
+    budget = dict(config.get("budget") or {})
+    scaled = {
+        "max_pages": (args.max_pages, 1),
+        "max_image_bytes": (args.max_image_mb, 1024 * 1024),
+        "max_seconds": (args.max_minutes, 60),
+        "bytes_per_second": (args.kbps, 1024),
+        "host_max_pages": (args.host_max_pages, 1),
+        "host_max_image_bytes": (args.host_max_image_mb, 1024 * 1024),
+        "host_bytes_per_second": (args.host_kbps, 1024),
+    }
+    for key, (value, scale) in scaled.items():
+        if value is not None:
+            budget[key] = value * scale
+    config["budget"] = budget
+    return make_config(config)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        config = config_from_args(args)
+        seeds = read_seeds(args.seeds)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    os.makedirs(config["output"], exist_ok=True)
+    logger = LogPipeline(os.path.join(config["output"], "crawl_log.jsonl"))
+
+    def log(message):
+        # Everything goes to the log file; the console gets the same capped sample as the GUI
+        logger.log(message)
+        for record in logger.drain_gui():
+            if not args.quiet or record["level"] in ("WARNING", "ERROR"):
+                print(record["msg"], flush=True)
+
+    if args.processes > 1:
+        stop_event = threading.Event()
+        try:
+            report = _run_interruptible(
+                lambda: run_sharded(config, seeds, args.processes, log=log, stop_event=stop_event,
+                                    restart=args.restart),
+                stop_event.set, log)
+        finally:
+            logger.close()
+        return EXIT_PARTIAL if report is None or report["partial"] else EXIT_OK
+
+    crawler = ImageCrawler(config, log=log)
+    resume = crawler.open() and not args.restart
+    if not seeds and not resume:
+        print("Error: no seed URLs.", file=sys.stderr)
+        return 2
+
+    crawler.prepare(seeds, resume=resume)
+    try:
+        report = _run_interruptible(crawler.run, crawler.pause, log)
+    finally:
+        crawler.close()
+        logger.close()
+    return EXIT_PARTIAL if report is None or report["partial"] else EXIT_OK
+
+
+def _run_interruptible(work, pause, log):
+    """
+    Run work() in a thread and return its result; Ctrl+C calls pause() and
+    waits for the crawl to wind down. Waits on an Event rather than
+    Thread.join(), which an interrupt can cut short.
+    """
+    result = {}
+    done = threading.Event()
+
+    def target():
+        try:
+            result["report"] = work()
+        finally:
+            done.set()
+
+    threading.Thread(target=target).start()
+    try:
+        while not done.wait(0.5):
+            pass
+    except KeyboardInterrupt:
+        log("Interrupted: finishing in-flight pages; run again to resume.")
+        pause()
+        done.wait()
+    return result.get("report")
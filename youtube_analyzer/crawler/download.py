@@ -0,0 +1,257 @@
+import hashlib
+import json
+import os
+import re
+import time
+
+import requests
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+CHECKPOINT_BYTES = 8 * 1024 * 1024
+CONTENT_RANGE_RE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+
+class IncompleteDownload(OSError):
+    """The body ended cleanly but short of the length the headers announced."""
+
+
+# Errors after which the server is asked for the rest of the file
+RESUMABLE_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                    IncompleteDownload)
+
+
+def _preallocate(f, length):
+    """Reserve length bytes for f up front (sparse where the OS can't allocate)."""
+    if os.fstat(f.fileno()).st_size >= length:
+        return
+    try:
+        os.posix_fallocate(f.fileno(), 0, length)
+    except (AttributeError, OSError):
+        f.truncate(length)
+
+
+def content_length(headers, start=0):
+    """Full size of the file from response headers, if they tell it (compressed bodies don't)."""
+    match = CONTENT_RANGE_RE.match(headers.get("Content-Range", ""))
+    if match and match.group(3) != "*":
+        return int(match.group(3))
+    length = headers.get("Content-Length")
+    encoding = headers.get("Content-Encoding", "identity").lower()
+    if length and length.isdigit() and encoding == "identity":
+        return start + int(length)
+    return None
+
+
+class PartialDownload:
+    """
+    The on-disk side of one resumable download, independent of the HTTP
+    client (Downloader uses requests, the asyncio engine aiohttp).
+
+    The body goes to <path>.part, preallocated when the size is known, and
+    <path>.part.json records how much of it has been written plus the
+    ETag/Last-Modified it came with. headers() asks for the rest of an
+    earlier attempt with Range guarded by If-Range, so a changed file
+    starts over instead of being spliced; finish() renames the part file
+    onto path, so path only ever holds complete downloads.
+
+        part = PartialDownload(url, path)
+        response = get(url, headers=part.headers())
+        if part.begin(status, response_headers):   # False: start over
+            for chunk in body: part.write(chunk)
+            result = part.finish()
+        # on errors, part.abort() keeps what was written for next time
+    """
+
+    def __init__(self, url, path, sha1=False, checkpoint_bytes=CHECKPOINT_BYTES):
+        self.url = url
+        self.path = path
+        self.part_path = path + ".part"
+        self.sidecar_path = self.part_path + ".json"
+        self.sha1 = sha1
+        self.checkpoint_bytes = checkpoint_bytes
+        self.meta = self._load_sidecar() if os.path.exists(self.part_path) else None
+        self.offset = self.meta["received"] if self.meta else 0
+        self.start = 0
+        self.received = 0
+        self.hasher = None
+        self._file = None
+        self._unsaved = 0
+
+    def headers(self, headers=None):
+        """Request headers, with Range/If-Range when there is an earlier part to continue."""
+        headers = dict(headers or {})
+        if self.offset:
+            headers["Range"] = f"bytes={self.offset}-"
+            validator = self.meta.get("etag") or self.meta.get("last_modified")
+            if validator:
+                headers["If-Range"] = validator
+        return headers
+
+    def begin(self, status, headers):
+        """
+        Prepare for the body of a 200/206 (or the 416 answering a Range past
+        the end). Returns False if the saved part can't be continued; it is
+        discarded and the caller should request the whole file again.
+        """
+        if status == 416 and self.offset:
+            if self.meta.get("length") != self.offset:
+                self.discard()
+                return False
+            self.start = self.received = self.offset
+            self.hasher = self._prefix_hash(self.offset) if self.sha1 else None
+            return True
+
+        self.start = 0
+        if status == 206:
+            match = CONTENT_RANGE_RE.match(headers.get("Content-Range", ""))
+            if not match or int(match.group(1)) != self.offset:
+                self.discard()
+                return False
+            self.start = self.offset
+        self.received = self.start
+        self.meta = {"url": self.url, "etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified"),
+                     "length": content_length(headers, self.start)}
+        self.hasher = self._prefix_hash(self.start) if self.sha1 else None
+
+        self._file = open(self.part_path, "r+b" if self.start else "wb")
+        if self.meta["length"]:
+            _preallocate(self._file, self.meta["length"])
+        self._file.seek(self.start)
+        self._save_sidecar()
+        return True
+
+    def write(self, chunk):
+        self._file.write(chunk)
+        if self.hasher:
+            self.hasher.update(chunk)
+        self.received += len(chunk)
+        self._unsaved += len(chunk)
+        if self._unsaved >= self.checkpoint_bytes:
+            self._file.flush()
+            self._save_sidecar()
+
+    def abort(self):
+        """Stop here, keeping the part file and sidecar so a later attempt resumes."""
+        if self._file is not None:
+            self._file.flush()
+            self._save_sidecar()
+            self._file.close()
+            self._file = None
+
+    def finish(self):
+        """
+        Move the completed file onto path; returns {"path", "bytes",
+        "resumed_from", "sha1"}. A body shorter than Content-Length or
+        Content-Range announced is kept as a part and raises
+        IncompleteDownload, so the next attempt asks for the rest.
+        """
+        if self._file is not None:
+            length = self.meta["length"]
+            if length is not None and self.received < length:
+                self.abort()
+                raise IncompleteDownload(f"{self.url}: got {self.received} of {length} bytes")
+            if self.received != length:
+                self._file.truncate(self.received)
+            self._file.close()
+            self._file = None
+        os.replace(self.part_path, self.path)
+        if os.path.exists(self.sidecar_path):
+            os.remove(self.sidecar_path)
+        return {"path": self.path, "bytes": self.received, "resumed_from": self.start,
+                "sha1": self.hasher.hexdigest() if self.hasher else None}
+
+    def discard(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        for stale in (self.part_path, self.sidecar_path):
+            if os.path.exists(stale):
+                os.remove(stale)
+        self.meta = None
+        self.offset = 0
+
+    def _prefix_hash(self, size):
+        """sha1 of the first size bytes already in the part file."""
+        hasher = hashlib.sha1()
+        if not size:
+            return hasher
+        with open(self.part_path, "rb") as f:
+            while size > 0:
+                block = f.read(min(DEFAULT_CHUNK_SIZE, size))
+                if not block:
+                    break
+                hasher.update(block)
+                size -= len(block)
+        return hasher
+
+    def _load_sidecar(self):
+        try:
+            with open(self.sidecar_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("url") == self.url and meta.get("received") else None
+
+    def _save_sidecar(self):
+        temp_path = self.sidecar_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(self.meta, received=self.received), f)
+        os.replace(temp_path, self.sidecar_path)
+        self._unsaved = 0
+
+
+class Downloader:
+    """
+    Streams a URL to a file in large chunks and survives interruptions:
+    a dropped connection is resumed with a Range request (up to attempts
+    times), and a download abandoned in one run continues in the next.
+    See PartialDownload for the files involved.
+    """
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, get=requests.get, timeout=30, attempts=3, retry_delay=1.0,
+                 checkpoint_bytes=CHECKPOINT_BYTES, log=print):
+        self.chunk_size = chunk_size
+        self.get = get
+        self.timeout = timeout
+        self.attempts = attempts
+        self.retry_delay = retry_delay
+        self.checkpoint_bytes = checkpoint_bytes
+        self.log = log
+
+    def fetch(self, url, path, headers=None, on_chunk=None, sha1=False):
+        """
+        Download url to path. on_chunk(size) is called before each chunk is
+        written and may raise to abort (the partial file is kept). Returns
+        {"status", "path", "bytes", "resumed_from", "sha1", "headers"}; a 304
+        leaves path untouched. HTTP errors raise requests.HTTPError.
+        """
+        for attempt in range(self.attempts):
+            part = PartialDownload(url, path, sha1=sha1, checkpoint_bytes=self.checkpoint_bytes)
+            try:
+                with self.get(url, stream=True, timeout=self.timeout, headers=part.headers(headers)) as response:
+                    if response.status_code == 304:
+                        return {"status": 304, "path": path, "bytes": 0, "resumed_from": 0, "sha1": None,
+                                "headers": response.headers}
+                    if not (response.status_code == 416 and part.offset):
+                        response.raise_for_status()
+                    if not part.begin(response.status_code, response.headers):
+                        continue
+                    if part.start:
+                        self.log(f"Resuming {url} from byte {part.start}")
+                    if response.status_code != 416:
+                        for chunk in response.iter_content(self.chunk_size):
+                            if on_chunk:
+                                on_chunk(len(chunk))
+                            part.write(chunk)
+                    result = dict(part.finish(), status=206 if part.start else 200, headers=response.headers)
+                    return result
+            except RESUMABLE_ERRORS as e:
+                part.abort()
+                if attempt + 1 == self.attempts:
+                    raise
+                self.log(f"Download of {url} interrupted ({e}); resuming")
+                time.sleep(self.retry_delay * 2 ** attempt)
+            except BaseException:
+                part.abort()
+                raise
+        raise requests.ConnectionError(f"Could not download {url} in {self.attempts} attempt(s)")
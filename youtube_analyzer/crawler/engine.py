@@ -0,0 +1,584 @@
+import hashlib
+import json
+import os
+import random
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+
+import requests
+
+from crawler.async_engine import AsyncCrawlEngine, USER_AGENTS
+from crawler.budget import CrawlBudget, BudgetExceeded
+from crawler.classify import ImageClassifier, DEFAULT_BATCH_SIZE
+from crawler.download import Downloader, DEFAULT_CHUNK_SIZE
+from crawler.extract import extract_page
+from crawler.frontier import CrawlFrontier, PRIORITIES
+from crawler.linkfilter import LinkFilter
+from crawler.metrics import REGISTRY, MetricsExporter, DEFAULT_PORT
+from crawler.ratelimit import HostRateLimiter, RetryPolicy, get_with_retries
+from crawler.render import PageRenderer
+from crawler.sitemap import SiteSeeder
+from crawler.state import CrawlStateStore, conditional_headers, UNCHANGED
+from crawler.store import ContentStore
+from crawler.urls import url_key, make_visited_set, link_kind, content_kind, PAGE, IMAGE, SKIP
+
+# Every setting of a crawl; a config dict only needs the keys it changes.
+DEFAULT_CONFIG = {
+    "output": "Downloaded_Images",
+    "depth": 2,
+    "include": [],  # follow only links matching one of these (see crawler.linkfilter)
+    "exclude": [],  # never follow links matching one of these
+    "link_scope": None,  # "host" or "domain": stay on the host/domain of the linking page
+    "engine": "threads",  # or "asyncio"
+    "threads": 10,
+    "async_connections": 500,
+    "async_per_host": 8,
+    "priority": "Shallowest first",
+    "bloom_visited": False,
+    "sitemaps": False,
+    "request_delay": 1.0,  # seconds between requests to one host, 0 = none
+    "retries": 3,
+    "download_chunk_size": DEFAULT_CHUNK_SIZE,  # bytes per read/write when saving images
+    "validate_seeds": True,
+    "budget": {},  # CrawlBudget keyword arguments
+    "metrics_port": DEFAULT_PORT,  # None disables the endpoint
+    "classify_model": None,  # label saved images with this model (see crawler.classify); None = off
+    "classify_labels": [],  # class names in model output order, or a file with one per line
+    "classify_discard": [],  # delete images labelled with one of these
+    "classify_discard_score": 0.5,  # ... when the model is at least this sure
+    "classify_batch": DEFAULT_BATCH_SIZE,
+    "render": False,  # render JavaScript-built pages in headless Chrome when plain HTTP misses them
+    "render_browsers": 2,  # size of the browser pool
+    "render_min_images": 1,  # fewer images than this in the static HTML is worth a render
+}
+
+
+def make_config(overrides=None):
+    """DEFAULT_CONFIG updated with overrides; unknown keys and invalid link rules raise ValueError."""
+    config = dict(DEFAULT_CONFIG)
+    for key, value in (overrides or {}).items():
+        if key not in DEFAULT_CONFIG:
+            raise ValueError(f"Unknown crawl setting: {key}")
+        config[key] = value
+    LinkFilter(config["include"], config["exclude"], config["link_scope"])  # bad rules fail here, not mid-crawl
+    return config
+
+
+class ImageCrawler:
+    """
+    The image crawl without any GUI: seeds, frontier, fetching, link
+    following and image downloads, with the crawl state, content store,
+    sitemaps, rate limits, budgets and metrics around them.
+
+    open() opens the state kept in the output folder and tells whether an
+    interrupted crawl can be resumed, prepare(seeds, resume) sets up a run
+    and run() crawls until the frontier is finished or the crawl is paused,
+    then writes crawl_report.json and returns the report. pause() can be
+    called from any thread; a paused crawl continues with resume() and
+    another run(). log(message) receives progress lines and on_image(path)
+    every saved image. With a router (see crawler.shard) links to hosts this
+    crawler does not own are handed to router.forward() instead of being
+    queued. With classify_model set, saved images are also labelled (and
+    optionally discarded) by an ImageClassifier before run() returns. With
+    render set, pages whose static HTML looks incomplete are also rendered
+    by a PageRenderer, which learns per host whether that pays off.
+    """
+
+    def __init__(self, config=None, log=print, on_image=None, stop_event=None, metrics=REGISTRY, router=None):
+        self.config = make_config(config)
+        self.log = log
+        self.on_image = on_image
+        self.stop_event = stop_event or threading.Event()
+        self.metrics = metrics
+        self.router = router
+        self.output = self.config["output"]
+
+        self.frontier = CrawlFrontier()
+        self.priority = PRIORITIES.get(self.config["priority"], PRIORITIES["Shallowest first"])
+        self.link_filter = LinkFilter(self.config["include"], self.config["exclude"], self.config["link_scope"])
+        self.visited_links = make_visited_set(bloom=self.config["bloom_visited"])
+        self.state = None
+        self.store = None
+        self.seeder = None
+        self.sitemap_sites = []
+        self.changes = Counter()
+        self._changes_lock = threading.Lock()
+        self._downloading = set()
+        self._downloading_lock = threading.Lock()
+        self.limiter = HostRateLimiter()
+        self.retry_policy = RetryPolicy(retries=self.config["retries"])
+        self.budget = CrawlBudget()
+        self.classifier = None
+        self.renderer = None
+        self.exporter = None
+        self.downloader = Downloader(chunk_size=int(self.config["download_chunk_size"]), get=self._get, timeout=10,
+                                     log=self.log)
+
+    def open(self):
+        """Open the crawl state and image store; True if an unfinished crawl is pending."""
+        os.makedirs(self.output, exist_ok=True)
+        if self.state is None:
+            self.state = CrawlStateStore(os.path.join(self.output, "crawl_state.sqlite"))
+            self.store = ContentStore(self.output)
+        return self.state.has_pending()
+
+    def prepare(self, seeds, resume=False):
+        """Set up a run: continue the pending crawl, or start over from seeds."""
+        config = self.config
+        self.open()
+        self.stop_event.clear()
+        self.changes = Counter()
+        self.seeder = SiteSeeder(log=self.log) if config["sitemaps"] else None
+        self.sitemap_sites = []
+        delay = float(config["request_delay"] or 0)
+        self.limiter = HostRateLimiter(rate=1 / delay if delay > 0 else None)
+        self.budget = CrawlBudget(**config["budget"])
+        self._start_metrics()
+        if config["classify_model"] and self.classifier is None:
+            # The model itself only loads, in its own process, once there are images to label
+            self.classifier = ImageClassifier(
+                config["classify_model"], self.store, labels=config["classify_labels"],
+                discard=config["classify_discard"], discard_score=float(config["classify_discard_score"]),
+                batch_size=int(config["classify_batch"]), log=self.log, metrics=self.metrics,
+                on_discard=lambda saved, label: self.state.record_discard(saved["url"], saved["sha1"], label))
+        if config["render"] and self.renderer is None:
+            self.renderer = PageRenderer(pool_size=int(config["render_browsers"]),
+                                         min_images=int(config["render_min_images"]), log=self.log,
+                                         metrics=self.metrics)
+
+        if resume:
+            if self.renderer is not None:
+                self.renderer.load(self.state.get_meta("render_hosts"))
+            for url in self.state.visited_urls():
+                self.visited_links.add(url)
+            pending = self.state.pending()
+            for url, depth in pending:
+                self.frontier.put((url, depth), self.priority(depth, 0))
+            self.log(f"Resuming crawl: {len(pending)} page(s) queued, "
+                     f"{len(self.visited_links)} already crawled, "
+                     f"{self.state.image_count()} image(s) saved.")
+        else:
+            self.state.reset()
+            self.log("Starting scraping...")
+            depth = int(config["depth"])
+            for url in seeds:
+                if not config["validate_seeds"] or self._validate_url(url):
+                    self._enqueue(url, depth, self.priority(depth, 0))
+                    if self.seeder:
+                        self.sitemap_sites.append((url, depth))
+                else:
+                    self.log(f"Invalid URL: {url}")
+            self.state.set_meta("seeds", list(seeds))
+            self.state.set_meta("depth", depth)
+            self.state.flush()
+
+    def enqueue(self, links):
+        """Queue (url, depth) pairs found elsewhere, e.g. forwarded by another shard."""
+        for url, depth in links:
+            if url not in self.visited_links:
+                self._enqueue(url, depth, self.priority(depth, 0))
+
+    def run(self, write_report=True):
+        """
+        Crawl until finished or paused. Returns the crawl report, or None
+        when write_report is False (write_report() can be called later).
+        """
+        if self.seeder:
+            self._seed_from_sitemaps()
+        if self.config["engine"].lower() == "asyncio":
+            return self._run_async(write_report)
+
+        threads = []
+        for _ in range(int(self.config["threads"])):
+            thread = threading.Thread(target=self._scrape_task)
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+        if self.classifier is not None:
+            self.classifier.wait()
+        self._save_render_hosts()
+        self.state.flush()
+        if not write_report:
+            return None
+
+        report = self.write_report()
+        if self.frontier.is_finished():
+            self.log("Scraping completed!")
+        else:
+            self.log(f"Scraping paused with {self.frontier.queued()} page(s) queued.")
+        return report
+
+    def pause(self):
+        """Stop handing out pages; queued pages stay in the frontier."""
+        self.stop_event.set()
+        self.frontier.pause()
+
+    def resume(self):
+        """Allow a paused crawl to continue; call run() again afterwards."""
+        self.stop_event.clear()
+        self.frontier.resume()
+
+    def close(self):
+        """Stop the crawl and commit its state."""
+        self.pause()
+        self.frontier.close()
+        if self.exporter is not None:
+            self.exporter.stop()
+            self.exporter = None
+        if self.classifier is not None:
+            self.classifier.close()
+            self.classifier = None
+        if self.renderer is not None:
+            self.renderer.close()
+            self.renderer = None
+        if self.state is not None:
+            self.state.flush()
+
+    def _start_metrics(self):
+        """Reset the metrics and publish them as metrics.json and on localhost for this run."""
+        if self.exporter is not None:
+            self.exporter.stop()
+        self.metrics.reset()
+        self.exporter = MetricsExporter(self.metrics, os.path.join(self.output, "metrics.json"),
+                                        port=self.config["metrics_port"], log=self.log).start()
+
+    def _enqueue(self, url, depth, priority):
+        """Queue a page in memory and in the on-disk state."""
+        self.frontier.put((url, depth), priority)
+        self.state.enqueue(url, depth)
+
+    def _count_change(self, kind):
+        with self._changes_lock:
+            self.changes[kind] += 1
+
+    def _check_budget(self):
+        """Once a global budget is used up, stop the crawl the way Pause does."""
+        if self.budget.exhausted and not self.stop_event.is_set():
+            self.log(f"Budget exhausted ({self.budget.exhausted}): stopping crawl.")
+            self.pause()
+
+    def write_report(self):
+        """Log the crawl report, save it as crawl_report.json in the output folder and return it."""
+        with self._changes_lock:
+            changes = {kind: self.changes[kind] for kind in ("new", "changed", "unchanged")}
+        budget = self.budget.report()
+        report = {
+            "partial": bool(budget["exhausted"] or budget["hosts_over_budget"] or self.stop_event.is_set()),
+            "changes": changes,
+            "budget": budget,
+        }
+        self.state.set_meta("last_report", report)
+        report_path = os.path.join(self.output, "crawl_report.json")
+        with open(report_path, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+
+        self.log(f"Crawl report: {changes['new']} new, {changes['changed']} changed, "
+                 f"{changes['unchanged']} unchanged resource(s); {budget['pages']} page(s), "
+                 f"{budget['image_bytes'] / (1024 * 1024):.1f} MB of images in {budget['seconds']}s.")
+        if report["partial"]:
+            self.log(f"Partial report written to {report_path}")
+        if self.exporter is not None:
+            self.exporter.write_snapshot()
+        return report
+
+    def _save_render_hosts(self):
+        """Keep the per-host render decisions with the crawl state, for a resumed crawl."""
+        if self.renderer is not None:
+            self.state.set_meta("render_hosts", self.renderer.decisions())
+
+    def _get(self, url, **kwargs):
+        """GET through the per-host rate limiter, retrying transient failures."""
+        return get_with_retries(url, self.limiter, self.retry_policy, log=self.log, metrics=self.metrics, **kwargs)
+
+    def _validate_url(self, url):
+        """
+        Check if a URL is reachable, following redirects (http -> https, a
+        trailing slash, ...). Servers that refuse HEAD get a streamed GET.
+        """
+        try:
+            with requests.head(url, timeout=5, allow_redirects=True) as response:
+                if response.status_code not in (403, 405, 501):
+                    return response.ok
+            with requests.get(url, timeout=5, stream=True) as response:
+                return response.ok
+        except requests.RequestException:
+            return False
+
+    def _seed_from_sitemaps(self):
+        """Queue every page listed in the seed sites' sitemaps."""
+        while self.sitemap_sites and not self.stop_event.is_set():
+            site, depth = self.sitemap_sites.pop(0)
+            for page in self.seeder.seed(site):
+                self._enqueue(page, depth, self.priority(depth, 0))
+
+    def _run_async(self, write_report=True):
+        """Run the queued pages on the asyncio engine from this thread."""
+        try:
+            engine = AsyncCrawlEngine(
+                extract_page=self._extract_page,
+                store=self.store,
+                accept_link=self.link_filter,
+                on_image=self.on_image,
+                log=self.log,
+                stop_event=self.stop_event,
+                visited=self.visited_links,
+                state=self.state,
+                seeder=self.seeder,
+                limiter=self.limiter,
+                retry_policy=self.retry_policy,
+                budget=self.budget,
+                metrics=self.metrics,
+                router=self.router,
+                renderer=self.renderer,
+                on_saved=self.classifier.submit if self.classifier is not None else None,
+                max_concurrency=int(self.config["async_connections"]),
+                per_host=int(self.config["async_per_host"]),
+                download_chunk_size=int(self.config["download_chunk_size"])
+            )
+            remaining = engine.run(self.frontier.drain())
+            with self._changes_lock:
+                self.changes.update(engine.changes)
+            if self.classifier is not None:
+                self.classifier.wait()
+            self._save_render_hosts()
+        except Exception as e:
+            self.log(f"Async engine error: {e}")
+            self.state.flush()
+            return None
+
+        # Unstarted pages go back to the frontier so a resumed run can continue them
+        for url, depth in remaining:
+            self.frontier.put((url, depth), self.priority(depth, 0))
+        self._check_budget()
+        self.state.flush()
+        if not write_report:
+            return None
+        report = self.write_report()
+        if remaining:
+            self.log(f"Scraping paused with {len(remaining)} page(s) queued.")
+        else:
+            self.log("Scraping completed!")
+        return report
+
+    def _scrape_task(self):
+        """Perform the scraping task until the frontier is finished or paused."""
+        while not self.stop_event.is_set():
+            task = self.frontier.get()
+            if task is None:
+                break
+            self.metrics.set_gauge("frontier_queued", self.frontier.queued())
+            try:
+                url, depth = task
+                self._scrape_page(url, depth)
+            except Exception as e:
+                self.log(f"Error: {e}")
+            finally:
+                self.frontier.task_done()
+
+    def _scrape_page(self, url, depth):
+        """Scrape a single page."""
+        if depth == 0 or url in self.visited_links:
+            return
+        if not self.budget.allow_page(url):
+            if self.budget.exhausted:
+                # Keep the page queued for a resumed crawl
+                self.frontier.put((url, depth), self.priority(depth, 0))
+                self._check_budget()
+            return
+        # Check-and-insert is atomic, so two workers can never fetch the same page
+        if not self.visited_links.add(url):
+            return
+
+        self.state.start(url, depth)
+        if self.seeder:
+            if not self.seeder.allowed(url):
+                self.log(f"Disallowed by robots.txt: {url}")
+                self.state.finish(url, ok=False)
+                return
+            self.seeder.wait(url)
+        self.log(f"Scraping: {url}")
+
+        page = self._fetch_page(url)
+        if page is None:
+            if self.budget.exhausted:
+                self._check_budget()  # left 'fetching' so a resumed crawl retries it
+            else:
+                self.state.finish(url, ok=False)
+            return
+        links, images = page
+        self.metrics.inc("pages_fetched_total", host=urlparse(url).netloc)
+        links, linked_images = self._screen_links(links, url)
+
+        for img_url in images + linked_images:
+            self._download_image(img_url)
+
+        if depth > 1:
+            priority = self.priority(depth - 1, len(images))
+            foreign = []
+            for link in links:
+                if link not in self.visited_links:
+                    if self.router is None or self.router.owns(link):
+                        self._enqueue(link, depth - 1, priority)
+                    else:
+                        foreign.append((link, depth - 1))
+            if foreign:
+                self.router.forward(foreign)
+        self.state.finish(url)
+
+    def _screen_links(self, links, base_url):
+        """
+        Split a page's accepted links by extension into (pages, images):
+        links straight to images are downloaded like <img> sources, and
+        documents, archives and media are dropped without a request.
+        """
+        pages, images = [], []
+        for link in links:
+            if not self.link_filter(link, base_url):
+                continue
+            kind = link_kind(link)
+            if kind == PAGE:
+                pages.append(link)
+            elif kind == IMAGE:
+                images.append(link)
+            else:
+                self.metrics.inc("links_skipped_total", reason="extension")
+        return pages, images
+
+    def _fetch_page(self, url):
+        """
+        Fetch a page and return (links, images), or None on failure.
+
+        The request is conditional on the validators saved by the last crawl;
+        a 304, or a body with the same hash, reuses the saved links and images
+        instead of parsing the page again. A response that isn't HTML is
+        closed as soon as its headers arrive: an image is handed to the image
+        download, anything else is dropped.
+        """
+        previous = self.state.resource(url)
+        headers = {"User-Agent": random.choice(USER_AGENTS)}
+        headers.update(conditional_headers(previous))
+        try:
+            response = self._get(url, stream=True, timeout=10, headers=headers)
+            if response.status_code == 304 and previous and previous["links"] is not None:
+                response.close()
+                self._count_change(UNCHANGED)
+                return previous["links"], previous["images"]
+            response.raise_for_status()
+            kind = content_kind(response.headers.get("Content-Type"))
+            if kind != PAGE:
+                response.close()
+                self.metrics.inc("pages_skipped_total", reason=kind)
+                if kind == SKIP:
+                    self.log(f"Skipped non-HTML: {url} ({response.headers.get('Content-Type')})")
+                return [], [url] if kind == IMAGE else []
+            body = bytearray()
+            for chunk in response.iter_content(64 * 1024):
+                self.budget.consume(url, len(chunk))
+                self.metrics.inc("bytes_downloaded_total", len(chunk), kind="page")
+                body.extend(chunk)
+        except requests.RequestException:
+            self.log(f"Failed to fetch: {url}")
+            return None
+        except BudgetExceeded:
+            response.close()
+            return None
+
+        html_content = bytes(body)
+        sha1 = hashlib.sha1(html_content).hexdigest()
+        if previous and previous["sha1"] == sha1 and previous["links"] is not None:
+            links, images = previous["links"], previous["images"]
+        else:
+            # Relative links resolve against where the page ended up after redirects
+            links, images = self._extract_page(response.url, html_content)
+            if self.renderer is not None:
+                links, images = self.renderer.improve(url, html_content, links, images, self._extract_page)
+
+        kind = self.state.record_resource(url, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                                          sha1, links=links, images=images)
+        self._count_change(kind)
+        return links, images
+
+    def _extract_page(self, url, html_content):
+        """
+        Extract links and image URLs from a page in a single parse. Links
+        that are spellings of the same page (see url_key) are kept once, as
+        first written: the canonical form is only a key, never fetched.
+        """
+        links, images = extract_page(url, html_content)
+        unique = {}
+        for link in links:
+            unique.setdefault(url_key(link), link)
+        return list(unique.values()), images
+
+    def _download_image(self, url):
+        """
+        Download an image into the content store, skipping ones already saved
+        in this crawl. If an earlier crawl stored it the request is
+        conditional and a 304 reuses the stored file. An interrupted
+        download resumes where it stopped, in this run or the next.
+        """
+        if self.state.has_image(url) or not self.budget.allow_image(url):
+            return
+        # Pages sharing an image must not download it into the same part file at once
+        with self._downloading_lock:
+            if url in self._downloading:
+                return
+            self._downloading.add(url)
+        try:
+            self._save_image(url)
+        finally:
+            with self._downloading_lock:
+                self._downloading.discard(url)
+
+    def _save_image(self, url):
+        previous = self.state.resource(url)
+        if previous and not (self.store.has_object(previous["sha1"]) or self.state.is_discarded(previous["sha1"])):
+            previous = None
+        headers = {"User-Agent": random.choice(USER_AGENTS)}
+        headers.update(conditional_headers(previous))
+        try:
+            result = self.downloader.fetch(url, self.store.partial_path(url), headers=headers,
+                                           on_chunk=lambda size: self._charge_image(url, size), sha1=True)
+            if result["status"] == 304:
+                if previous is None:
+                    self.log(f"Failed to download: {url} (304 with nothing stored)")
+                    return
+                self._count_change(UNCHANGED)
+                if self.state.is_discarded(previous["sha1"]):
+                    return
+                saved = self.store.link(url, previous["sha1"])
+                self.state.record_image(url, saved["path"], saved["sha1"], saved["bytes"])
+                return
+
+            response_headers = result["headers"]
+            if self.state.is_discarded(result["sha1"]):
+                os.remove(result["path"])
+                self.log(f"Discarded earlier, not saved: {url}")
+                return
+            saved = self.store.commit_file(url, result["path"], result["sha1"], result["bytes"],
+                                           response_headers.get("Content-Type"))
+            self.metrics.inc("images_saved_total", host=urlparse(url).netloc)
+
+            self.state.record_image(url, saved["path"], saved["sha1"], saved["bytes"])
+            if self.classifier is not None:
+                self.classifier.submit(saved)
+            self._count_change(self.state.record_resource(
+                url, response_headers.get("ETag"), response_headers.get("Last-Modified"), saved["sha1"]))
+            if saved["duplicate"]:
+                self.log(f"Already stored: {url} -> {saved['path']}")
+            else:
+                self.log(f"Downloaded: {saved['path']}")
+            if self.on_image:
+                self.on_image(saved["path"])
+        except (requests.RequestException, OSError):
+            self.log(f"Failed to download: {url}")
+        except BudgetExceeded as e:
+            self.log(f"Budget reached ({e}), not downloaded: {url}")
+            self._check_budget()
+
+    def _charge_image(self, url, size):
+        self.budget.consume(url, size, image=True)
+        self.metrics.inc("bytes_downloaded_total", size, kind="image")
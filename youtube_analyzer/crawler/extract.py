@@ -0,0 +1,210 @@
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+try:
+    from lxml import etree
+except ImportError:  # optional: the stdlib tokenizer is used instead
+    etree = None
+
+# Lazy-loading attributes, most specific first
+LAZY_SRCSET_ATTRS = ("data-srcset", "data-lazy-srcset", "srcset")
+LAZY_SRC_ATTRS = ("data-src", "data-lazy-src", "data-original", "data-lazy", "src")
+
+CSS_BACKGROUND_URL = re.compile(
+    r"background(?:-image)?\s*:[^;}]*?url\(\s*(['\"]?)([^'\")]+)\1\s*\)", re.IGNORECASE)
+SKIPPED_SCHEMES = ("data:", "javascript:", "mailto:", "tel:", "about:", "blob:")
+
+
+def parse_srcset(srcset):
+    """
+    Split a srcset attribute into [(url, descriptor)] following the HTML
+    parsing rules: URLs are whitespace-delimited and may contain commas.
+    """
+    candidates = []
+    pos, length = 0, len(srcset)
+    while pos < length:
+        while pos < length and (srcset[pos].isspace() or srcset[pos] == ","):
+            pos += 1
+        start = pos
+        while pos < length and not srcset[pos].isspace():
+            pos += 1
+        url = srcset[start:pos]
+        if not url:
+            break
+        descriptor = ""
+        if url.endswith(","):
+            url = url.rstrip(",")
+        else:
+            end = srcset.find(",", pos)
+            end = length if end == -1 else end
+            descriptor = srcset[pos:end].strip()
+            pos = end + 1
+        if url:
+            candidates.append((url, descriptor))
+    return candidates
+
+
+def _candidate_score(descriptor):
+    """(width, density) for a srcset descriptor such as '640w' or '2x'."""
+    width, density = 0, 1.0
+    for token in descriptor.lower().split():
+        try:
+            if token.endswith("w"):
+                width = int(token[:-1])
+            elif token.endswith("x"):
+                density = float(token[:-1])
+        except ValueError:
+            continue
+    return width, density
+
+
+class _Collector:
+    """
+    Parser target shared by the lxml and stdlib tokenizers. Collects links
+    and one image per <img>/<picture> in a single pass over the tags.
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.links = []
+        self.images = []
+        self._picture = None  # [(score, url)] for the open <picture>
+        self._in_style = False
+        self._style_text = []
+
+    def _resolve(self, url):
+        url = url.strip()
+        if not url or url.startswith("#") or url.lower().startswith(SKIPPED_SCHEMES):
+            return None
+        return urljoin(self.base_url, url)
+
+    def _add_image(self, url):
+        url = self._resolve(url) if url else None
+        if url:
+            self.images.append(url)
+
+    def _best_source(self, attrib):
+        """(score, url) of the best image an <img>/<source> offers, or None."""
+        for name in LAZY_SRCSET_ATTRS:
+            if attrib.get(name):
+                best = None
+                for url, descriptor in parse_srcset(attrib[name]):
+                    if url.lower().startswith(SKIPPED_SCHEMES):
+                        continue
+                    score = _candidate_score(descriptor)
+                    if best is None or score > best[0]:
+                        best = (score, url)
+                if best:
+                    return best
+        for name in LAZY_SRC_ATTRS:
+            value = attrib.get(name)
+            if value and not value.strip().lower().startswith(SKIPPED_SCHEMES):
+                return (0, 1.0), value
+        return None
+
+    def start(self, tag, attrib):
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if tag == "base" and attrib.get("href"):
+            self.base_url = urljoin(self.base_url, attrib["href"].strip())
+        elif tag in ("a", "area"):
+            href = attrib.get("href")
+            link = self._resolve(href) if href else None
+            if link:
+                self.links.append(link)
+        elif tag == "picture":
+            self._picture = []
+        elif tag in ("img", "source"):
+            best = self._best_source(attrib)
+            if best and self._picture is not None:
+                self._picture.append(best)
+            elif best and tag == "img":
+                self._add_image(best[1])
+        elif tag == "style":
+            self._in_style = True
+
+        style = attrib.get("style")
+        if style and "url(" in style:
+            for match in CSS_BACKGROUND_URL.finditer(style):
+                self._add_image(match.group(2))
+
+    def end(self, tag):
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if tag == "picture" and self._picture is not None:
+            if self._picture:
+                # One image per <picture>: the largest of its sources and <img>
+                self._add_image(max(self._picture, key=lambda item: item[0])[1])
+            self._picture = None
+        elif tag == "style" and self._in_style:
+            for match in CSS_BACKGROUND_URL.finditer("".join(self._style_text)):
+                self._add_image(match.group(2))
+            self._style_text = []
+            self._in_style = False
+
+    def data(self, text):
+        if self._in_style:
+            self._style_text.append(text)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        return _unique(self.links), _unique(self.images)
+
+
+class _StdlibTokenizer(HTMLParser):
+    """Feeds html.parser events to a _Collector when lxml is not installed."""
+
+    def __init__(self, collector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag, {name: value or "" for name, value in attrs})
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        self.collector.end(tag)
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+
+def _unique(items):
+    return list(dict.fromkeys(items))
+
+
+def _decode(html_content):
+    if isinstance(html_content, str):
+        return html_content
+    return html_content.decode("utf-8", errors="replace")
+
+
+def extract_page(base_url, html_content):
+    """
+    Parse a page once and return (links, images) as absolute URLs in
+    document order without duplicates.
+
+    Links come from <a>/<area> href. Images come from <img> (srcset,
+    data-srcset, data-src and similar lazy-load attributes before src),
+    <picture>/<source> (one image per picture), inline style and <style>
+    CSS backgrounds. For srcset only the highest-resolution candidate is
+    returned. Uses lxml's event parser when available, html.parser if not.
+    """
+    if etree is not None:
+        collector = _Collector(base_url)
+        parser = etree.HTMLParser(target=collector, recover=True)
+        try:
+            parser.feed(html_content)
+            return parser.close()
+        except (etree.ParserError, etree.XMLSyntaxError, ValueError):
+            pass  # empty or undecodable document: retry with html.parser
+
+    collector = _Collector(base_url)
+    tokenizer = _StdlibTokenizer(collector)
+    tokenizer.feed(_decode(html_content))
+    tokenizer.close()
+    return collector.close()
@@ -0,0 +1,120 @@
+import heapq
+import itertools
+import threading
+
+
+def shallow_first(depth, image_count):
+    """Pages with more crawl depth remaining (closer to the seed) go first."""
+    return (-depth,)
+
+
+def image_rich_first(depth, image_count):
+    """Links found on pages with many images go first, then shallower pages."""
+    return (-image_count, -depth)
+
+
+def discovery_order(depth, image_count):
+    """Plain FIFO: pages are crawled in the order they were found."""
+    return (0,)
+
+
+PRIORITIES = {
+    "Shallowest first": shallow_first,
+    "Image-rich pages first": image_rich_first,
+    "Discovery order": discovery_order,
+}
+
+
+class CrawlFrontier:
+    """
+    Priority work queue that knows when a crawl is really finished.
+
+    It counts queued and in-flight items: get() blocks while the queue is
+    empty but other workers are still processing pages that may add more
+    links, and only returns None once both are zero (or the frontier is
+    paused/closed). Every item returned by get() must be matched by a
+    task_done() call.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+        self._in_flight = 0
+        self._paused = False
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def put(self, item, priority=(0,)):
+        """Queue an item; lower priority values are handed out first."""
+        with self._cond:
+            if self._closed:
+                return
+            heapq.heappush(self._heap, (priority, next(self._counter), item))
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """
+        Take the next item, marking it in flight. Returns None when the crawl
+        is finished, paused or closed (or on timeout).
+        """
+        with self._cond:
+            while True:
+                if self._closed or self._paused:
+                    return None
+                if self._heap:
+                    _, _, item = heapq.heappop(self._heap)
+                    self._in_flight += 1
+                    return item
+                if self._in_flight == 0:
+                    # Nothing queued and nobody can add more: done.
+                    self._cond.notify_all()
+                    return None
+                if not self._cond.wait(timeout):
+                    return None
+
+    def task_done(self):
+        """Mark an item returned by get() as fully processed."""
+        with self._cond:
+            self._in_flight -= 1
+            if self._in_flight == 0 and not self._heap:
+                self._cond.notify_all()
+            else:
+                self._cond.notify()
+
+    def pause(self):
+        """Make idle and future get() calls return None; queued items are kept."""
+        with self._cond:
+            self._paused = True
+            self._cond.notify_all()
+
+    def resume(self):
+        with self._cond:
+            self._paused = False
+            self._cond.notify_all()
+
+    def close(self):
+        """Stop the crawl: drop queued items and release every waiting worker."""
+        with self._cond:
+            self._closed = True
+            self._heap.clear()
+            self._cond.notify_all()
+
+    def drain(self):
+        """Remove and return every queued item (in priority order)."""
+        with self._cond:
+            items = [item for _, _, item in sorted(self._heap)]
+            self._heap.clear()
+            self._cond.notify_all()
+            return items
+
+    def is_finished(self):
+        with self._cond:
+            return not self._heap and self._in_flight == 0
+
+    def queued(self):
+        with self._cond:
+            return len(self._heap)
+
+    def in_flight(self):
+        with self._cond:
+            return self._in_flight
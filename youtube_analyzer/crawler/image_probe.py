@@ -0,0 +1,254 @@
+import os
+import re
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from crawler.download import PartialDownload, DEFAULT_CHUNK_SIZE
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+SVG_LENGTH_RE = r'\s{attr}\s*=\s*["\']\s*([\d.]+)\s*(px)?\s*["\']'
+SVG_VIEWBOX_RE = re.compile(r'\sviewBox\s*=\s*["\']\s*[-\d.]+[\s,]+[-\d.]+[\s,]+([\d.]+)[\s,]+([\d.]+)', re.IGNORECASE)
+
+# JPEG start-of-frame markers carry the dimensions; C4/C8/CC are not frames.
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _parse_png(data):
+    if len(data) >= 24 and data[12:16] == b"IHDR":
+        width, height = struct.unpack(">II", data[16:24])
+        return "png", width, height
+    return None
+
+
+def _parse_gif(data):
+    if len(data) >= 10:
+        width, height = struct.unpack("<HH", data[6:10])
+        return "gif", width, height
+    return None
+
+
+def _parse_webp(data):
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30:
+        width, height = struct.unpack("<HH", data[26:30])
+        return "webp", width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and len(data) >= 25:
+        bits = int.from_bytes(data[21:25], "little")
+        return "webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X" and len(data) >= 30:
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return "webp", width, height
+    return None
+
+
+def _parse_jpeg(data):
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            pos += 1
+            continue
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        segment_length = struct.unpack(">H", data[pos + 2:pos + 4])[0]
+        if marker in JPEG_SOF_MARKERS:
+            if pos + 9 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[pos + 5:pos + 9])
+            return "jpeg", width, height
+        pos += 2 + segment_length
+    return None
+
+
+def _parse_svg(data):
+    text = data.decode("utf-8", errors="ignore")
+    tag_start = text.find("<svg")
+    if tag_start == -1:
+        return None
+    tag_end = text.find(">", tag_start)
+    if tag_end == -1:
+        return None
+    tag = text[tag_start:tag_end]
+
+    width = re.search(SVG_LENGTH_RE.format(attr="width"), tag, re.IGNORECASE)
+    height = re.search(SVG_LENGTH_RE.format(attr="height"), tag, re.IGNORECASE)
+    if width and height:
+        return "svg", int(float(width.group(1))), int(float(height.group(1)))
+    viewbox = SVG_VIEWBOX_RE.search(tag)
+    if viewbox:
+        return "svg", int(float(viewbox.group(1))), int(float(viewbox.group(2)))
+    # Scalable with no intrinsic size
+    return "svg", None, None
+
+
+def parse_image_header(data):
+    """
+    Decode (format, width, height) from the first bytes of an image.
+    Returns None if the bytes are not a recognised format yet (more data may
+    be needed); width/height are None for an SVG without an intrinsic size.
+    """
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return _parse_png(data)
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return _parse_gif(data)
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return _parse_webp(data)
+    if data[:2] == b"\xff\xd8":
+        return _parse_jpeg(data)
+    head = data[:512].lstrip().lower()
+    if head.startswith(b"<?xml") or head.startswith(b"<svg") or b"<svg" in head:
+        return _parse_svg(data)
+    return None
+
+
+class ImageProber:
+    """
+    Filters image URLs by streaming only the first few KB of each one.
+
+    Width, height and format are read from the PNG/JPEG/WebP/GIF/SVG header
+    and the connection is closed as soon as they are known. Images can be
+    filtered on their shortest side in pixels (min_side) and/or on size in
+    kilobytes (min_kb, using Content-Length when the server sends it and the
+    downloaded size otherwise). Small chunks (chunk_size) are read until the
+    header is known; download() reads the rest in download_chunk_size ones.
+    With a CrawlBudget, download() charges every chunk it writes to the
+    image byte and bandwidth budgets (BudgetExceeded stops it, keeping the
+    part file).
+    """
+
+    def __init__(self, min_side=0, min_kb=0, max_workers=16, head_bytes=64 * 1024,
+                 chunk_size=4096, timeout=10, headers=None, download_chunk_size=DEFAULT_CHUNK_SIZE,
+                 budget=None):
+        self.min_side = min_side
+        self.min_kb = min_kb
+        self.max_workers = max_workers
+        self.head_bytes = head_bytes
+        self.chunk_size = chunk_size
+        self.download_chunk_size = download_chunk_size
+        self.timeout = timeout
+        self.headers = headers or DEFAULT_HEADERS
+        self.budget = budget
+        self._local = threading.local()
+
+    def _session(self):
+        # One Session per thread keeps connections alive without sharing state.
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def accepts(self, info):
+        """True if a probe result passes the pixel and size filters."""
+        if info is None or info.get("error"):
+            return False
+        if self.min_side and info["width"] is not None:
+            if min(info["width"], info["height"]) < self.min_side:
+                return False
+        if self.min_kb and info["content_length"] is not None:
+            if info["content_length"] / 1024 < self.min_kb:
+                return False
+        return True
+
+    def _read_header(self, response):
+        """Read chunks until the header decodes or head_bytes is reached."""
+        head = b""
+        chunks = response.iter_content(self.chunk_size)
+        for chunk in chunks:
+            head += chunk
+            parsed = parse_image_header(head)
+            if parsed or len(head) >= self.head_bytes:
+                return head, parsed, chunks
+        return head, parse_image_header(head), None
+
+    def _info(self, url, response, parsed):
+        length = response.headers.get("Content-Length")
+        fmt, width, height = parsed if parsed else (None, None, None)
+        return {
+            "url": url,
+            "format": fmt,
+            "width": width,
+            "height": height,
+            "content_length": int(length) if length and length.isdigit() else None,
+            "content_type": response.headers.get("Content-Type", ""),
+            "error": None
+        }
+
+    def probe(self, url):
+        """Stream just enough of url to read its dimensions, then disconnect."""
+        try:
+            with self._session().get(url, stream=True, timeout=self.timeout, headers=self.headers) as response:
+                response.raise_for_status()
+                _, parsed, _ = self._read_header(response)
+                return self._info(url, response, parsed)
+        except requests.RequestException as e:
+            return {"url": url, "format": None, "width": None, "height": None,
+                    "content_length": None, "content_type": "", "error": str(e)}
+
+    def probe_many(self, urls):
+        """Probe urls concurrently; returns results in the same order."""
+        urls = list(urls)
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            return list(executor.map(self.probe, urls))
+
+    def filter_urls(self, urls):
+        """Probe urls concurrently and return the infos that pass the filters."""
+        return [info for info in self.probe_many(urls) if self.accepts(info)]
+
+    def download(self, url, file_path):
+        """
+        Download url to file_path, aborting as soon as the header shows it
+        fails the filters. The file is written through a PartialDownload, so
+        an interrupted download resumes (its header was already accepted);
+        a saved part the server no longer matches is dropped and the whole
+        file requested once more. Returns the probe info, or None if it was
+        skipped.
+        """
+        for _ in range(2):
+            part = PartialDownload(url, file_path)
+            with self._session().get(url, stream=True, timeout=self.timeout,
+                                     headers=part.headers(self.headers)) as response:
+                if not (response.status_code == 416 and part.offset):
+                    response.raise_for_status()
+                if part.offset and response.status_code in (206, 416):
+                    head, parsed, rest = b"", None, response.status_code == 206
+                else:
+                    head, parsed, rest = self._read_header(response)
+                    if not self.accepts(self._info(url, response, parsed)):
+                        part.discard()
+                        return None
+                if not part.begin(response.status_code, response.headers):
+                    continue  # the saved part was stale and is gone; closes this response first
+                info = self._info(url, response, parsed)
+                try:
+                    self._write(url, part, head)
+                    if rest:
+                        for chunk in response.iter_content(self.download_chunk_size):
+                            self._write(url, part, chunk)
+                except BaseException:
+                    part.abort()
+                    raise
+                size = part.finish()["bytes"]
+                break
+        else:
+            raise requests.ConnectionError(f"Could not restart the download of {url}")
+
+        if self.min_kb and size / 1024 < self.min_kb:
+            os.remove(file_path)
+            return None
+        info["content_length"] = size
+        return info
+
+    def _write(self, url, part, chunk):
+        if self.budget is not None and chunk:
+            self.budget.consume(url, len(chunk), image=True)
+        part.write(chunk)
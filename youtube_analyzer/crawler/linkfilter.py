@@ -0,0 +1,131 @@
+import fnmatch
+import re
+from urllib.parse import urlparse
+
+DEPTH_RULE_RE = re.compile(r"^depth\s*(<=|>=|<|>|=)\s*(\d+)$")
+DEPTH_OPS = {
+    "<=": lambda depth, n: depth <= n,
+    ">=": lambda depth, n: depth >= n,
+    "<": lambda depth, n: depth < n,
+    ">": lambda depth, n: depth > n,
+    "=": lambda depth, n: depth == n,
+}
+SCOPES = (None, "host", "domain")
+
+
+def _trie_regex(words):
+    """
+    One regex matching any of words, shaped like a trie (common prefixes
+    shared: ab|ac -> a(?:b|c)), so at each position the C regex engine
+    walks the trie once instead of trying every word in turn.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        ends = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not ends:
+            return branches[0]
+        pattern = "(?:" + "|".join(branches) + ")"
+        return pattern + "?" if ends else pattern
+
+    return re.compile(build(trie))
+
+
+def path_depth(url):
+    """Number of non-empty path segments: / is 0, /a/b.html is 2."""
+    return len([segment for segment in urlparse(url).path.split("/") if segment])
+
+
+def _registered_domain(host):
+    # Without a public-suffix list the last two labels are the best guess
+    return ".".join(host.split(".")[-2:])
+
+
+class _Rules:
+    """One side (include or exclude) of a LinkFilter, compiled."""
+
+    def __init__(self, patterns):
+        substrings, self.globs, self.regexes, self.domains, self.depths = [], [], [], set(), []
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern:
+                continue  # an empty field means no rule, not "matches everything"
+            depth = DEPTH_RULE_RE.match(pattern.replace(" ", ""))
+            if pattern.startswith("re:"):
+                try:
+                    self.regexes.append(re.compile(pattern[3:]))
+                except re.error as e:
+                    raise ValueError(f"Invalid link rule {pattern!r}: {e}") from None
+            elif pattern.startswith("glob:") or "*" in pattern:
+                # Only * makes a glob: ? and [ are common in plain URL fragments such as ?page=
+                self.globs.append(re.compile(fnmatch.translate(pattern.removeprefix("glob:"))))
+            elif pattern.startswith("domain:"):
+                self.domains.add(pattern[7:].strip().lower().lstrip("."))
+            elif depth:
+                self.depths.append((DEPTH_OPS[depth.group(1)], int(depth.group(2))))
+            else:
+                substrings.append(pattern)
+        self.substrings = _trie_regex(substrings) if substrings else None
+        self.has_patterns = bool(substrings or self.globs or self.regexes or self.domains)
+
+    def matches(self, url, host):
+        """True if url matches any substring, glob, regex or domain rule."""
+        if self.substrings is not None and self.substrings.search(url):
+            return True
+        if self.domains and any(host == domain or host.endswith("." + domain) for domain in self.domains):
+            return True
+        return any(glob.match(url) for glob in self.globs) or any(regex.search(url) for regex in self.regexes)
+
+
+class LinkFilter:
+    """
+    Include/exclude rules for links, compiled once per crawl and safe to
+    share between threads (nothing changes after __init__).
+
+    Each pattern is one of:
+        text            the URL contains text (case-sensitive)
+        *.html, glob:x  shell-style glob over the whole URL (any pattern with *)
+        re:regex        regular expression searched in the URL
+        domain:ex.com   the host is ex.com or a subdomain of it
+        depth<=3        path depth rule (also <, >, >=, =)
+    Blank patterns are ignored; an invalid re: pattern raises ValueError. A link is followed if it matches no exclude
+    pattern, no exclude depth rule, all include depth rules and, when there
+    are other include patterns, at least one of them. scope="host" or
+    "domain" also keeps links on the host (or registered domain) of the
+    page they were found on.
+    """
+
+    def __init__(self, include=(), exclude=(), scope=None):
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown link scope: {scope}")
+        self.include = _Rules(include)
+        self.exclude = _Rules(exclude)
+        self.scope = scope
+
+    def __call__(self, link, base_url=None):
+        host = urlparse(link).hostname or ""
+        if self.scope and base_url:
+            base_host = urlparse(base_url).hostname or ""
+            if self.scope == "host" and host != base_host:
+                return False
+            if self.scope == "domain" and _registered_domain(host) != _registered_domain(base_host):
+                return False
+        if self.exclude.has_patterns and self.exclude.matches(link, host):
+            return False
+        if self.exclude.depths or self.include.depths:
+            depth = path_depth(link)
+            if any(op(depth, n) for op, n in self.exclude.depths):
+                return False
+            if not all(op(depth, n) for op, n in self.include.depths):
+                return False
+        if self.include.has_patterns and not self.include.matches(link, host):
+            return False
+        return True
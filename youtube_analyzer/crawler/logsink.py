@@ -0,0 +1,135 @@
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+_STOP = object()
+
+
+def guess_level(message):
+    """Level for a plain scraper message, from its wording."""
+    lowered = message[:40].lower()
+    if lowered.startswith(("error", "failed", "exception")):
+        return "ERROR"
+    if lowered.startswith(("retrying", "budget", "disallowed", "warning")):
+        return "WARNING"
+    return "INFO"
+
+
+class LogPipeline:
+    """
+    Queue-based logging with a single writer thread.
+
+    log() only builds a record and puts it on a queue, so it is cheap and
+    safe from any thread. The writer thread drains the queue in batches,
+    writes them as JSON lines ({"ts", "level", "thread", "msg", ...}) with
+    one write per batch, and rotates the file to path.1 .. path.<backups>
+    once it grows past max_bytes.
+
+    The GUI gets a capped, sampled feed: at most gui_rate INFO/DEBUG lines
+    per second are kept (warnings and errors always are), in a buffer of
+    gui_capacity records that drain_gui() empties. Lines skipped by the
+    sampling are reported as one "N message(s) not shown" record; every
+    line still reaches the file.
+    """
+
+    def __init__(self, path, max_bytes=5 * 1024 * 1024, backups=3, batch_size=500,
+                 flush_interval=0.5, gui_capacity=1000, gui_rate=50):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.gui_rate = gui_rate
+        self.gui_feed = deque(maxlen=gui_capacity)
+        self.written = 0
+
+        self._queue = queue.SimpleQueue()
+        self._gui_lock = threading.Lock()
+        self._gui_second = 0
+        self._gui_count = 0
+        self._gui_skipped = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def log(self, message, level=None, **fields):
+        """Queue one record; level defaults to guess_level(message)."""
+        record = {"ts": time.time(), "level": level or guess_level(message),
+                  "thread": threading.current_thread().name, "msg": message}
+        if fields:
+            record.update(fields)
+        self._queue.put(record)
+        self._feed_gui(record)
+
+    def _feed_gui(self, record):
+        with self._gui_lock:
+            second = int(record["ts"])
+            if second != self._gui_second:
+                if self._gui_skipped:
+                    self.gui_feed.append({"ts": record["ts"], "level": "INFO", "thread": record["thread"],
+                                          "msg": f"... {self._gui_skipped} message(s) not shown (see log file)"})
+                self._gui_second, self._gui_count, self._gui_skipped = second, 0, 0
+            if record["level"] in ("WARNING", "ERROR") or self._gui_count < self.gui_rate:
+                self._gui_count += 1
+                self.gui_feed.append(record)
+            else:
+                self._gui_skipped += 1
+
+    def drain_gui(self, limit=None):
+        """Pop up to limit records (all if None) queued for the GUI, oldest first."""
+        records = []
+        while self.gui_feed and (limit is None or len(records) < limit):
+            try:
+                records.append(self.gui_feed.popleft())
+            except IndexError:
+                break
+        return records
+
+    def _writer(self):
+        log_file = open(self.path, "a", encoding="utf-8")
+        try:
+            while True:
+                try:
+                    batch = [self._queue.get(timeout=self.flush_interval)]
+                except queue.Empty:
+                    continue
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = _STOP in batch
+                records = [record for record in batch if record is not _STOP]
+                if records:
+                    log_file.write("".join(json.dumps(record, default=str) + "\n" for record in records))
+                    log_file.flush()
+                    self.written += len(records)
+                    if log_file.tell() >= self.max_bytes:
+                        log_file.close()
+                        self._rotate()
+                        log_file = open(self.path, "a", encoding="utf-8")
+                if stop:
+                    return
+        finally:
+            log_file.close()
+
+    def _rotate(self):
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def close(self, timeout=5):
+        """Write everything still queued and stop the writer thread."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
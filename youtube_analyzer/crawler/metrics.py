@@ -0,0 +1,291 @@
+import copy
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 9464
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+class Histogram:
+    """
+    HDR-style latency histogram: values are kept in microseconds in
+    log-linear buckets (the top sub_bits bits of each value), so any
+    recorded value and every quantile is within about 1% using a few
+    hundred buckets at most, whatever the range.
+    """
+
+    def __init__(self, sub_bits=7):
+        self.sub_bits = sub_bits
+        self.counts = {}
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds):
+        micros = max(0, int(seconds * 1_000_000))
+        shift = max(0, micros.bit_length() - self.sub_bits)
+        key = (shift, micros >> shift)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.count += 1
+        self.sum += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def merge(self, other):
+        """Add another histogram's recordings to this one."""
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.count += other.count
+        self.sum += other.sum
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """Value in seconds below which a fraction q of the recordings fall."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for shift, mantissa in sorted(self.counts):
+            seen += self.counts[(shift, mantissa)]
+            if seen >= rank:
+                # Middle of the bucket
+                return ((mantissa << shift) + ((1 << shift) >> 1)) / 1_000_000
+        return self.max
+
+    def summary(self):
+        result = {"count": self.count, "sum": round(self.sum, 6), "min": self.min, "max": self.max}
+        for q in QUANTILES:
+            result[f"p{q * 100:g}"] = self.quantile(q)
+        return result
+
+
+def _key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _label_text(key):
+    return ",".join(f'{name}="{value}"' for name, value in key)
+
+
+class MetricsRegistry:
+    """
+    In-process counters, gauges and latency histograms, keyed by name and
+    labels (e.g. host="example.com"). All methods are thread-safe and cheap
+    enough to call for every request and every chunk.
+    """
+
+    def __init__(self, prefix="crawler"):
+        self.prefix = prefix
+        self.started = time.time()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, _key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self._gauges[(name, _key(labels))] = value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.record(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the time spent in the with-block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter_total(self, name):
+        """Sum of a counter over all its label sets."""
+        with self._lock:
+            return sum(value for (counter, _), value in self._counters.items() if counter == name)
+
+    def gauge_total(self, name):
+        """Sum of a gauge over all its label sets (0 if it was never set)."""
+        with self._lock:
+            return sum(value for (gauge, _), value in self._gauges.items() if gauge == name)
+
+    def state(self):
+        """A picklable copy of everything recorded, for merged() in another process."""
+        with self._lock:
+            return {"started": self.started, "counters": dict(self._counters), "gauges": dict(self._gauges),
+                    "histograms": copy.deepcopy(self._histograms)}
+
+    @classmethod
+    def merged(cls, states, prefix="crawler"):
+        """One registry adding up several state() copies (counters, gauges and histograms)."""
+        registry = cls(prefix)
+        states = list(states)
+        if states:
+            registry.started = min(state["started"] for state in states)
+        for state in states:
+            for section, target in (("counters", registry._counters), ("gauges", registry._gauges)):
+                for key, value in state[section].items():
+                    target[key] = target.get(key, 0) + value
+            for key, histogram in state["histograms"].items():
+                registry._histograms.setdefault(key, Histogram(histogram.sub_bits)).merge(histogram)
+        return registry
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        """Everything as a JSON-friendly dict: {"uptime", "counters", "gauges", "histograms"}."""
+        with self._lock:
+            snapshot = {"time": time.time(), "uptime": round(time.time() - self.started, 3),
+                        "counters": {}, "gauges": {}, "histograms": {}}
+            for section, items in (("counters", self._counters), ("gauges", self._gauges)):
+                for (name, key), value in sorted(items.items()):
+                    snapshot[section].setdefault(name, {})[_label_text(key)] = value
+            for (name, key), histogram in sorted(self._histograms.items()):
+                snapshot["histograms"].setdefault(name, {})[_label_text(key)] = histogram.summary()
+        return snapshot
+
+    def prometheus_text(self):
+        """The registry in the Prometheus text exposition format."""
+        lines = []
+
+        def metric(name, key, value, extra=()):
+            labels = _label_text(key + tuple(extra))
+            lines.append(f"{self.prefix}_{name}{{{labels}}} {value}" if labels else f"{self.prefix}_{name} {value}")
+
+        with self._lock:
+            for kind, items in (("counter", self._counters), ("gauge", self._gauges)):
+                typed = set()
+                for (name, key), value in sorted(items.items()):
+                    if name not in typed:
+                        typed.add(name)
+                        lines.append(f"# TYPE {self.prefix}_{name} {kind}")
+                    metric(name, key, value)
+            typed = set()
+            for (name, key), histogram in sorted(self._histograms.items()):
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {self.prefix}_{name} summary")
+                for q in QUANTILES:
+                    metric(name, key, histogram.quantile(q), [("quantile", f"{q:g}")])
+                metric(name + "_sum", key, histogram.sum)
+                metric(name + "_count", key, histogram.count)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class MetricsExporter:
+    """
+    Publishes a registry while a crawl runs: every interval seconds the
+    snapshot (plus per-second rates of every counter since the previous
+    one) is written atomically to snapshot_path, and with a port the
+    Prometheus text format is served at http://host:port/metrics. The
+    endpoint only listens on localhost by default.
+    """
+
+    def __init__(self, registry=REGISTRY, snapshot_path=None, interval=5.0, port=None, host="127.0.0.1",
+                 log=print):
+        self.registry = registry
+        self.snapshot_path = snapshot_path
+        self.interval = interval
+        self.port = port
+        self.host = host
+        self.log = log
+        self._server = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._previous = None
+
+    def start(self):
+        if self.port is not None:
+            self._serve()
+        if self.snapshot_path:
+            self._thread = threading.Thread(target=self._snapshot_loop, daemon=True)
+            self._thread.start()
+        return self
+
+    def _serve(self):
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                # Read on every request: the registry may be replaced while serving (see crawler.shard)
+                body = exporter.registry.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            self.log(f"Metrics endpoint not started on port {self.port}: {e}")
+            return
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.log(f"Metrics at http://{self.host}:{self._server.server_address[1]}/metrics")
+
+    def _snapshot_loop(self):
+        while not self._stop.wait(self.interval):
+            self.write_snapshot()
+
+    def write_snapshot(self):
+        snapshot = self.registry.snapshot()
+        totals = {name: sum(values.values()) for name, values in snapshot["counters"].items()}
+        if self._previous:
+            elapsed = snapshot["time"] - self._previous[0]
+            snapshot["rates"] = {name: round((total - self._previous[1].get(name, 0)) / elapsed, 3)
+                                 for name, total in totals.items()} if elapsed > 0 else {}
+        else:
+            uptime = snapshot["uptime"]
+            snapshot["rates"] = {name: round(total / uptime, 3) for name, total in totals.items()} if uptime else {}
+        self._previous = (snapshot["time"], totals)
+
+        temp_path = self.snapshot_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, indent=2)
+            os.replace(temp_path, self.snapshot_path)
+        except OSError as e:
+            self.log(f"Could not write metrics snapshot: {e}")
+
+    def stop(self):
+        """Write a final snapshot and close the endpoint."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.interval + 1)
+        if self.snapshot_path:
+            self.write_snapshot()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
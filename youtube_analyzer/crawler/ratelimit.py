@@ -0,0 +1,180 @@
+import email.utils
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+from crawler.metrics import REGISTRY
+
+# Responses worth another attempt; 429 and 503 also slow the host down
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class _Bucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.strikes = 0
+
+
+class HostRateLimiter:
+    """
+    Per-host token buckets with adaptive backoff.
+
+    Each host starts at rate requests/second (None = unlimited) with bursts
+    of up to burst requests. penalize() on a 429/503 halves the host's rate
+    and blocks it for Retry-After seconds, or an exponential backoff when
+    the header is missing, either way for at most max_backoff; reward() on a success raises the rate again step
+    by step. reserve() books a slot and returns how long to wait, acquire()
+    sleeps for it. Safe to use from many threads.
+    """
+
+    def __init__(self, rate=None, burst=1, min_rate=0.05, unthrottled_rate=20.0, max_backoff=300.0):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.unthrottled_rate = unthrottled_rate
+        self.max_backoff = max_backoff
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, url):
+        host = urlparse(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _Bucket(self.rate, self.burst)
+        return bucket
+
+    def reserve(self, url):
+        """Take a token for url's host; returns the seconds to wait before sending."""
+        with self._lock:
+            bucket = self._bucket(url)
+            now = time.monotonic()
+            wait = max(0.0, bucket.blocked_until - now)
+            if bucket.rate:
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+                bucket.updated = now
+                bucket.tokens -= 1
+                if bucket.tokens < 0:
+                    wait = max(wait, -bucket.tokens / bucket.rate)
+            return wait
+
+    def acquire(self, url):
+        wait = self.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+
+    def penalize(self, url, retry_after=None):
+        """The host pushed back (429/503): slow down and pause it; returns the pause."""
+        with self._lock:
+            bucket = self._bucket(url)
+            bucket.strikes += 1
+            current = bucket.rate or self.unthrottled_rate
+            bucket.rate = max(self.min_rate, current / 2)
+            bucket.tokens = min(bucket.tokens, 0)
+            if retry_after is None:
+                retry_after = 2 ** bucket.strikes
+            retry_after = min(self.max_backoff, retry_after)
+            bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + retry_after)
+            return retry_after
+
+    def reward(self, url):
+        """A request succeeded: recover towards the configured rate."""
+        with self._lock:
+            bucket = self._bucket(url)
+            bucket.strikes = 0
+            if bucket.rate is None or bucket.rate == self.rate:
+                return
+            target = self.rate or self.unthrottled_rate
+            bucket.rate = min(target, bucket.rate + target * 0.05)
+            if self.rate is None and bucket.rate >= target:
+                bucket.rate = None
+
+    def host_rate(self, url):
+        with self._lock:
+            return self._bucket(url).rate
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter for transient failures. A server
+    asking for a longer Retry-After than max_delay is not retried at all.
+    """
+
+    def __init__(self, retries=3, base_delay=0.5, max_delay=30.0):
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt, retry_after=None):
+        """Delay before retry number attempt (0-based), at least retry_after but never over max_delay."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        return min(self.max_delay, max(delay, retry_after or 0.0))
+
+    def gives_up(self, retry_after):
+        """True if the server asked to wait longer than max_delay."""
+        return retry_after is not None and retry_after > self.max_delay
+
+
+def get_with_retries(url, limiter, policy, log=print, get=requests.get, metrics=REGISTRY, **kwargs):
+    """
+    GET url through the rate limiter, retrying connection errors, timeouts
+    and RETRY_STATUSES responses according to policy. 429/503 responses
+    penalize the host; a Retry-After over policy.max_delay ends the retries
+    early. Returns the final response (which may still be an
+    error status) or raises the last exception. Every attempt is counted
+    in metrics by host and status, with its time to response headers.
+    """
+    host = urlparse(url).netloc
+    for attempt in range(policy.retries + 1):
+        if attempt:
+            metrics.inc("http_retries_total", host=host)
+        limiter.acquire(url)
+        start = time.perf_counter()
+        try:
+            response = get(url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            metrics.inc("http_requests_total", host=host, status="error")
+            if attempt == policy.retries:
+                raise
+            log(f"Retrying {url} after error: {e}")
+            time.sleep(policy.backoff(attempt))
+            continue
+        metrics.observe("http_request_seconds", time.perf_counter() - start, host=host)
+        metrics.inc("http_requests_total", host=host, status=str(response.status_code))
+
+        if response.status_code not in RETRY_STATUSES:
+            limiter.reward(url)
+            return response
+
+        retry_after = pause = parse_retry_after(response.headers.get("Retry-After"))
+        if response.status_code in THROTTLE_STATUSES:
+            pause = limiter.penalize(url, retry_after)
+        if attempt == policy.retries:
+            return response
+        if policy.gives_up(retry_after):
+            log(f"Not retrying {url}: HTTP {response.status_code} asks to wait {retry_after:.0f}s")
+            return response
+        response.close()
+        log(f"Retrying {url} after HTTP {response.status_code}")
+        time.sleep(policy.backoff(attempt, pause))
+    return response
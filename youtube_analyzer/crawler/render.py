@@ -0,0 +1,167 @@
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+from crawler.metrics import REGISTRY
+
+STATIC = "static"
+RENDER = "render"
+
+# Framework mount points left empty in the server's HTML, and "turn on JavaScript" notices
+SPA_MARKERS = re.compile(
+    rb"<div[^>]+id=[\"'](?:root|app|__next|__nuxt|___gatsby|svelte)[\"'][^>]*>\s*</div>"
+    rb"|<app-root[^>]*>\s*</app-root>|\bng-version=|\bdata-reactroot\b"
+    rb"|<noscript>[^<]{0,200}(?:enable|requires?) javascript",
+    re.IGNORECASE)
+INVISIBLE = re.compile(rb"<(script|style|noscript|template)\b.*?</\1\s*>|<[^>]+>", re.IGNORECASE | re.DOTALL)
+
+
+def render_reason(html, images, min_images=1, min_text=200):
+    """
+    Why a page's static HTML looks like it needs a browser: "empty" (hardly
+    any visible text), "spa" (an empty framework mount point or a
+    JavaScript-required notice) or "few-images"; None if it looks complete.
+    """
+    if len(b" ".join(INVISIBLE.sub(b" ", html).split())) < min_text:
+        return "empty"
+    if SPA_MARKERS.search(html):
+        return "spa"
+    if len(images) < min_images:
+        return "few-images"
+    return None
+
+
+class PageRenderer:
+    """
+    Renders pages whose static HTML is not the whole story, with a small
+    pool of headless Chrome instances (Selenium), and remembers per host
+    whether rendering is worth it.
+
+    The crawler always fetches a page over plain HTTP first and calls
+    improve() with what it extracted. For a host not decided yet, a page
+    that render_reason() flags is rendered once; if the browser finds more
+    images or links the host is marked RENDER and its later pages are
+    rendered too, otherwise it is marked STATIC and never rendered again.
+    Browsers are started on first use, at most pool_size of them, and are
+    told not to load images (the crawler downloads those itself). Without
+    Selenium or a browser, the first render logs why and the renderer
+    turns itself off.
+    """
+
+    def __init__(self, pool_size=2, min_images=1, min_text=200, timeout=30, settle=1.0, log=print,
+                 metrics=REGISTRY):
+        self.pool_size = max(1, int(pool_size))
+        self.min_images = min_images
+        self.min_text = min_text
+        self.timeout = timeout
+        self.settle = settle
+        self.log = log
+        self.metrics = metrics
+        self.hosts = {}  # host -> STATIC or RENDER
+        self.broken = False
+        self._idle = []
+        self._drivers = []
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        self._lock = threading.Lock()
+
+    def decisions(self):
+        with self._lock:
+            return dict(self.hosts)
+
+    def load(self, decisions):
+        """Restore decisions saved by decisions(), e.g. for a resumed crawl."""
+        with self._lock:
+            self.hosts.update(decisions or {})
+
+    def improve(self, url, html, links, images, extract_page):
+        """
+        (links, images) for a page, adding what a rendered copy shows when
+        this page or its host calls for it. extract_page(url, html_bytes) is
+        the crawler's link/image extraction.
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            mode = self.hosts.get(host)
+        if mode == STATIC or self.broken:
+            return links, images
+        reason = "host" if mode == RENDER else render_reason(html, images, self.min_images, self.min_text)
+        if reason is None:
+            return links, images
+
+        rendered = self.render(url)
+        if rendered is None:
+            return links, images
+        self.metrics.inc("pages_rendered_total", reason=reason)
+        rendered_links, rendered_images = extract_page(url, rendered.encode("utf-8"))
+        if mode is None:
+            gained = len(set(rendered_images) - set(images)) or len(set(rendered_links) - set(links))
+            with self._lock:
+                self.hosts.setdefault(host, RENDER if gained else STATIC)
+            self.log(f"Rendering {'helps' if gained else 'adds nothing'} on {host} ({reason}): "
+                     f"{'rendering' if gained else 'plain HTTP for'} its pages from now on.")
+        return list(dict.fromkeys(links + rendered_links)), list(dict.fromkeys(images + rendered_images))
+
+    def render(self, url):
+        """The page's HTML after scripts have run, or None if it could not be rendered."""
+        if self.broken:
+            return None
+        with self._slots:
+            try:
+                driver = self._acquire()
+            except Exception as e:
+                self.broken = True
+                self.log(f"Error: no headless browser for rendering ({e}); using plain HTTP only.")
+                return None
+            start = time.perf_counter()
+            try:
+                driver.get(url)
+                # Lazy loaders fill in images as the page scrolls
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                time.sleep(self.settle)
+                html = driver.page_source
+            except Exception as e:
+                self.log(f"Failed to render: {url} ({e})")
+                self._discard(driver)
+                return None
+            self.metrics.observe("render_seconds", time.perf_counter() - start, host=urlparse(url).netloc)
+            with self._lock:
+                self._idle.append(driver)
+            return html
+
+    def close(self):
+        with self._lock:
+            drivers, self._drivers, self._idle = self._drivers, [], []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        driver = self._new_driver()
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _new_driver(self):
+        from selenium import webdriver  # only crawls that render need Selenium
+        options = webdriver.ChromeOptions()
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        driver = webdriver.Chrome(options=options)
+        driver.set_page_load_timeout(self.timeout)
+        return driver
@@ -0,0 +1,266 @@
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from queue import Empty
+from urllib.parse import urlparse
+
+from crawler.engine import ImageCrawler, make_config
+from crawler.logsink import LogPipeline
+from crawler.metrics import REGISTRY, MetricsRegistry, MetricsExporter
+from crawler.state import CrawlStateStore
+
+# Global budgets are split between shards; per-host ones stay exact since a host lives in one shard
+SPLIT_BUDGETS = ("max_pages", "max_image_bytes", "bytes_per_second")
+METRICS_INTERVAL = 2.0
+
+
+def shard_of(url, shards):
+    """Shard number for url's host; stable across processes and runs."""
+    digest = hashlib.blake2b(urlparse(url).netloc.lower().encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+def shard_output(output, index):
+    return os.path.join(output, f"shard-{index:02d}")
+
+
+def shard_config(config, index, shards):
+    """The crawl config for one shard: its own output folder and share of the global budgets."""
+    config = make_config(config)
+    budget = dict(config["budget"])
+    for key in SPLIT_BUDGETS:
+        if budget.get(key) is not None:
+            budget[key] = math.ceil(budget[key] / shards)
+    config.update(output=shard_output(config["output"], index), budget=budget, metrics_port=None)
+    return config
+
+
+def has_pending(output, shards):
+    """True if any shard under output has an unfinished crawl saved."""
+    for index in range(shards):
+        path = os.path.join(shard_output(output, index), "crawl_state.sqlite")
+        if os.path.exists(path):
+            state = CrawlStateStore(path)
+            try:
+                if state.has_pending():
+                    return True
+            finally:
+                state.close()
+    return False
+
+
+class ShardRouter:
+    """Tells an ImageCrawler which links it owns and sends the rest to the coordinator."""
+
+    def __init__(self, index, shards, events):
+        self.index = index
+        self.shards = shards
+        self.events = events
+
+    def owns(self, url):
+        return shard_of(url, self.shards) == self.index
+
+    def forward(self, links):
+        self.events.put(("links", self.index, links))
+
+
+def _shard_main(index, shards, config, seeds, resume, inbox, events):
+    """
+    One shard process: crawls the hosts it owns until the coordinator says
+    finish (every shard idle, nothing in transit) or stop (paused). resume
+    is decided for all shards by the coordinator, so a shard that has no
+    seeds or no queued pages of its own still keeps its visited pages.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C reaches the coordinator, which sends "stop"
+    os.makedirs(config["output"], exist_ok=True)
+    logger = LogPipeline(os.path.join(config["output"], "crawl_log.jsonl"))
+
+    def log(message):
+        logger.log(message)
+        for record in logger.drain_gui():
+            events.put(("log", index, record["msg"]))
+
+    last_image = [0.0]
+
+    def on_image(path):
+        # Previews only; a few per second is plenty
+        now = time.monotonic()
+        if now - last_image[0] >= 0.5:
+            last_image[0] = now
+            events.put(("image", index, path))
+
+    crawler = ImageCrawler(config, log=log, on_image=on_image, router=ShardRouter(index, shards, events))
+    crawler.prepare(seeds, resume=resume)
+
+    received = [0]
+    wake = threading.Event()
+    finished = threading.Event()
+
+    def listen():
+        while True:
+            message = inbox.get()
+            if message in ("finish", "stop"):
+                if message == "stop":
+                    crawler.pause()
+                finished.set()
+                wake.set()
+                return
+            crawler.enqueue(message)
+            received[0] += 1  # counted only once queued, so an idle report never runs ahead
+            wake.set()
+
+    def send_metrics():
+        while not finished.wait(METRICS_INTERVAL):
+            events.put(("metrics", index, REGISTRY.state()))
+
+    threading.Thread(target=listen, daemon=True).start()
+    threading.Thread(target=send_metrics, daemon=True).start()
+
+    while not finished.is_set():
+        wake.clear()
+        crawler.run(write_report=False)
+        seen = received[0]
+        # Out of budget, the crawl is paused with pages still queued: as done as an empty frontier
+        if (crawler.frontier.queued() == 0 or crawler.budget.exhausted) and not finished.is_set():
+            events.put(("idle", index, seen))
+            wake.wait()
+
+    report = crawler.write_report()
+    crawler.close()
+    events.put(("metrics", index, REGISTRY.state()))
+    events.put(("report", index, report))
+    logger.close()
+
+
+def merge_manifests(output, shards):
+    """Concatenate the shards' manifest.jsonl files into output/manifest.jsonl."""
+    with open(os.path.join(output, "manifest.jsonl"), "w", encoding="utf-8") as merged:
+        for index in range(shards):
+            path = os.path.join(shard_output(output, index), "manifest.jsonl")
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as manifest:
+                    for line in manifest:
+                        merged.write(line)
+
+
+def merge_reports(reports):
+    """One crawl report adding up the shards' reports."""
+    merged = {"partial": False, "changes": {"new": 0, "changed": 0, "unchanged": 0},
+              "budget": {"exhausted": None, "pages": 0, "image_bytes": 0, "total_bytes": 0, "seconds": 0,
+                         "hosts_over_budget": []},
+              "shards": len(reports)}
+    for report in reports:
+        if report is None:
+            merged["partial"] = True
+            continue
+        merged["partial"] = merged["partial"] or report["partial"]
+        for kind, count in report["changes"].items():
+            merged["changes"][kind] = merged["changes"].get(kind, 0) + count
+        budget = report["budget"]
+        for key in ("pages", "image_bytes", "total_bytes"):
+            merged["budget"][key] += budget[key]
+        merged["budget"]["seconds"] = max(merged["budget"]["seconds"], budget["seconds"])
+        merged["budget"]["exhausted"] = merged["budget"]["exhausted"] or budget["exhausted"]
+        merged["budget"]["hosts_over_budget"] += budget["hosts_over_budget"]
+    return merged
+
+
+def run_sharded(config, seeds, processes, log=print, on_image=None, stop_event=None, restart=False):
+    """
+    Crawl with one ImageCrawler process per shard; hosts are assigned by
+    hash, so each host's pages, politeness and per-host budgets stay in one
+    process. Links to hosts owned by another shard pass through this
+    coordinator, which also merges the shards' metrics (metrics.json and
+    the Prometheus endpoint), manifests and reports into the output folder.
+    Setting stop_event pauses every shard; running again resumes them
+    (unless restart), whichever shards the unfinished work is in.
+    Returns the merged report.
+    """
+    config = make_config(config)
+    output = config["output"]
+    os.makedirs(output, exist_ok=True)
+    resume = not restart and has_pending(output, processes)
+    context = multiprocessing.get_context("spawn")
+    events = context.Queue()
+    inboxes = [context.Queue() for _ in range(processes)]
+    shard_seeds = [[] for _ in range(processes)]
+    for url in seeds:
+        shard_seeds[shard_of(url, processes)].append(url)
+
+    workers = []
+    for index in range(processes):
+        worker = context.Process(target=_shard_main, daemon=True, args=(
+            index, processes, shard_config(config, index, processes), shard_seeds[index], resume,
+            inboxes[index], events))
+        worker.start()
+        workers.append(worker)
+    log(f"{'Resumed' if resume else 'Started'} {processes} crawl shard(s).")
+
+    exporter = MetricsExporter(MetricsRegistry(), os.path.join(output, "metrics.json"),
+                               port=config["metrics_port"], log=log).start()
+    metric_states = {}
+    forwarded = set()
+    dispatched = [0] * processes
+    idle = [None] * processes
+    reports = {}
+    ending = False
+
+    def end(message):
+        for inbox in inboxes:
+            inbox.put(message)
+
+    while len(reports) < processes:
+        if stop_event is not None and stop_event.is_set() and not ending:
+            ending = True
+            end("stop")
+        try:
+            kind, index, payload = events.get(timeout=0.5)
+        except Empty:
+            for index, worker in enumerate(workers):
+                if not worker.is_alive() and index not in reports:
+                    log(f"Shard {index} exited unexpectedly (code {worker.exitcode}).")
+                    reports[index] = None
+            continue
+
+        if kind == "log":
+            log(f"[{index}] {payload}")
+        elif kind == "image":
+            if on_image:
+                on_image(payload)
+        elif kind == "links":
+            batches = {}
+            for url, depth in payload:
+                if url not in forwarded:
+                    forwarded.add(url)
+                    batches.setdefault(shard_of(url, processes), []).append((url, depth))
+            for owner, links in batches.items():
+                dispatched[owner] += 1
+                inboxes[owner].put(links)
+        elif kind == "idle":
+            idle[index] = payload
+            # Every shard idle and has taken in everything sent to it: nothing left anywhere
+            if not ending and all(idle[i] == dispatched[i] for i in range(processes)):
+                ending = True
+                end("finish")
+        elif kind == "metrics":
+            metric_states[index] = payload
+            exporter.registry = MetricsRegistry.merged(metric_states.values())
+        elif kind == "report":
+            reports[index] = payload
+
+    for worker in workers:
+        worker.join(5)
+    exporter.stop()
+    merge_manifests(output, processes)
+    report = merge_reports([reports[index] for index in range(processes)])
+    with open(os.path.join(output, "crawl_report.json"), "w") as report_file:
+        json.dump(report, report_file, indent=2)
+    log(f"Sharded crawl: {report['budget']['pages']} page(s) over {processes} shard(s); "
+        f"{report['changes']['new']} new, {report['changes']['changed']} changed, "
+        f"{report['changes']['unchanged']} unchanged resource(s).")
+    return report
@@ -0,0 +1,195 @@
+import gzip
+import io
+import threading
+import time
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+DEFAULT_SITEMAPS = ("/sitemap.xml", "/sitemap_index.xml")
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024  # the sitemap protocol limit, uncompressed
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_sitemap(data):
+    """
+    Parse a sitemap or sitemap index (optionally gzipped).
+    Returns (page_urls, child_sitemap_urls).
+    """
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.GzipFile(fileobj=io.BytesIO(data)).read(MAX_SITEMAP_BYTES)
+
+    pages, sitemaps = [], []
+    parent = None
+    try:
+        for event, element in ET.iterparse(io.BytesIO(data), events=("start", "end")):
+            name = _local_name(element.tag)
+            if event == "start":
+                if name in ("url", "sitemap"):
+                    parent = name
+            elif name == "loc" and element.text:
+                (sitemaps if parent == "sitemap" else pages).append(element.text.strip())
+            elif name in ("url", "sitemap"):
+                element.clear()
+    except ET.ParseError:
+        pass  # keep whatever was read before the error
+    return pages, sitemaps
+
+
+def parse_crawl_delays(lines):
+    """
+    {user-agent: seconds} from robots.txt lines. Unlike RobotFileParser this
+    accepts fractional delays such as "Crawl-delay: 0.5".
+    """
+    delays, agents, in_rules = {}, [], False
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if ":" not in line:
+            continue
+        field, value = (part.strip() for part in line.split(":", 1))
+        field = field.lower()
+        if field == "user-agent":
+            if in_rules:
+                agents, in_rules = [], False
+            agents.append(value.lower())
+        else:
+            in_rules = True
+            if field == "crawl-delay":
+                try:
+                    for agent in agents:
+                        delays[agent] = float(value)
+                except ValueError:
+                    pass
+    return delays
+
+
+class SiteSeeder:
+    """
+    Reads robots.txt and sitemaps to seed a crawl and to keep it polite.
+
+    seed(site) returns every page listed in the site's sitemaps (following
+    sitemap indexes and gzip sitemaps) that robots.txt allows. allowed(url)
+    applies the disallow rules and wait(url) sleeps as long as the site's
+    Crawl-delay requires (reserve(url) returns the pause for async callers);
+    all are safe to call from many threads.
+    """
+
+    def __init__(self, user_agent="Mozilla/5.0", timeout=10, max_urls=100000, max_sitemaps=500,
+                 log=print):
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.max_urls = max_urls
+        self.max_sitemaps = max_sitemaps
+        self.log = log
+        self._robots = {}
+        self._delays = {}
+        self._next_slot = {}
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+        self._session.headers["User-Agent"] = user_agent
+
+    def _origin(self, url):
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    def robots(self, url):
+        """The parsed robots.txt for url's site (fetched once per site)."""
+        origin = self._origin(url)
+        with self._lock:
+            parser = self._robots.get(origin)
+        if parser is not None:
+            return parser
+
+        parser = RobotFileParser(origin + "/robots.txt")
+        delays = {}
+        try:
+            response = self._session.get(origin + "/robots.txt", timeout=self.timeout)
+            if response.status_code in (401, 403):
+                parser.disallow_all = True
+            elif response.ok:
+                lines = response.text.splitlines()
+                parser.parse(lines)
+                delays = parse_crawl_delays(lines)
+            else:
+                parser.allow_all = True
+        except requests.RequestException:
+            parser.allow_all = True
+        parser.modified()
+
+        with self._lock:
+            self._delays.setdefault(origin, delays)
+            return self._robots.setdefault(origin, parser)
+
+    def allowed(self, url):
+        return self.robots(url).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url):
+        """Crawl-delay in seconds for our user agent (0 if none)."""
+        self.robots(url)
+        delays = self._delays.get(self._origin(url), {})
+        agent = self.user_agent.lower()
+        for name, delay in delays.items():
+            if name != "*" and name in agent:
+                return delay
+        return delays.get("*", 0.0)
+
+    def reserve(self, url):
+        """Book the next Crawl-delay slot for url's site; returns seconds to wait."""
+        delay = self.crawl_delay(url)
+        if not delay:
+            return 0.0
+        origin = self._origin(url)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(origin, now))
+            self._next_slot[origin] = slot + delay
+        return slot - now
+
+    def wait(self, url):
+        """Sleep until the next request to url's site is allowed by Crawl-delay."""
+        pause = self.reserve(url)
+        if pause > 0:
+            time.sleep(pause)
+
+    def sitemap_urls(self, site):
+        """Sitemaps declared in robots.txt, or the conventional locations."""
+        declared = self.robots(site).site_maps()
+        origin = self._origin(site)
+        return declared or [origin + path for path in DEFAULT_SITEMAPS]
+
+    def seed(self, site):
+        """Pages of site listed in its sitemaps and allowed by robots.txt."""
+        host = urlparse(site).netloc
+        queue = list(self.sitemap_urls(site))
+        seen_sitemaps, pages = set(), {}
+        while queue and len(seen_sitemaps) < self.max_sitemaps and len(pages) < self.max_urls:
+            sitemap = queue.pop(0)
+            if sitemap in seen_sitemaps:
+                continue
+            seen_sitemaps.add(sitemap)
+            try:
+                response = self._session.get(sitemap, timeout=self.timeout)
+                if response.status_code == 404:
+                    continue
+                response.raise_for_status()
+            except requests.RequestException as e:
+                self.log(f"Failed to read sitemap {sitemap}: {e}")
+                continue
+
+            page_urls, children = parse_sitemap(response.content)
+            queue.extend(urljoin(sitemap, child) for child in children)
+            for page in page_urls:
+                page = urljoin(sitemap, page)
+                if urlparse(page).netloc == host and self.allowed(page):
+                    pages.setdefault(page, None)
+                    if len(pages) >= self.max_urls:
+                        break
+
+        if pages:
+            self.log(f"Sitemaps of {site}: {len(pages)} page(s) from {len(seen_sitemaps)} sitemap(s).")
+        return list(pages)
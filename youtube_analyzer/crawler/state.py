@@ -0,0 +1,256 @@
+import itertools
+import json
+import sqlite3
+import threading
+import time
+
+from crawler.urls import url_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    seq INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS images (
+    url TEXT PRIMARY KEY,
+    sha1 TEXT,
+    path TEXT,
+    bytes INTEGER,
+    downloaded_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS resources (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    sha1 TEXT,
+    links TEXT,
+    images TEXT,
+    checked_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS discarded (
+    sha1 TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    label TEXT,
+    discarded_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Page statuses
+FETCHING = "fetching"
+DONE = "done"
+FAILED = "failed"
+
+# Resource change kinds, compared with the previous crawl
+NEW = "new"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+
+
+def conditional_headers(resource):
+    """If-None-Match / If-Modified-Since headers for a stored resource."""
+    headers = {}
+    if resource and resource["etag"]:
+        headers["If-None-Match"] = resource["etag"]
+    if resource and resource["last_modified"]:
+        headers["If-Modified-Since"] = resource["last_modified"]
+    return headers
+
+
+class CrawlStateStore:
+    """
+    On-disk crawl state (SQLite) so a crawl survives pauses and restarts.
+
+    Holds the frontier, the per-URL page status (which doubles as the
+    visited set), downloaded images with their content hashes, and crawl
+    settings. HTTP validators (ETag, Last-Modified, SHA-1) and the links and
+    images of every fetched page are kept across crawls so a re-crawl can
+    send conditional requests and skip unchanged content. Writes are
+    batched and committed every commit_every changes or when
+    flush()/close() is called; at most that many recent changes are redone
+    after a crash.
+    """
+
+    def __init__(self, path, commit_every=200):
+        self.path = path
+        self.commit_every = commit_every
+        self._lock = threading.Lock()
+        self._dirty = 0
+        self._seq = itertools.count(int(time.time() * 1000))
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def _write(self, sql, params=()):
+        with self._lock:
+            self._conn.execute(sql, params)
+            self._dirty += 1
+            if self._dirty >= self.commit_every:
+                self._conn.commit()
+                self._dirty = 0
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # -- frontier / pages -------------------------------------------------
+
+    def enqueue(self, url, depth):
+        """Remember a queued page (ignored if it is already queued or crawled)."""
+        key = url_key(url)
+        self._write(
+            "INSERT OR IGNORE INTO frontier (key, url, depth, seq) "
+            "SELECT ?, ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM pages WHERE key = ?)",
+            (key, url, depth, next(self._seq), key))
+
+    def enqueue_many(self, tasks):
+        """enqueue() each (url, depth) in tasks, e.g. from a worker thread of the asyncio engine."""
+        for url, depth in tasks:
+            self.enqueue(url, depth)
+
+    def start(self, url, depth):
+        """Move a page from the frontier to 'fetching'."""
+        key = url_key(url)
+        with self._lock:
+            self._conn.execute("DELETE FROM frontier WHERE key = ?", (key,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (key, url, depth, status, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (key, url, depth, FETCHING, time.time()))
+            self._dirty += 2
+            if self._dirty >= self.commit_every:
+                self._conn.commit()
+                self._dirty = 0
+
+    def finish(self, url, ok=True):
+        """Mark a page done (or failed)."""
+        self._write("UPDATE pages SET status = ?, updated_at = ? WHERE key = ?",
+                    (DONE if ok else FAILED, time.time(), url_key(url)))
+
+    def pending(self):
+        """
+        Work left from a previous run as [(url, depth)]: the saved frontier
+        plus pages that were mid-fetch when the process stopped.
+        """
+        rows = self._query(
+            "SELECT url, depth FROM pages WHERE status = ? "
+            "UNION ALL SELECT url, depth FROM frontier "
+            "WHERE key NOT IN (SELECT key FROM pages) ORDER BY depth DESC",
+            (FETCHING,))
+        return [(url, depth) for url, depth in rows]
+
+    def visited_urls(self):
+        """URLs already crawled to completion (done or failed)."""
+        rows = self._query("SELECT url FROM pages WHERE status IN (?, ?)", (DONE, FAILED))
+        return [url for (url,) in rows]
+
+    def has_pending(self):
+        rows = self._query(
+            "SELECT EXISTS(SELECT 1 FROM frontier WHERE key NOT IN (SELECT key FROM pages)) "
+            "OR EXISTS(SELECT 1 FROM pages WHERE status = ?)",
+            (FETCHING,))
+        return bool(rows[0][0])
+
+    # -- images ------------------------------------------------------------
+
+    def record_image(self, url, path, sha1, size):
+        self._write(
+            "INSERT OR REPLACE INTO images (url, sha1, path, bytes, downloaded_at) VALUES (?, ?, ?, ?, ?)",
+            (url, sha1, path, size, time.time()))
+
+    def has_image(self, url):
+        return bool(self._query("SELECT 1 FROM images WHERE url = ?", (url,)))
+
+    def image_count(self):
+        return self._query("SELECT COUNT(*) FROM images")[0][0]
+
+    def record_discard(self, url, sha1, label=None):
+        """Remember content the classifier deleted, so later crawls don't save it again."""
+        self._write("INSERT OR REPLACE INTO discarded (sha1, url, label, discarded_at) VALUES (?, ?, ?, ?)",
+                    (sha1, url, label, time.time()))
+
+    def is_discarded(self, sha1):
+        return bool(sha1) and bool(self._query("SELECT 1 FROM discarded WHERE sha1 = ?", (sha1,)))
+
+    # -- validators ---------------------------------------------------------
+
+    def resource(self, url):
+        """
+        What the last crawl saw at url, as a dict with etag, last_modified,
+        sha1, links and images (links/images are None for images), or None.
+        """
+        rows = self._query(
+            "SELECT etag, last_modified, sha1, links, images FROM resources WHERE key = ?", (url_key(url),))
+        if not rows:
+            return None
+        etag, last_modified, sha1, links, images = rows[0]
+        return {
+            "etag": etag,
+            "last_modified": last_modified,
+            "sha1": sha1,
+            "links": json.loads(links) if links is not None else None,
+            "images": json.loads(images) if images is not None else None,
+        }
+
+    def record_resource(self, url, etag, last_modified, sha1, links=None, images=None):
+        """Store the validators of a fetched resource; returns NEW, CHANGED or UNCHANGED."""
+        key = url_key(url)
+        with self._lock:
+            row = self._conn.execute("SELECT sha1 FROM resources WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO resources (key, url, etag, last_modified, sha1, links, images, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, etag, last_modified, sha1,
+                 json.dumps(sorted(links)) if links is not None else None,
+                 json.dumps(list(images)) if images is not None else None,
+                 time.time()))
+            self._dirty += 1
+            if self._dirty >= self.commit_every:
+                self._conn.commit()
+                self._dirty = 0
+        if row is None:
+            return NEW
+        return UNCHANGED if row[0] == sha1 else CHANGED
+
+    # -- settings ------------------------------------------------------------
+
+    def set_meta(self, key, value):
+        self._write("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def get_meta(self, key, default=None):
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return json.loads(rows[0][0]) if rows else default
+
+    # -- lifecycle -----------------------------------------------------------
+
+    def reset(self):
+        """Start a fresh crawl. Validators and discarded content are kept so it can still be conditional."""
+        with self._lock:
+            for table in ("frontier", "pages", "images", "meta"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.commit()
+            self._dirty = 0
+
+    def flush(self):
+        with self._lock:
+            self._conn.commit()
+            self._dirty = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+import tempfile
+import threading
+from urllib.parse import urlparse, unquote
+
+UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+MAX_NAME_LENGTH = 120
+
+
+def readable_name(url, content_type=None):
+    """
+    A safe file name for url: the last path segment, or "image" when the
+    path is empty, with an extension from Content-Type if it has none.
+    """
+    name = unquote(os.path.basename(urlparse(url).path))
+    name = UNSAFE_CHARS.sub("_", name).strip("._") or "image"
+    stem, ext = os.path.splitext(name)
+    if not ext and content_type:
+        ext = mimetypes.guess_extension(content_type.split(";")[0].strip()) or ""
+    return stem[:MAX_NAME_LENGTH] + ext.lower()
+
+
+def _file_sha1(path):
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+class ContentStore:
+    """
+    Content-addressed storage for downloaded files.
+
+    Every byte sequence is written once to <root>/.objects/ab/<sha1><ext>
+    and hard-linked (copied where links are not supported) under a readable
+    name in root. Two different files that want the same name get a short
+    hash suffix instead of overwriting each other, and the same file served
+    under several URLs is stored once. Each saved URL is appended to
+    manifest.jsonl as {"url", "sha1", "path", "bytes"}; annotate() appends
+    later lines for the same URL with more fields (e.g. a class label), and
+    discard() deletes a saved file again.
+    """
+
+    def __init__(self, root, objects_dir=".objects", manifest_name="manifest.jsonl"):
+        self.root = root
+        self.objects_root = os.path.join(root, objects_dir)
+        self.manifest_path = os.path.join(root, manifest_name)
+        self._lock = threading.Lock()
+        os.makedirs(self.objects_root, exist_ok=True)
+
+    def object_path(self, sha1, ext=""):
+        return os.path.join(self.objects_root, sha1[:2], sha1 + ext)
+
+    def find_object(self, sha1):
+        """Path of the stored object with this hash, or None."""
+        folder = os.path.join(self.objects_root, sha1[:2])
+        if os.path.isdir(folder):
+            for name in os.listdir(folder):
+                if name.split(".", 1)[0] == sha1:
+                    return os.path.join(folder, name)
+        return None
+
+    def has_object(self, sha1):
+        return bool(sha1) and self.find_object(sha1) is not None
+
+    def partial_path(self, url):
+        """Where a download of url is assembled; stable so an interrupted download can resume there."""
+        key = hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+        folder = os.path.join(self.objects_root, "partial")
+        os.makedirs(folder, exist_ok=True)
+        return os.path.join(folder, key)
+
+    def commit_file(self, url, path, sha1, size, content_type=None):
+        """Move a finished download (e.g. from partial_path) into the store."""
+        return self._commit(url, path, sha1, size, content_type)
+
+    def writer(self, url, content_type=None):
+        """Streaming writer for url; use as a context manager, result is in .result."""
+        return _ObjectWriter(self, url, content_type)
+
+    def link(self, url, sha1, content_type=None):
+        """Give an already stored object a readable name for url (e.g. after a 304)."""
+        object_path = self.find_object(sha1)
+        if object_path is None:
+            raise FileNotFoundError(sha1)
+        return self._publish(url, object_path, sha1, os.path.getsize(object_path), False, content_type)
+
+    def annotate(self, url, sha1, path, **fields):
+        """Append {"url", "sha1", "path", **fields} to the manifest for a saved URL."""
+        self._append({"url": url, "sha1": sha1, "path": path, **fields})
+
+    def discard(self, url, sha1, path, **fields):
+        """
+        Delete a saved file: its readable name, and the stored object too once
+        no other name links to it. Appends {"discarded": true, **fields} to
+        the manifest for url; returns True if the object was deleted.
+        """
+        if os.path.exists(path):
+            os.remove(path)
+        object_path = self.find_object(sha1)
+        removed = object_path is not None and os.stat(object_path).st_nlink <= 1
+        if removed:
+            os.remove(object_path)
+        self.annotate(url, sha1, path, discarded=True, **fields)
+        return removed
+
+    def _commit(self, url, temp_path, sha1, size, content_type):
+        name = readable_name(url, content_type)
+        object_path = self.object_path(sha1, os.path.splitext(name)[1])
+        existing = self.find_object(sha1)
+        if existing:
+            os.remove(temp_path)
+            object_path, duplicate = existing, True
+        else:
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            os.replace(temp_path, object_path)
+            duplicate = False
+        return self._publish(url, object_path, sha1, size, duplicate, content_type)
+
+    def _publish(self, url, object_path, sha1, size, duplicate, content_type):
+        path = self._link_readable(object_path, sha1, readable_name(url, content_type))
+        entry = {"url": url, "sha1": sha1, "path": path, "bytes": size}
+        self._append(entry)
+        return dict(entry, duplicate=duplicate)
+
+    def _append(self, entry):
+        with self._lock:
+            with open(self.manifest_path, "a", encoding="utf-8") as manifest:
+                manifest.write(json.dumps(entry) + "\n")
+
+    def _link_readable(self, object_path, sha1, name):
+        """Link object_path as name, or name-<hash> if name holds other content."""
+        stem, ext = os.path.splitext(name)
+        for candidate in (name, f"{stem}-{sha1[:10]}{ext}", f"{stem}-{sha1}{ext}"):
+            path = os.path.join(self.root, candidate)
+            try:
+                os.link(object_path, path)
+                return path
+            except FileExistsError:
+                if os.path.samefile(path, object_path) or _file_sha1(path) == sha1:
+                    return path
+            except OSError:
+                # No hard links on this filesystem: exclusive-create a copy
+                try:
+                    with open(object_path, "rb") as src, open(path, "xb") as dst:
+                        shutil.copyfileobj(src, dst)
+                    return path
+                except FileExistsError:
+                    if _file_sha1(path) == sha1:
+                        return path
+        raise FileExistsError(f"No free name for {name}")
+
+
+class _ObjectWriter:
+    """Hashes and writes a download to a temp file, then commits it to the store."""
+
+    def __init__(self, store, url, content_type):
+        self.store = store
+        self.url = url
+        self.content_type = content_type
+        self.sha1 = hashlib.sha1()
+        self.size = 0
+        self.result = None
+        fd, self.temp_path = tempfile.mkstemp(suffix=".part", dir=store.objects_root)
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk):
+        self._file.write(chunk)
+        self.sha1.update(chunk)
+        self.size += len(chunk)
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+            return False
+        self._file.close()
+        self.result = self.store._commit(self.url, self.temp_path, self.sha1.hexdigest(), self.size,
+                                         self.content_type)
+        return False
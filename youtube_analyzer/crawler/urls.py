@@ -0,0 +1,185 @@
+import hashlib
+import math
+import posixpath
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, unquote
+
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+# Query parameters that never change page content, only tracking.
+IGNORED_PARAMS = {"fbclid", "gclid", "msclkid", "mc_cid", "mc_eid"}
+IGNORED_PARAM_PREFIXES = ("utm_",)
+
+# Link kinds decided from the path extension alone, before any request
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif", ".bmp", ".svg", ".ico", ".tif", ".tiff"}
+SKIPPED_EXTENSIONS = {
+    ".pdf", ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar", ".tar", ".exe", ".msi", ".dmg", ".apk", ".iso",
+    ".bin", ".mp3", ".wav", ".ogg", ".flac", ".m4a", ".mp4", ".m4v", ".webm", ".mkv", ".avi", ".mov", ".wmv",
+    ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".odt", ".csv", ".json", ".xml", ".rss", ".css", ".js",
+    ".woff", ".woff2", ".ttf", ".otf", ".eot",
+}
+HTML_CONTENT_TYPES = {"text/html", "application/xhtml+xml"}
+PAGE = "page"
+IMAGE = "image"
+SKIP = "skip"
+
+
+def canonicalize_url(url):
+    """
+    Normalise a URL so trivially different spellings compare equal:
+    lower-case scheme/host, no default port, no fragment, dot-segments
+    resolved, no trailing slash (except the root), sorted query parameters
+    without tracking parameters.
+
+    Only for comparing URLs (see url_key): servers may answer the spellings
+    differently (/dir vs /dir/), so pages are fetched as written.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and str(parts.port) != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    if parts.username:
+        credentials = parts.username + (f":{parts.password}" if parts.password else "")
+        host = f"{credentials}@{host}"
+
+    path = parts.path or "/"
+    if "/." in path:
+        trailing = path.endswith("/")
+        path = posixpath.normpath(path)
+        if trailing and path != "/":
+            path += "/"
+    if path.startswith("//"):
+        path = "/" + path.lstrip("/")
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/") or "/"
+
+    params = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in IGNORED_PARAMS and not key.lower().startswith(IGNORED_PARAM_PREFIXES)
+    ]
+    query = urlencode(sorted(params))
+
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def link_kind(url):
+    """
+    PAGE, IMAGE or SKIP for a link, judged by its path extension only: a
+    direct image link is downloaded rather than parsed, and documents,
+    archives and media are never requested. Anything else (including no
+    extension) is a PAGE, confirmed later by its Content-Type.
+    """
+    path = unquote(urlsplit(url).path).lower()
+    extension = posixpath.splitext(path)[1]
+    if extension in IMAGE_EXTENSIONS:
+        return IMAGE
+    if extension in SKIPPED_EXTENSIONS:
+        return SKIP
+    return PAGE
+
+
+def content_kind(content_type):
+    """
+    PAGE, IMAGE or SKIP for a Content-Type header. A missing header is
+    taken to be HTML, as browsers would sniff it.
+    """
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if not media_type or media_type in HTML_CONTENT_TYPES:
+        return PAGE
+    if media_type.startswith("image/"):
+        return IMAGE
+    return SKIP
+
+
+def url_key(url):
+    """Dedup key for a URL: canonical form without the scheme (http == https)."""
+    canonical = canonicalize_url(url)
+    return canonical.split("://", 1)[-1]
+
+
+class VisitedSet:
+    """Thread-safe exact visited store keyed by url_key()."""
+
+    def __init__(self):
+        self._keys = set()
+        self._lock = threading.Lock()
+
+    def add(self, url):
+        """Atomically record url; returns True only the first time it is seen."""
+        key = url_key(url)
+        with self._lock:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+            return True
+
+    def __contains__(self, url):
+        key = url_key(url)
+        with self._lock:
+            return key in self._keys
+
+    def __len__(self):
+        with self._lock:
+            return len(self._keys)
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+
+
+class BloomVisitedSet:
+    """
+    Thread-safe Bloom filter visited store for multi-million-URL crawls.
+
+    Memory is fixed by capacity and error_rate (about 1.2 MB per million
+    URLs at 1%). A false positive means a page is wrongly treated as already
+    visited and skipped; pages are never fetched twice.
+    """
+
+    def __init__(self, capacity=10_000_000, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def _positions(self, url):
+        digest = hashlib.blake2b(url_key(url).encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, url):
+        """Atomically record url; returns True if it was (probably) not seen before."""
+        positions = self._positions(url)
+        with self._lock:
+            new = False
+            for pos in positions:
+                byte, bit = divmod(pos, 8)
+                if not self._bits[byte] & (1 << bit):
+                    self._bits[byte] |= 1 << bit
+                    new = True
+            if new:
+                self._count += 1
+            return new
+
+    def __contains__(self, url):
+        positions = self._positions(url)
+        with self._lock:
+            return all(self._bits[pos // 8] & (1 << (pos % 8)) for pos in positions)
+
+    def __len__(self):
+        return self._count
+
+    def clear(self):
+        with self._lock:
+            self._bits = bytearray(len(self._bits))
+            self._count = 0
+
+
+def make_visited_set(bloom=False, capacity=10_000_000):
+    """Exact set by default; a Bloom filter when memory must stay bounded."""
+    return BloomVisitedSet(capacity) if bloom else VisitedSet()
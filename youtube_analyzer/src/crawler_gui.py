@@ -0,0 +1,352 @@
+import os
+import threading
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+from urllib.parse import urlparse
+
+from crawler.engine import ImageCrawler
+from crawler.frontier import PRIORITIES
+from crawler.logsink import LogPipeline
+from src.log_view import LogView
+from src.preview import PreviewService
+
+PROGRESS_POLL_MS = 500
+
+
+class AdvancedImageScraper:
+    """
+    Tk front end for ImageCrawler, shared by the image scraper scripts.
+
+    The crawl runs on its own thread; Start and Resume are disabled until it
+    returns, and the progress bar and status line are refreshed from the
+    crawl's metrics on the Tk thread. font, text_width and geometry only
+    change the look; extras adds the JavaScript rendering and image
+    classification settings.
+    """
+
+    def __init__(self, root, title="Advanced Image Scraper", geometry="1000x800", font=None, text_width=100,
+                 extras=False):
+        self.root = root
+        self.root.title(title)
+        self.root.geometry(geometry)
+        self.font = font
+        self.text_width = text_width
+        self.extras = extras
+
+        # Variables and queues
+        self.logger = LogPipeline("scraper_log.jsonl")
+        self.stop_event = threading.Event()
+        self.crawler = None
+        self.retries = 3
+        self._running = False
+
+        # User input widgets
+        self._create_input_widgets()
+        self._create_progress_widgets()
+        self._create_log_widgets()
+        self._create_preview_widget()
+        self._set_running(False)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+
+    def _label(self, text, parent=None):
+        tk.Label(parent or self.root, text=text, font=self.font).pack()
+
+    def _create_input_widgets(self):
+        """Create widgets for user inputs."""
+        self._label("Enter URLs (one per line):")
+        self.url_input = tk.Text(self.root, height=6, width=self.text_width)
+        self.url_input.pack(pady=5)
+
+        self._label("Crawl Depth:")
+        self.depth_var = tk.StringVar(value="2")
+        tk.Entry(self.root, textvariable=self.depth_var, width=10).pack()
+
+        self._label("Skip images smaller than (in KB):")
+        self.min_size_var = tk.StringVar(value="10")
+        tk.Entry(self.root, textvariable=self.min_size_var, width=10).pack()
+
+        self._label("Exclude URLs matching (comma-separated text, *glob, re:regex, domain:host, depth<=N):")
+        self.exclude_patterns_var = tk.StringVar(value="")
+        tk.Entry(self.root, textvariable=self.exclude_patterns_var, width=100).pack()
+
+        self._label("Include URLs matching (comma-separated, same syntax):")
+        self.include_patterns_var = tk.StringVar(value="")
+        tk.Entry(self.root, textvariable=self.include_patterns_var, width=100).pack()
+
+        self._label("Maximum Threads:")
+        self.max_threads_var = tk.StringVar(value="10")
+        tk.Entry(self.root, textvariable=self.max_threads_var, width=10).pack()
+
+        self._label("Crawl Order:")
+        self.priority_var = tk.StringVar(value="Shallowest first")
+        ttk.Combobox(self.root, textvariable=self.priority_var, values=list(PRIORITIES), state="readonly", width=25).pack()
+
+        self._label("Fetch Engine (Asyncio handles thousands of connections on one thread):")
+        self.engine_var = tk.StringVar(value="Threads")
+        ttk.Combobox(self.root, textvariable=self.engine_var, values=["Threads", "Asyncio"], state="readonly", width=25).pack()
+
+        self._label("Async Connections (total / per host):")
+        self.async_connections_var = tk.StringVar(value="500")
+        self.async_per_host_var = tk.StringVar(value="8")
+        async_frame = tk.Frame(self.root)
+        async_frame.pack()
+        tk.Entry(async_frame, textvariable=self.async_connections_var, width=10).pack(side=tk.LEFT)
+        tk.Entry(async_frame, textvariable=self.async_per_host_var, width=10).pack(side=tk.LEFT)
+
+        self.bloom_visited_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.root, text="Bloom filter for visited URLs (bounded memory for multi-million-page crawls)",
+                       variable=self.bloom_visited_var).pack()
+
+        self.seed_sitemaps_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.root, text="Seed pages from sitemaps (honours robots.txt disallow and crawl-delay)",
+                       variable=self.seed_sitemaps_var).pack()
+
+        self.render_var = tk.BooleanVar(value=False)
+        if self.extras:
+            tk.Checkbutton(self.root, text="Render JavaScript-heavy sites in headless Chrome when plain HTTP finds too little",
+                           variable=self.render_var).pack()
+
+        self._label("Crawl Budget - pages / image MB / minutes / KB/s (blank = unlimited):")
+        self.budget_pages_var = tk.StringVar(value="")
+        self.budget_image_mb_var = tk.StringVar(value="")
+        self.budget_minutes_var = tk.StringVar(value="")
+        self.budget_kbps_var = tk.StringVar(value="")
+        budget_frame = tk.Frame(self.root)
+        budget_frame.pack()
+        for var in (self.budget_pages_var, self.budget_image_mb_var, self.budget_minutes_var, self.budget_kbps_var):
+            tk.Entry(budget_frame, textvariable=var, width=10).pack(side=tk.LEFT)
+
+        self._label("Per-host Budget - pages / image MB / KB/s (blank = unlimited):")
+        self.host_budget_pages_var = tk.StringVar(value="")
+        self.host_budget_image_mb_var = tk.StringVar(value="")
+        self.host_budget_kbps_var = tk.StringVar(value="")
+        host_budget_frame = tk.Frame(self.root)
+        host_budget_frame.pack()
+        for var in (self.host_budget_pages_var, self.host_budget_image_mb_var, self.host_budget_kbps_var):
+            tk.Entry(host_budget_frame, textvariable=var, width=10).pack(side=tk.LEFT)
+
+        self._label("Request Delay per host (seconds):")
+        self.request_delay_var = tk.StringVar(value="1")
+        tk.Entry(self.root, textvariable=self.request_delay_var, width=10).pack()
+
+        self.classify_model_var = tk.StringVar(value="")
+        self.classify_labels_var = tk.StringVar(value="")
+        self.classify_discard_var = tk.StringVar(value="")
+        if self.extras:
+            self._label("Classify images with model (.onnx / Keras file, blank = off) / labels / discard labels:")
+            classify_frame = tk.Frame(self.root)
+            classify_frame.pack()
+            tk.Entry(classify_frame, textvariable=self.classify_model_var, width=50).pack(side=tk.LEFT)
+            tk.Button(classify_frame, text="Browse", command=self._select_model_file).pack(side=tk.LEFT)
+            tk.Entry(classify_frame, textvariable=self.classify_labels_var, width=30).pack(side=tk.LEFT)
+            tk.Entry(classify_frame, textvariable=self.classify_discard_var, width=20).pack(side=tk.LEFT)
+
+        self._label("Output Folder:")
+        self.output_path_var = tk.StringVar(value="Downloaded_Images")
+        tk.Entry(self.root, textvariable=self.output_path_var, width=80).pack()
+        tk.Button(self.root, text="Browse", command=self._select_output_folder).pack()
+
+    def _create_progress_widgets(self):
+        """Create progress bar and status display widgets."""
+        self.progress_bar = ttk.Progressbar(self.root, orient="horizontal", length=800, mode="determinate")
+        self.progress_bar.pack(pady=10)
+
+        self.status_label = tk.Label(self.root, text="Status: Ready", font=self.font, fg="blue")
+        self.status_label.pack()
+
+    def _create_log_widgets(self):
+        """Create widgets for log display."""
+        self._label("Logs:")
+        self.log_panel = tk.Text(self.root, height=10, width=self.text_width + 20, state="disabled")
+        self.log_panel.pack()
+        self.log_view = LogView(self.root, self.log_panel, source=self.logger.drain_gui)
+        self.log_view.level_selector(self.root).pack()
+
+    def _create_preview_widget(self):
+        """Create widgets for image preview."""
+        self._label("Image Preview:")
+        self.image_label = tk.Label(self.root)
+        self.image_label.pack()
+        self.preview = PreviewService(self.root, self.image_label)
+
+        # Control buttons
+        self.start_button = ttk.Button(self.root, text="Start Scraping", command=self._start_scraping)
+        self.start_button.pack(side=tk.LEFT, padx=10, pady=10)
+
+        self.pause_button = ttk.Button(self.root, text="Pause", command=self._pause_scraping)
+        self.pause_button.pack(side=tk.LEFT, padx=10)
+
+        self.resume_button = ttk.Button(self.root, text="Resume", command=self._resume_scraping)
+        self.resume_button.pack(side=tk.LEFT, padx=10)
+
+    def _select_output_folder(self):
+        """Open a folder selection dialog."""
+        folder = filedialog.askdirectory()
+        if folder:
+            self.output_path_var.set(folder)
+
+    def _select_model_file(self):
+        """Open a file dialog for the classification model."""
+        path = filedialog.askopenfilename(filetypes=[("Models", "*.onnx *.keras *.h5"), ("All files", "*.*")])
+        if path:
+            self.classify_model_var.set(path)
+
+    def log_message(self, message):
+        """Log a message; the writer thread saves it and the GUI shows a sample."""
+        self.logger.log(message)
+
+    def _start_scraping(self):
+        """Start the scraping process, or continue an interrupted crawl."""
+        if self._running:
+            return
+        urls = self.url_input.get("1.0", tk.END).strip().split("\n")
+        urls = [self._clean_url(url.strip()) for url in urls if url.strip()]
+        try:
+            config = self._crawl_config()
+        except ValueError:
+            messagebox.showerror("Error", "Depth, threads, connections, delay and budgets must be numbers.")
+            return
+
+        if self.crawler is not None:
+            self.crawler.close()
+        try:
+            self.crawler = ImageCrawler(config, log=self.log_message, on_image=self._update_image_preview,
+                                        stop_event=self.stop_event)
+        except ValueError as e:
+            self.crawler = None
+            messagebox.showerror("Error", f"Invalid setting: {e}")
+            return
+        resume = self.crawler.open() and messagebox.askyesno(
+            "Resume Crawl", "This output folder has an unfinished crawl. Continue where it stopped?")
+        if not urls and not resume:
+            messagebox.showerror("Error", "Please enter at least one URL.")
+            return
+
+        self.crawler.prepare(urls, resume=resume)
+        self._run_crawl()
+
+    def _crawl_config(self):
+        """Crawl settings from the input fields; blank budget fields are unlimited. Raises ValueError."""
+        def number(var, scale=1):
+            value = var.get().strip()
+            return float(value) * scale if value else None
+
+        pages = number(self.budget_pages_var)
+        host_pages = number(self.host_budget_pages_var)
+        return {
+            "output": self.output_path_var.get(),
+            "depth": int(self.depth_var.get()),
+            "include": self.include_patterns_var.get().split(","),
+            "exclude": self.exclude_patterns_var.get().split(","),
+            "engine": self.engine_var.get().lower(),
+            "threads": int(self.max_threads_var.get()),
+            "async_connections": int(self.async_connections_var.get()),
+            "async_per_host": int(self.async_per_host_var.get()),
+            "priority": self.priority_var.get(),
+            "bloom_visited": self.bloom_visited_var.get(),
+            "sitemaps": self.seed_sitemaps_var.get(),
+            "render": self.render_var.get(),
+            "request_delay": float(self.request_delay_var.get() or 0),
+            "retries": self.retries,
+            # The model loads in its own process, and only when a model is given
+            "classify_model": self.classify_model_var.get().strip() or None,
+            "classify_labels": self._labels(self.classify_labels_var.get()),
+            "classify_discard": self.classify_discard_var.get().split(","),
+            "budget": {
+                "max_pages": int(pages) if pages is not None else None,
+                "max_image_bytes": number(self.budget_image_mb_var, 1024 * 1024),
+                "max_seconds": number(self.budget_minutes_var, 60),
+                "bytes_per_second": number(self.budget_kbps_var, 1024),
+                "host_max_pages": int(host_pages) if host_pages is not None else None,
+                "host_max_image_bytes": number(self.host_budget_image_mb_var, 1024 * 1024),
+                "host_bytes_per_second": number(self.host_budget_kbps_var, 1024),
+            },
+        }
+
+    @staticmethod
+    def _labels(value):
+        """Class names typed comma-separated, or the path of a labels file."""
+        value = value.strip()
+        return value if os.path.isfile(value) else [label.strip() for label in value.split(",") if label.strip()]
+
+    def _run_crawl(self):
+        """Run the crawler on a worker thread; Start and Resume stay disabled until it returns."""
+        self._set_running(True)
+        self.status_label.config(text="Status: Crawling", fg="green")
+        threading.Thread(target=self._crawl_worker, args=(self.crawler,)).start()
+        self._show_progress()
+
+    def _crawl_worker(self, crawler):
+        try:
+            report = crawler.run()
+        except Exception as e:
+            self.log_message(f"Error: crawl failed ({e})")
+            report = None
+        try:
+            self.root.after(0, self._crawl_finished, report)
+        except (RuntimeError, tk.TclError):
+            pass  # the window was closed while the crawl wound down
+
+    def _crawl_finished(self, report):
+        self._set_running(False)
+        self._show_progress()
+        if report is None:
+            self.status_label.config(text="Status: Stopped by an error (see logs)", fg="red")
+        elif self.stop_event.is_set() and not report["budget"]["exhausted"]:
+            self.status_label.config(text="Status: Paused", fg="orange")
+        elif report["partial"]:
+            self.status_label.config(text="Status: Stopped by the crawl budget (partial results)", fg="orange")
+        else:
+            self.progress_bar["value"] = self.progress_bar["maximum"]
+            self.status_label.config(text="Status: Finished", fg="blue")
+
+    def _show_progress(self):
+        """Pages crawled out of crawled + queued, refreshed every PROGRESS_POLL_MS while running."""
+        if self.crawler is None:
+            return
+        metrics = self.crawler.metrics
+        fetched = metrics.counter_total("pages_fetched_total")
+        queued = metrics.gauge_total("frontier_queued")
+        self.progress_bar["maximum"] = max(1, fetched + queued)
+        self.progress_bar["value"] = fetched
+        if self._running:
+            self.status_label.config(text=f"Status: Crawling - {fetched} page(s) done, {queued} queued")
+            self.root.after(PROGRESS_POLL_MS, self._show_progress)
+
+    def _set_running(self, running):
+        self._running = running
+        for button, enabled in ((self.start_button, not running), (self.resume_button, not running),
+                                (self.pause_button, running)):
+            button.state(["!disabled"] if enabled else ["disabled"])
+
+    def _pause_scraping(self):
+        """Pause the scraping process; queued pages stay in the frontier."""
+        if self.crawler is not None:
+            self.crawler.pause()
+        self.status_label.config(text="Status: Pausing after in-flight pages...", fg="orange")
+
+    def _on_close(self):
+        """Stop workers and commit the crawl state before closing the window."""
+        self.stop_event.set()
+        if self.crawler is not None:
+            self.crawler.close()
+        self.preview.close()
+        self.log_view.close()
+        self.logger.close()
+        self.root.destroy()
+
+    def _resume_scraping(self):
+        """Resume the scraping process."""
+        if self.crawler is None or self._running:
+            return
+        self.crawler.resume()
+        self._run_crawl()
+
+    def _clean_url(self, url):
+        """Normalize the URL."""
+        parsed_url = urlparse(url)
+        return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+    def _update_image_preview(self, filepath):
+        """Queue an image preview; decoding and display happen off this thread."""
+        self.preview.show(filepath)
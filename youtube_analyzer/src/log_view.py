@@ -0,0 +1,121 @@
+import time
+import tkinter as tk
+from collections import deque
+from datetime import datetime
+from tkinter import ttk
+
+from crawler.logsink import LEVELS, guess_level
+
+LEVEL_COLORS = {"WARNING": "#b36b00", "ERROR": "#c00000", "DEBUG": "#808080"}
+
+
+class LogView:
+    """
+    Bounded, batched log display for a tk.Text widget.
+
+    push() can be called from any thread and only appends to a queue. On
+    the Tk thread the queue is drained every poll_ms in one batch, lines go
+    into a ring buffer of the last max_lines, and the widget is trimmed to
+    the same size, so it stays fast however long the program runs. Lines
+    below the selected level are hidden; changing the level redraws from
+    the ring buffer. source, if given, is polled for extra records (e.g.
+    LogPipeline.drain_gui) shaped like {"ts", "level", "msg"}.
+    """
+
+    def __init__(self, root, text, max_lines=2000, poll_ms=200, batch_size=1000,
+                 timestamps=False, source=None):
+        self.root = root
+        self.text = text
+        self.max_lines = max_lines
+        self.poll_ms = poll_ms
+        self.batch_size = batch_size
+        self.timestamps = timestamps
+        self.source = source
+        self.min_level = "DEBUG"
+        self.lines = deque(maxlen=max_lines)
+        self._incoming = deque(maxlen=max_lines)  # older lines would be trimmed anyway
+        self._shown = 0
+        self._readonly = str(text.cget("state")) == tk.DISABLED
+        self._closed = False
+        for level, color in LEVEL_COLORS.items():
+            text.tag_configure(level, foreground=color)
+
+        self.root.after(self.poll_ms, self._drain)
+
+    def push(self, message, level=None):
+        """Queue a line for display (thread-safe, never touches Tk)."""
+        self._incoming.append({"ts": time.time(), "level": level or guess_level(message), "msg": message})
+
+    def level_selector(self, parent):
+        """A "Show:" combobox that sets the minimum level; returns its frame to be placed."""
+        frame = tk.Frame(parent)
+        tk.Label(frame, text="Show:").pack(side="left")
+        var = tk.StringVar(value=self.min_level)
+        box = ttk.Combobox(frame, textvariable=var, values=LEVELS, state="readonly", width=10)
+        box.pack(side="left")
+        box.bind("<<ComboboxSelected>>", lambda event: self.set_level(var.get()))
+        return frame
+
+    def set_level(self, level):
+        """Show only lines at level or above, redrawing from the ring buffer."""
+        self.min_level = level
+        self.text.config(state="normal")
+        self.text.delete("1.0", tk.END)
+        self._shown = 0
+        self._insert([line for line in self.lines if self._visible(line[0])])
+
+    def clear(self):
+        self.lines.clear()
+        self.set_level(self.min_level)
+
+    def close(self):
+        self._closed = True
+
+    def _visible(self, level):
+        return LEVELS.index(level if level in LEVELS else "INFO") >= LEVELS.index(self.min_level)
+
+    def _format(self, record):
+        if not self.timestamps:
+            return record["msg"] + "\n"
+        when = datetime.fromtimestamp(record["ts"])
+        return f"{when.strftime('%H:%M:%S')} - {record['msg']}\n"
+
+    def _take(self):
+        records = []
+        while self._incoming and len(records) < self.batch_size:
+            records.append(self._incoming.popleft())
+        if self.source is not None and len(records) < self.batch_size:
+            records.extend(self.source(self.batch_size - len(records)))
+        return records
+
+    def _drain(self):
+        """Runs on the Tk thread: move one batch into the ring buffer and widget."""
+        if self._closed:
+            return
+        try:
+            records = self._take()
+            if records:
+                new_lines = [(record["level"], self._format(record)) for record in records]
+                self.lines.extend(new_lines)
+                self.text.config(state="normal")
+                self._insert([line for line in new_lines[-self.max_lines:] if self._visible(line[0])])
+        finally:
+            self.root.after(self.poll_ms, self._drain)
+
+    def _insert(self, lines):
+        """Append lines (widget already writable), trim to max_lines and keep the tail in view."""
+        follow = self.text.yview()[1] >= 0.999
+        if lines:
+            chunks = []
+            for level, line in lines:
+                chunks.extend((line, level))
+            self.text.insert(tk.END, *chunks)
+            self._shown += sum(line.count("\n") for _, line in lines)
+            excess = self._shown - self.max_lines
+            if excess > 0:
+                self.text.delete("1.0", f"{excess + 1}.0")
+                self._shown = self.max_lines
+            if follow:
+                self.text.see(tk.END)
+        if self._readonly:
+            self.text.config(state="disabled")
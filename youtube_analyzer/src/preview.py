@@ -0,0 +1,121 @@
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Empty
+
+from PIL import Image, ImageTk
+
+
+def decode_thumbnail(image_path, size):
+    """
+    Decode an image at reduced size and return (width, height, rgb_bytes).
+    JPEGs use draft mode so the decoder itself scales down by up to 8x.
+    """
+    with Image.open(image_path) as image:
+        if image.format == "JPEG":
+            image.draft("RGB", size)
+        image.thumbnail(size)
+        rgb = image.convert("RGB")
+        return rgb.width, rgb.height, rgb.tobytes()
+
+
+class PreviewService:
+    """
+    Decodes preview thumbnails off the Tk thread.
+
+    show() can be called from any thread. Decoding runs on a small pool and
+    only the most recent request is kept while one is in flight, so a fast
+    crawl never queues up thousands of decodes. Decoded RGB buffers are passed
+    to the Tk main loop through a queue, where PhotoImages are created and
+    kept in an LRU cache.
+    """
+
+    def __init__(self, root, label, size=(200, 200), max_workers=2, cache_size=64, poll_ms=50):
+        self.root = root
+        self.label = label
+        self.size = size
+        self.cache_size = cache_size
+        self.poll_ms = poll_ms
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._ready = Queue()
+        self._photos = OrderedDict()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._max_in_flight = max_workers
+        self._next_path = None
+        self._closed = False
+
+        self.root.after(self.poll_ms, self._drain)
+
+    def show(self, image_path):
+        """Request a preview of image_path (thread-safe, never blocks)."""
+        with self._lock:
+            if self._closed:
+                return
+            if image_path in self._photos:
+                self._ready.put((image_path, None))
+                return
+            if self._in_flight >= self._max_in_flight:
+                # Busy: remember only the newest request
+                self._next_path = image_path
+                return
+            self._in_flight += 1
+        self._executor.submit(self._decode, image_path)
+
+    def _decode(self, image_path):
+        try:
+            self._ready.put((image_path, decode_thumbnail(image_path, self.size)))
+        except Exception as e:
+            logging.error(f"Error decoding preview {image_path}: {e}")
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                next_path, self._next_path = self._next_path, None
+            if next_path:
+                self.show(next_path)
+
+    def _drain(self):
+        """Runs on the Tk thread: display the newest decoded preview."""
+        latest = None
+        while True:
+            try:
+                latest = self._ready.get_nowait()
+            except Empty:
+                break
+
+        if latest is not None:
+            image_path, decoded = latest
+            try:
+                photo = self._photo_for(image_path, decoded)
+                if photo is not None:
+                    self.label.configure(image=photo)
+                    self.label.image = photo
+            except Exception as e:
+                logging.error(f"Error displaying preview: {e}")
+
+        if not self._closed:
+            self.root.after(self.poll_ms, self._drain)
+
+    def _photo_for(self, image_path, decoded):
+        with self._lock:
+            if image_path in self._photos:
+                self._photos.move_to_end(image_path)
+                return self._photos[image_path]
+        if decoded is None:
+            return None
+
+        width, height, data = decoded
+        photo = ImageTk.PhotoImage(Image.frombytes("RGB", (width, height), data))
+        with self._lock:
+            self._photos[image_path] = photo
+            while len(self._photos) > self.cache_size:
+                self._photos.popitem(last=False)
+        return photo
+
+    def close(self):
+        """Stop polling and decoding."""
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=False)
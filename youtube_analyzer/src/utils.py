@@ -3,6 +3,7 @@ import os
 import requests
 import logging
 from ..config import LOG_FILE
+from crawler.download import Downloader
 
 def setup_logging():
     os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
@@ -35,15 +36,11 @@ def download_image(url, folder):
             filename += '.jpg'
         file_path = os.path.join(folder, filename)
 
-        r = requests.get(url, stream=True)
-        if r.status_code == 200:
-            with open(file_path, 'wb') as f:
-                for chunk in r.iter_content(1024):
-                    f.write(chunk)
-            log_info(f"Thumbnail saved: {file_path}")
-            return file_path
-        else:
-            log_error(f"Failed to download image: {url} (status code: {r.status_code})")
+        Downloader(log=log_info).fetch(url, file_path)
+        log_info(f"Thumbnail saved: {file_path}")
+        return file_path
+    except requests.HTTPError as e:
+        log_error(f"Failed to download image: {url} (status code: {e.response.status_code})")
     except Exception as e:
         log_error(f"Exception during image download: {e}")
     return ""
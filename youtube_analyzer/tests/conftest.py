@@ -0,0 +1,58 @@
+import os
+import sys
+import threading
+from collections import Counter
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import pytest
+
+# The crawler package is imported as "crawler", from youtube_analyzer/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Smallest valid PNG (1x1)
+PNG_1X1 = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c63f8cfc0f01f0005000201ffa5f8d7"
+    "0000000049454e44ae426082")
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    hits = None
+
+    def do_GET(self):
+        self.hits[self.path] += 1
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+def make_site(root, pages=8):
+    """index.html linking to p1..pN.html, each with its own image."""
+    links = "".join(f'<a href="/p{i}.html">page {i}</a>' for i in range(1, pages + 1))
+    with open(os.path.join(root, "index.html"), "w") as f:
+        f.write(f"<html><body>{links}</body></html>")
+    for i in range(1, pages + 1):
+        with open(os.path.join(root, f"p{i}.html"), "w") as f:
+            f.write(f'<html><body><img src="/img{i}.png"><a href="/index.html">home</a></body></html>')
+        with open(os.path.join(root, f"img{i}.png"), "wb") as f:
+            f.write(PNG_1X1 + bytes([i]))
+
+
+@pytest.fixture
+def site(tmp_path):
+    """A small static site on localhost; .url is its index page, .hits counts GETs per path."""
+    root = tmp_path / "site"
+    root.mkdir()
+    make_site(str(root))
+    hits = Counter()
+    handler = type("Handler", (_Handler,), {"hits": hits})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(handler, directory=str(root)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/index.html"
+    server.hits = hits
+    server.root = root
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from crawler.async_engine import AsyncCrawlEngine  # noqa: E402
+from crawler.extract import extract_page  # noqa: E402
+from crawler.metrics import MetricsRegistry  # noqa: E402
+from crawler.state import CrawlStateStore  # noqa: E402
+from crawler.store import ContentStore  # noqa: E402
+from test_engine import crawl  # noqa: E402
+
+
+def test_asyncio_crawl_saves_every_image_and_recrawls_conditionally(site, tmp_path):
+    output = tmp_path / "out"
+    report, metrics = crawl([site.url], output, engine="asyncio")
+    assert not report["partial"]
+    assert sorted(p.name for p in output.glob("img*.png")) == [f"img{i}.png" for i in range(1, 9)]
+    assert report["changes"]["new"] == 17  # 9 pages, 8 images
+    assert metrics.counter_total("images_saved_total") == 8
+
+    report, _ = crawl([site.url], output, engine="asyncio")
+    assert report["changes"] == {"new": 0, "changed": 0, "unchanged": 17}
+    assert site.hits["/img1.png"] == 2  # asked again, answered 304 the second time
+
+
+class ThreadRecordingState(CrawlStateStore):
+    """Remembers which threads wrote to it."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.threads = set()
+
+    def _write(self, sql, params=()):
+        self.threads.add(threading.get_ident())
+        super()._write(sql, params)
+
+
+def engine(tmp_path, **kwargs):
+    return AsyncCrawlEngine(extract_page, ContentStore(str(tmp_path / "out")), log=kwargs.pop("log", print),
+                            metrics=MetricsRegistry(), **kwargs)
+
+
+def test_state_writes_stay_off_the_event_loop(site, tmp_path):
+    state = ThreadRecordingState(str(tmp_path / "state.sqlite"))
+    loop_threads = []
+    crawler = engine(tmp_path, state=state, log=lambda message: loop_threads.append(threading.get_ident()))
+    try:
+        assert crawler.run([(site.url, 2)]) == []
+    finally:
+        state.close()
+    assert crawler.images_saved == 8
+    assert state.threads and not state.threads & set(loop_threads)
+
+
+def test_oversized_page_is_cut_with_a_warning(site, tmp_path):
+    links = "".join(f'<a href="/p{i}.html">page {i}</a>' for i in range(1, 9))
+    (site.root / "index.html").write_text(f"<html><body>{links}{' ' * 100_000}<a href='/late.html'>x</a></body></html>")
+    messages = []
+    crawler = engine(tmp_path, log=messages.append, max_page_bytes=8 * 1024, chunk_size=1024)
+    crawler.run([(site.url, 2)])
+    assert crawler.metrics.counter_total("pages_truncated_total") == 1
+    assert any(message.startswith("Warning: page over 8 KB") for message in messages)
+    assert site.hits["/p1.html"] == 1 and site.hits["/late.html"] == 0
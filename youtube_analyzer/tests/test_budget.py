@@ -0,0 +1,78 @@
+import pytest
+
+from crawler import budget as budget_module
+from crawler.budget import CrawlBudget, BudgetExceeded, TokenBucket
+from crawler.image_probe import ImageProber
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(budget_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_max_pages_ends_the_crawl(clock):
+    budget = CrawlBudget(max_pages=2)
+    assert budget.allow_page("http://a.example/1") and budget.allow_page("http://b.example/1")
+    assert not budget.allow_page("http://a.example/2")
+    assert budget.exhausted == "max pages"
+    assert not budget.allow_image("http://a.example/img.png")
+    assert budget.charge("http://a.example/1", 100) == 0  # a page already started may finish
+
+
+def test_host_limits_only_stop_that_host(clock):
+    budget = CrawlBudget(host_max_pages=1, host_max_image_bytes=10)
+    assert budget.allow_page("http://a.example/1")
+    assert not budget.allow_page("http://a.example/2")
+    assert budget.allow_page("http://b.example/1")
+    with pytest.raises(BudgetExceeded):
+        budget.charge("http://b.example/big.png", 11, image=True)
+    assert budget.exhausted is None
+    assert budget.report()["hosts_over_budget"] == ["a.example", "b.example"]
+
+
+def test_image_bytes_are_refused_before_they_overrun(clock):
+    budget = CrawlBudget(max_image_bytes=100)
+    budget.charge("http://a.example/1.png", 60, image=True)
+    with pytest.raises(BudgetExceeded, match="max image bytes"):
+        budget.charge("http://a.example/2.png", 60, image=True)
+    assert budget.report()["image_bytes"] == 60
+    with pytest.raises(BudgetExceeded):
+        budget.charge("http://a.example/page.html", 1)  # nothing more is read after that
+
+
+def test_max_seconds(clock):
+    budget = CrawlBudget(max_seconds=60)
+    assert budget.allow_page("http://a.example/")
+    clock[0] += 61
+    assert not budget.allow_page("http://a.example/2")
+    assert budget.exhausted == "max duration"
+
+
+def test_bandwidth_wait_and_deadline(clock):
+    budget = CrawlBudget(bytes_per_second=1000)
+    assert budget.charge("http://a.example/x", 1000) == 0
+    assert budget.charge("http://a.example/x", 500) == pytest.approx(0.5)
+
+    short = CrawlBudget(bytes_per_second=1000, max_seconds=1)
+    with pytest.raises(BudgetExceeded, match="max duration"):
+        short.charge("http://a.example/x", 5000)  # waiting it out would run past the deadline
+
+
+def test_token_bucket_refills(clock):
+    bucket = TokenBucket(100)
+    assert bucket.reserve(100) == 0
+    assert bucket.reserve(50) == pytest.approx(0.5)
+    clock[0] += 2
+    assert bucket.reserve(100) == 0
+
+
+def test_image_prober_download_stops_at_the_image_budget(site, tmp_path):
+    (site.root / "big.png").write_bytes((site.root / "img1.png").read_bytes() + bytes(20_000))
+    budget = CrawlBudget(max_image_bytes=5000)
+    prober = ImageProber(budget=budget, download_chunk_size=1024)
+    with pytest.raises(BudgetExceeded):
+        prober.download(site.url.replace("index.html", "big.png"), str(tmp_path / "big.png"))
+    assert budget.exhausted == "max image bytes" and budget.image_bytes <= 5000
+    assert not (tmp_path / "big.png").exists()
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+
+from crawler.classify import ImageClassifier
+from crawler.state import CrawlStateStore
+from crawler.store import ContentStore
+from conftest import PNG_1X1
+from test_engine import crawl
+
+MODEL = "test_classify:by_name"  # loaded in the classifier's worker process by module:factory
+
+
+def by_name(labels):
+    """A stand-in model: images named junk* or img1* are "junk", the rest "keep"."""
+    def predict(paths):
+        return [("junk", 0.9) if os.path.basename(path).startswith(("junk", "img1")) else ("keep", 0.8)
+                for path in paths]
+    return predict
+
+
+def save(store, url, data):
+    with store.writer(url) as writer:
+        writer.write(data)
+    return writer.result
+
+
+def objects(store):
+    return [name for _, _, names in os.walk(store.objects_root) for name in names]
+
+
+def test_discard_keeps_the_object_while_another_name_links_to_it(tmp_path):
+    store = ContentStore(str(tmp_path))
+    first = save(store, "http://a.example/one.png", b"same bytes")
+    second = save(store, "http://b.example/two.png", b"same bytes")
+    assert not store.discard(first["url"], first["sha1"], first["path"], label="junk")
+    assert not os.path.exists(first["path"]) and objects(store)
+    assert store.discard(second["url"], second["sha1"], second["path"], label="junk")
+    assert not objects(store) and not store.has_object(first["sha1"])
+    lines = [json.loads(line) for line in open(store.manifest_path)]
+    assert [line.get("discarded") for line in lines] == [None, None, True, True]
+
+
+def test_classifier_discards_and_reports_only_the_discard_classes(tmp_path):
+    store = ContentStore(str(tmp_path))
+    junk = save(store, "http://a.example/junk.png", b"junk")
+    keep = save(store, "http://a.example/cat.png", b"cat")
+    discarded = []
+    classifier = ImageClassifier(MODEL, store, discard=["junk"], log=lambda message: None,
+                                 on_discard=lambda saved, label: discarded.append((saved["url"], label)))
+    try:
+        classifier.submit(junk)
+        classifier.submit(keep)
+        classifier.wait()
+    finally:
+        classifier.close()
+    assert not classifier.failed
+    assert discarded == [("http://a.example/junk.png", "junk")]
+    assert not os.path.exists(junk["path"]) and not store.has_object(junk["sha1"])
+    assert os.path.exists(keep["path"])
+    labels = {line["url"]: line for line in map(json.loads, open(store.manifest_path)) if "label" in line}
+    assert labels["http://a.example/junk.png"]["discarded"] is True
+    assert labels["http://a.example/cat.png"]["label"] == "keep"
+    assert labels["http://a.example/cat.png"]["discarded"] is False
+
+
+def test_discarded_content_is_not_saved_again_by_the_next_crawl(site, tmp_path):
+    output = tmp_path / "out"
+    config = {"classify_model": MODEL, "classify_discard": ["junk"]}
+    crawl([site.url], output, **config)
+    assert not (output / "img1.png").exists() and (output / "img2.png").exists()
+
+    state = CrawlStateStore(str(output / "crawl_state.sqlite"))
+    try:
+        assert state.image_count() == 8
+        assert state.is_discarded(hashlib.sha1(PNG_1X1 + bytes([1])).hexdigest())
+        assert not state.is_discarded(hashlib.sha1(PNG_1X1 + bytes([2])).hexdigest())
+    finally:
+        state.close()
+
+    crawl([site.url], output, **config)  # a fresh crawl of the same site into the same folder
+    assert not (output / "img1.png").exists() and (output / "img2.png").exists()
@@ -0,0 +1,18 @@
+import pytest
+
+from crawler.cli import main, read_seeds
+
+
+def test_read_seeds_from_files_urls_and_hosts(tmp_path):
+    seeds = tmp_path / "sites.txt"
+    seeds.write_text("# galleries\nhttp://a.example/\nb.example  # bare host\n\nhttp://a.example/\n")
+    assert read_seeds([str(seeds), "c.example:8080", "http://d.example/x"]) == [
+        "http://a.example/", "https://b.example", "https://c.example:8080", "http://d.example/x"]
+
+
+@pytest.mark.parametrize("source", ["missing.txt", "seeds/sites", "C:\\seeds\\sites.csv"])
+def test_missing_seed_file_is_an_error(source, capsys):
+    with pytest.raises(ValueError, match="seed file not found"):
+        read_seeds([source])
+    assert main([source, "--output", "unused"]) == 2
+    assert "seed file not found" in capsys.readouterr().err
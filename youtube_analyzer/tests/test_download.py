@@ -0,0 +1,133 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from crawler.download import Downloader, PartialDownload, IncompleteDownload, content_length
+
+DATA = bytes(range(256)) * 800  # 200 KiB
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """
+    Serves server.data with ETag and Range/If-Range; drops the connection on
+    the first drop_after bytes, and answers with at most max_body bytes (as a
+    206 for that range) when max_body is set.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.ranges.append(self.headers.get("Range"))
+        start = 0
+        if self.headers.get("Range") and self.headers.get("If-Range", server.etag) == server.etag:
+            start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+        if start >= len(server.data):
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{len(server.data)}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = server.data[start:server.max_body and start + server.max_body]
+        partial = start or len(body) < len(server.data) - start
+        self.send_response(206 if partial else 200)
+        if partial:
+            self.send_header("Content-Range", f"bytes {start}-{start + len(body) - 1}/{len(server.data)}")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", server.etag)
+        self.end_headers()
+        if server.drop_after:
+            body, server.drop_after = body[:server.drop_after], None
+            self.wfile.write(body)
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    server.data, server.etag, server.drop_after, server.max_body, server.ranges = DATA, '"v1"', None, None, []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/file.bin"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def downloader(**kwargs):
+    return Downloader(chunk_size=16 * 1024, retry_delay=0, log=lambda message: None, **kwargs)
+
+
+def test_content_length():
+    assert content_length({"Content-Length": "10"}, start=5) == 15
+    assert content_length({"Content-Range": "bytes 5-14/100", "Content-Length": "10"}, start=5) == 100
+    assert content_length({"Content-Length": "10", "Content-Encoding": "gzip"}) is None
+
+
+def test_dropped_connection_is_resumed_with_a_range_request(server, tmp_path):
+    server.drop_after = 50_000
+    path = str(tmp_path / "file.bin")
+    result = downloader().fetch(server.url, path, sha1=True)
+    assert result["status"] == 206 and result["resumed_from"] >= 1 and result["bytes"] == len(DATA)
+    assert result["sha1"] == hashlib.sha1(DATA).hexdigest()
+    assert open(path, "rb").read() == DATA
+    assert server.ranges[0] is None and server.ranges[1] == f"bytes={result['resumed_from']}-"
+    assert not list(tmp_path.glob("*.part*"))
+
+
+def test_abandoned_download_continues_in_the_next_run(server, tmp_path):
+    path = str(tmp_path / "file.bin")
+    seen = []
+
+    def stop_after_three_chunks(size):
+        seen.append(size)
+        if len(seen) > 3:
+            raise RuntimeError("stopped")
+
+    with pytest.raises(RuntimeError):
+        downloader(checkpoint_bytes=1).fetch(server.url, path, on_chunk=stop_after_three_chunks)
+    assert PartialDownload(server.url, path).offset == sum(seen[:3])
+
+    result = downloader().fetch(server.url, path, sha1=True)
+    assert result["resumed_from"] == sum(seen[:3])
+    assert result["sha1"] == hashlib.sha1(DATA).hexdigest() and open(path, "rb").read() == DATA
+
+
+def test_changed_file_starts_over_instead_of_being_spliced(server, tmp_path):
+    path = str(tmp_path / "file.bin")
+    server.drop_after = 50_000
+    with pytest.raises(requests.RequestException):
+        downloader(attempts=1, checkpoint_bytes=1).fetch(server.url, path)
+    assert PartialDownload(server.url, path).offset
+    server.data, server.etag = DATA[::-1], '"v2"'
+
+    result = downloader().fetch(server.url, path)
+    assert result["status"] == 200 and result["resumed_from"] == 0
+    assert open(path, "rb").read() == DATA[::-1]
+
+
+def test_short_body_is_kept_as_a_part_instead_of_committed(tmp_path):
+    path = str(tmp_path / "file.bin")
+    part = PartialDownload("http://a.example/file.bin", path)
+    assert part.begin(200, {"Content-Length": "100", "ETag": '"v1"'})
+    part.write(b"x" * 40)
+    with pytest.raises(IncompleteDownload):
+        part.finish()
+    assert not (tmp_path / "file.bin").exists()
+    assert PartialDownload("http://a.example/file.bin", path).offset == 40
+
+
+def test_ranges_shorter_than_the_file_are_continued(server, tmp_path):
+    server.max_body = 64 * 1024
+    path = str(tmp_path / "file.bin")
+    result = downloader(attempts=5).fetch(server.url, path, sha1=True)
+    assert result["bytes"] == len(DATA) and open(path, "rb").read() == DATA
+    assert result["sha1"] == hashlib.sha1(DATA).hexdigest()
+    assert server.ranges == [None, "bytes=65536-", "bytes=131072-", "bytes=196608-"]
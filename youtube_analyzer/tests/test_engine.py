@@ -0,0 +1,73 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from crawler.engine import ImageCrawler
+from crawler.metrics import MetricsRegistry
+
+CONFIG = {"depth": 3, "threads": 2, "request_delay": 0, "validate_seeds": False, "metrics_port": None}
+
+
+def crawl(seeds, output, **config):
+    metrics = MetricsRegistry()
+    crawler = ImageCrawler(dict(CONFIG, output=str(output), **config), log=lambda message: None, metrics=metrics)
+    try:
+        crawler.prepare(seeds)
+        report = crawler.run()
+    finally:
+        crawler.close()
+    return report, metrics
+
+
+def test_links_are_screened_by_extension_and_content_type(site, tmp_path):
+    (site.root / "doc.pdf").write_bytes(b"%PDF-1.4")
+    (site.root / "notes.txt").write_text("plain text")
+    (site.root / "index.html").write_text(
+        '<html><body><a href="/p1.html">p1</a><a href="/doc.pdf">pdf</a><a href="/notes.txt">txt</a>'
+        '<a href="/img1.png">direct image link</a></body></html>')
+
+    report, metrics = crawl([site.url], tmp_path / "out")
+    assert not report["partial"]
+    assert site.hits["/doc.pdf"] == 0  # dropped by extension, never requested
+    assert site.hits["/notes.txt"] == 1  # requested, closed once its Content-Type showed it isn't HTML
+    assert site.hits["/img1.png"] == 1  # linked and embedded: downloaded once, as an image
+    assert metrics.counter_total("links_skipped_total") == 1
+    assert metrics.counter_total("pages_skipped_total") == 1
+    assert (tmp_path / "out" / "img1.png").exists()
+
+
+class SeedHandler(BaseHTTPRequestHandler):
+    """/old redirects to /new; /nohead refuses HEAD but answers GET; anything else is 404."""
+
+    def do_HEAD(self):
+        if self.path == "/old":
+            self.send_response(301)
+            self.send_header("Location", "/new")
+        else:
+            self.send_response({"/new": 200, "/nohead": 405}.get(self.path, 404))
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        self.send_response(200 if self.path in ("/new", "/nohead") else 404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def seed_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SeedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("path, valid", [("/new", True), ("/old", True), ("/nohead", True), ("/gone", False)])
+def test_seed_validation_follows_redirects_and_falls_back_to_get(seed_server, path, valid):
+    crawler = ImageCrawler(dict(CONFIG), log=lambda message: None, metrics=MetricsRegistry())
+    assert crawler._validate_url(seed_server + path) is valid
@@ -0,0 +1,39 @@
+import pytest
+
+from crawler import extract
+from crawler.extract import parse_srcset, extract_page
+
+
+@pytest.mark.parametrize("srcset, candidates", [
+    ("a.jpg 1x, b.jpg 2x", [("a.jpg", "1x"), ("b.jpg", "2x")]),
+    ("small.jpg 320w,large.jpg 1024w", [("small.jpg", "320w"), ("large.jpg", "1024w")]),
+    ("/img/a,b.jpg 640w, /img/c.jpg 1280w", [("/img/a,b.jpg", "640w"), ("/img/c.jpg", "1280w")]),
+    ("only.jpg", [("only.jpg", "")]),
+    ("one.jpg, two.jpg", [("one.jpg", ""), ("two.jpg", "")]),
+    ("  , ", []),
+])
+def test_parse_srcset(srcset, candidates):
+    assert parse_srcset(srcset) == candidates
+
+
+PAGE = """<html><head><base href="/sub/"><style>.hero { background-image: url('hero.jpg') }</style></head>
+<body>
+  <a href="page.html">p</a> <a href="#top">top</a> <a href="mailto:x@example.com">m</a> <a href="page.html">again</a>
+  <img src="placeholder.gif" data-src="lazy.jpg">
+  <img srcset="s.jpg 320w, l.jpg 1024w" src="s.jpg">
+  <img src="data:image/png;base64,AAAA">
+  <picture><source srcset="p.webp 2x"><img src="p.jpg"></picture>
+  <div style="background: url(bg.png) no-repeat"></div>
+</body></html>"""
+
+
+@pytest.mark.parametrize("lxml", [True, False])
+def test_extract_page_links_and_images(lxml, monkeypatch):
+    if lxml and extract.etree is None:
+        pytest.skip("lxml is not installed")
+    if not lxml:
+        monkeypatch.setattr(extract, "etree", None)
+    links, images = extract_page("http://example.com/dir/index.html", PAGE.encode())
+    assert links == ["http://example.com/sub/page.html"]
+    assert sorted(images) == sorted("http://example.com/sub/" + name
+                                    for name in ("hero.jpg", "lazy.jpg", "l.jpg", "p.webp", "bg.png"))
@@ -0,0 +1,56 @@
+import threading
+
+from crawler.frontier import CrawlFrontier, shallow_first, image_rich_first
+
+
+def test_items_come_out_by_priority_then_in_order():
+    frontier = CrawlFrontier()
+    for item, depth in (("deep", 1), ("seed", 3), ("a", 2), ("b", 2)):
+        frontier.put(item, shallow_first(depth, 0))
+    assert [frontier.get() for _ in range(4)] == ["seed", "a", "b", "deep"]
+    assert image_rich_first(1, 9) < image_rich_first(3, 2)
+
+
+def test_get_waits_for_in_flight_work_before_finishing():
+    frontier = CrawlFrontier()
+    frontier.put("page")
+    assert frontier.get() == "page"
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(frontier.get(timeout=5)))
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive()  # "page" is in flight and may still add links
+
+    frontier.put("link")
+    frontier.task_done()
+    waiter.join(5)
+    assert result == ["link"]
+    frontier.task_done()
+    assert frontier.is_finished() and frontier.get() is None
+
+
+def test_get_returns_none_once_the_last_item_is_done():
+    frontier = CrawlFrontier()
+    frontier.put("page")
+    frontier.get()
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(frontier.get(timeout=5)))
+    waiter.start()
+    frontier.task_done()
+    waiter.join(5)
+    assert result == [None]
+
+
+def test_pause_keeps_queued_items_and_close_drops_them():
+    frontier = CrawlFrontier()
+    frontier.put("a")
+    frontier.put("b", (-1,))
+    frontier.pause()
+    assert frontier.get() is None and frontier.queued() == 2
+    frontier.resume()
+    assert frontier.drain() == ["b", "a"]
+
+    frontier.put("c")
+    frontier.close()
+    frontier.put("d")
+    assert frontier.queued() == 0 and frontier.get() is None
@@ -0,0 +1,66 @@
+import struct
+
+import pytest
+
+from conftest import PNG_1X1
+from crawler.download import PartialDownload
+from crawler.image_probe import parse_image_header, ImageProber
+from test_download import server  # noqa: F401 (fixture)
+
+
+def jpeg(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + bytes(9)
+    sof0 = b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, height, width, 1) + bytes(3)
+    return b"\xff\xd8" + app0 + sof0 + b"\xff\xda"
+
+
+def webp_vp8x(width, height):
+    return (b"RIFF" + bytes(4) + b"WEBP" + b"VP8X" + bytes(8)
+            + (width - 1).to_bytes(3, "little") + (height - 1).to_bytes(3, "little"))
+
+
+@pytest.mark.parametrize("data, expected", [
+    (PNG_1X1, ("png", 1, 1)),
+    (b"GIF89a" + struct.pack("<HH", 320, 200), ("gif", 320, 200)),
+    (jpeg(640, 480), ("jpeg", 640, 480)),
+    (webp_vp8x(1920, 1080), ("webp", 1920, 1080)),
+    (b'<?xml version="1.0"?><svg width="24px" height="12" xmlns="http://www.w3.org/2000/svg">', ("svg", 24, 12)),
+    (b'<svg viewBox="0 0 100 50">', ("svg", 100, 50)),
+    (b"<svg xmlns='http://www.w3.org/2000/svg'>", ("svg", None, None)),
+])
+def test_parse_image_header(data, expected):
+    assert parse_image_header(data) == expected
+
+
+@pytest.mark.parametrize("data", [jpeg(640, 480)[:20], PNG_1X1[:16], b"<html><body>", b""])
+def test_parse_image_header_needs_more_data_or_is_not_an_image(data):
+    assert parse_image_header(data) is None
+
+
+def test_download_is_one_request_and_stops_at_a_failing_header(site, tmp_path):
+    (site.root / "big.jpg").write_bytes(jpeg(800, 600) + bytes(50_000))
+    (site.root / "small.jpg").write_bytes(jpeg(40, 40) + bytes(50_000))
+    base = site.url.rsplit("/", 1)[0]
+    prober = ImageProber(min_side=100)
+
+    info = prober.download(f"{base}/big.jpg", str(tmp_path / "big.jpg"))
+    assert (info["width"], info["height"], info["content_length"]) == (800, 600, (site.root / "big.jpg").stat().st_size)
+    assert (tmp_path / "big.jpg").read_bytes() == (site.root / "big.jpg").read_bytes()
+
+    assert prober.download(f"{base}/small.jpg", str(tmp_path / "small.jpg")) is None
+    assert not list(tmp_path.glob("small.jpg*"))
+    assert site.hits["/big.jpg"] == 1 and site.hits["/small.jpg"] == 1
+
+
+def test_stale_part_is_dropped_and_the_file_requested_once_more(server, tmp_path):
+    server.data = jpeg(800, 600) + bytes(100_000)
+    path = str(tmp_path / "big.jpg")
+    part = PartialDownload(server.url, path)
+    part.begin(200, {"Content-Length": "300000", "ETag": server.etag})
+    part.write(bytes(200_000))  # longer than the file is now
+    part.abort()
+
+    info = ImageProber(min_side=100).download(server.url, path)
+    assert (info["width"], info["content_length"]) == (800, len(server.data))
+    assert open(path, "rb").read() == server.data
+    assert server.ranges == ["bytes=200000-", None]
@@ -0,0 +1,67 @@
+import pytest
+
+from crawler.engine import make_config
+from crawler.linkfilter import LinkFilter, path_depth, _trie_regex
+
+
+def test_trie_regex_matches_exactly_the_words():
+    regex = _trie_regex(["logout", "login", "log", "cart"])
+    for word in ("logout", "login", "log", "cart"):
+        assert regex.fullmatch(word)
+    assert not regex.fullmatch("lo") and not regex.fullmatch("car")
+    assert regex.search("/account/login?next=/")
+
+
+@pytest.mark.parametrize("url, depth", [
+    ("http://a.example", 0), ("http://a.example/", 0), ("http://a.example/a/b.html", 2), ("http://a.example//a//", 1),
+])
+def test_path_depth(url, depth):
+    assert path_depth(url) == depth
+
+
+@pytest.mark.parametrize("exclude, url, followed", [
+    (["logout"], "http://a.example/user/logout", False),
+    (["*.pdf"], "http://a.example/doc.pdf", False),
+    (["glob:http://a.example/private/*"], "http://a.example/private/x", False),
+    (["?page="], "http://a.example/list?page=2", False),
+    (["?replytocom"], "http://a.example/post?replytocom=7", False),
+    (["?page="], "http://a.example/list", True),
+    (["re:/tag/\\d+$"], "http://a.example/tag/42", False),
+    (["domain:ads.example"], "http://cdn.ads.example/x", False),
+    (["domain:ads.example"], "http://notads.example/x", True),
+    (["depth>2"], "http://a.example/a/b/c", False),
+    (["depth>2"], "http://a.example/a/b", True),
+    (["", "  "], "http://a.example/anything", True),
+])
+def test_exclude_rules(exclude, url, followed):
+    assert LinkFilter(exclude=exclude)(url) is followed
+
+
+def test_invalid_regex_names_the_rule():
+    with pytest.raises(ValueError, match="re:/tag/\\("):
+        LinkFilter(exclude=["re:/tag/("])
+    with pytest.raises(ValueError):
+        make_config({"include": ["re:["]})  # before any crawl starts
+
+
+def test_include_rules_need_one_match_and_every_depth_rule():
+    link_filter = LinkFilter(include=["/blog/", "/news/", "depth<=3"])
+    assert link_filter("http://a.example/blog/post")
+    assert not link_filter("http://a.example/shop/item")
+    assert not link_filter("http://a.example/blog/2024/01/post")
+    assert LinkFilter(include=["depth<=1"])("http://a.example/anything")
+
+
+def test_exclude_wins_over_include():
+    assert not LinkFilter(include=["/blog/"], exclude=["draft"])("http://a.example/blog/draft-1")
+
+
+def test_scope():
+    base = "http://www.a.example/"
+    assert LinkFilter(scope="host")("http://www.a.example/x", base)
+    assert not LinkFilter(scope="host")("http://img.a.example/x", base)
+    assert LinkFilter(scope="domain")("http://img.a.example/x", base)
+    assert not LinkFilter(scope="domain")("http://b.example/x", base)
+    assert LinkFilter(scope="host")("http://b.example/x")  # no page to compare with
+    with pytest.raises(ValueError):
+        LinkFilter(scope="site")
@@ -0,0 +1,117 @@
+import pytest
+
+pytest.importorskip("tkinter")
+from src.log_view import LogView  # noqa: E402
+
+
+class FakeRoot:
+    """Keeps the after() callbacks instead of running a Tk event loop."""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append(callback)
+
+    def tick(self):
+        callbacks, self.scheduled = self.scheduled, []
+        for callback in callbacks:
+            callback()
+
+
+class FakeText:
+    """The few tk.Text calls LogView makes, over a list of (line, tag)."""
+
+    def __init__(self, state="disabled"):
+        self.state = state
+        self.lines = []
+        self.inserts = 0
+
+    def cget(self, option):
+        return self.state
+
+    def config(self, state):
+        self.state = state
+
+    def tag_configure(self, tag, **options):
+        pass
+
+    def yview(self):
+        return (0.0, 1.0)
+
+    def see(self, index):
+        pass
+
+    def insert(self, index, *chunks):
+        assert self.state == "normal"
+        self.inserts += 1
+        self.lines.extend(zip(chunks[::2], chunks[1::2]))
+
+    def delete(self, first, last):
+        assert self.state == "normal"
+        self.lines = [] if last == "end" else self.lines[int(last.split(".")[0]) - 1:]
+
+    def shown(self):
+        return [line.rstrip("\n") for line, _ in self.lines]
+
+
+def view(**kwargs):
+    root, text = FakeRoot(), FakeText()
+    return root, text, LogView(root, text, **kwargs)
+
+
+def test_lines_arrive_in_batches_and_the_widget_keeps_the_last_max_lines():
+    root, text, log = view(max_lines=5, batch_size=4)
+    for i in range(7):
+        log.push(f"Downloaded: {i}")
+    assert text.lines == []  # push() never touches the widget
+
+    root.tick()  # the oldest two were dropped from the queue, then one batch of four
+    assert text.shown() == [f"Downloaded: {i}" for i in range(2, 6)]
+    assert text.inserts == 1 and text.state == "disabled"
+    root.tick()
+    assert text.shown() == [f"Downloaded: {i}" for i in range(2, 7)]
+
+    for i in range(7, 10):
+        log.push(f"Downloaded: {i}")
+    root.tick()
+    assert text.shown() == [f"Downloaded: {i}" for i in range(5, 10)]
+    assert [line for _, line in log.lines] == [f"Downloaded: {i}\n" for i in range(5, 10)]
+    assert len(root.scheduled) == 1
+
+
+def test_level_filter_redraws_from_the_ring_buffer():
+    root, text, log = view()
+    log.push("Downloaded: a.png")
+    log.push("Retrying http://a.example/ in 1s")
+    log.push("Failed to download: b.png")
+    log.push("debug detail", level="DEBUG")
+    root.tick()
+    assert text.lines[1] == ("Retrying http://a.example/ in 1s\n", "WARNING")
+
+    log.set_level("WARNING")
+    assert text.shown() == ["Retrying http://a.example/ in 1s", "Failed to download: b.png"]
+    log.push("Downloaded: c.png")
+    root.tick()
+    assert len(text.lines) == 2
+    log.set_level("DEBUG")
+    assert len(text.lines) == 5
+    log.clear()
+    assert text.lines == [] and not log.lines
+
+
+def test_source_is_polled_after_pushed_lines_and_close_stops_polling():
+    records = [{"ts": 0, "level": "INFO", "msg": f"from the pipeline {i}"} for i in range(5)]
+
+    def source(limit):
+        taken = records[:limit]
+        del records[:limit]
+        return taken
+
+    root, text, log = view(batch_size=3, source=source)
+    log.push("pushed")
+    root.tick()
+    assert text.shown() == ["pushed", "from the pipeline 0", "from the pipeline 1"]
+    log.close()
+    root.tick()
+    assert not root.scheduled and len(records) == 3
@@ -0,0 +1,82 @@
+import json
+import threading
+import types
+
+import pytest
+
+from crawler import logsink
+from crawler.logsink import LogPipeline, guess_level
+
+
+@pytest.mark.parametrize("message, level", [
+    ("Failed to download: http://a.example/x.png", "ERROR"),
+    ("Error fetching http://a.example/", "ERROR"),
+    ("Retrying http://a.example/ in 2.0s", "WARNING"),
+    ("Disallowed by robots.txt: http://a.example/private", "WARNING"),
+    ("Downloaded: img1.png", "INFO"),
+    ("Crawl report: 3 new, failed none", "INFO"),
+])
+def test_guess_level(message, level):
+    assert guess_level(message) == level
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_records_from_many_threads_are_all_written_as_json_lines(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    pipeline = LogPipeline(path, batch_size=7, flush_interval=0.05)
+
+    def worker(n):
+        for i in range(50):
+            pipeline.log(f"Downloaded: {n}-{i}", url=f"http://a.example/{n}/{i}")
+
+    threads = [threading.Thread(target=worker, args=(n,), name=f"worker-{n}") for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pipeline.log("Failed to download: x")
+    pipeline.close()
+
+    records = read(path)
+    assert len(records) == pipeline.written == 201
+    assert {record["thread"] for record in records[:-1]} == {f"worker-{n}" for n in range(4)}
+    assert records[0]["level"] == "INFO" and records[0]["url"].startswith("http://a.example/")
+    assert records[-1]["level"] == "ERROR"
+
+
+def test_file_is_rotated_past_max_bytes(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    pipeline = LogPipeline(path, max_bytes=1000, backups=2, batch_size=5)
+    for i in range(100):
+        pipeline.log(f"line {i:03d}")
+    pipeline.close()
+
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert files == ["log.jsonl", "log.jsonl.1", "log.jsonl.2"]
+    lines = [record["msg"] for name in reversed(files) for record in read(tmp_path / name)]
+    assert lines[-1] == "line 099" and lines == sorted(lines)  # oldest backups dropped, order kept
+
+
+def test_gui_feed_is_sampled_but_keeps_every_warning_and_error(tmp_path, monkeypatch):
+    now = [1000.2]
+    monkeypatch.setattr(logsink, "time", types.SimpleNamespace(time=lambda: now[0]))
+    pipeline = LogPipeline(str(tmp_path / "log.jsonl"), gui_rate=3)
+    try:
+        for i in range(10):
+            pipeline.log(f"Downloaded: {i}")
+        pipeline.log("Failed to download: late")
+        now[0] = 1001.1
+        pipeline.log("Downloaded: next second")
+
+        shown = [record["msg"] for record in pipeline.drain_gui(limit=4)]
+        assert shown == ["Downloaded: 0", "Downloaded: 1", "Downloaded: 2", "Failed to download: late"]
+        shown = [record["msg"] for record in pipeline.drain_gui()]
+        assert shown == ["... 7 message(s) not shown (see log file)", "Downloaded: next second"]
+        assert pipeline.drain_gui() == []
+    finally:
+        pipeline.close()
+    assert pipeline.written == 12
@@ -0,0 +1,71 @@
+import json
+import random
+import urllib.request
+
+import pytest
+
+from crawler.metrics import Histogram, MetricsRegistry, MetricsExporter
+
+
+def test_histogram_quantiles_are_within_about_one_percent():
+    rng = random.Random(42)
+    values = sorted(rng.lognormvariate(-3, 1.5) for _ in range(20_000))
+    histogram = Histogram()
+    for value in values:
+        histogram.record(value)
+    for q in (0.5, 0.9, 0.99):
+        exact = values[int(q * len(values)) - 1]
+        assert histogram.quantile(q) == pytest.approx(exact, rel=0.02)
+    assert histogram.count == len(values) and histogram.min == values[0] and histogram.max == values[-1]
+    assert len(histogram.counts) < 2000
+
+
+def test_histogram_merge_and_empty():
+    assert Histogram().quantile(0.5) is None
+    a, b, both = Histogram(), Histogram(), Histogram()
+    for i in range(1, 101):
+        (a if i % 2 else b).record(i / 1000)
+        both.record(i / 1000)
+    a.merge(b)
+    assert a.counts == both.counts
+    assert a.summary() == both.summary()
+
+
+def test_registry_snapshot_prometheus_and_merge():
+    registry = MetricsRegistry()
+    registry.inc("pages_fetched_total", host="a.example")
+    registry.inc("pages_fetched_total", 2, host="b.example")
+    registry.set_gauge("queue_depth", 5)
+    registry.observe("http_request_seconds", 0.25, host="a.example")
+
+    snapshot = registry.snapshot()
+    assert snapshot["counters"]["pages_fetched_total"] == {'host="a.example"': 1, 'host="b.example"': 2}
+    assert snapshot["histograms"]["http_request_seconds"]['host="a.example"']["count"] == 1
+    assert registry.gauge_total("queue_depth") == 5 and registry.gauge_total("missing") == 0
+    text = registry.prometheus_text()
+    assert "# TYPE crawler_pages_fetched_total counter" in text
+    assert 'crawler_pages_fetched_total{host="b.example"} 2' in text
+    assert "crawler_queue_depth 5" in text
+    assert 'crawler_http_request_seconds{host="a.example",quantile="0.5"}' in text
+
+    merged = MetricsRegistry.merged([registry.state(), registry.state()])
+    assert merged.counter_total("pages_fetched_total") == 6
+    assert merged.snapshot()["histograms"]["http_request_seconds"]['host="a.example"']["count"] == 2
+
+
+def test_exporter_serves_the_current_registry_and_writes_snapshots(tmp_path):
+    registry = MetricsRegistry()
+    registry.inc("images_saved_total", 3)
+    snapshot_path = tmp_path / "metrics.json"
+    exporter = MetricsExporter(registry, str(snapshot_path), interval=60, port=0, log=lambda message: None)
+    exporter.start()
+    try:
+        url = f"http://127.0.0.1:{exporter._server.server_address[1]}/metrics"
+        assert "crawler_images_saved_total 3" in urllib.request.urlopen(url).read().decode()
+        replacement = MetricsRegistry()
+        replacement.inc("images_saved_total", 9)
+        exporter.registry = replacement  # e.g. merged shard metrics
+        assert "crawler_images_saved_total 9" in urllib.request.urlopen(url).read().decode()
+    finally:
+        exporter.stop()
+    assert json.loads(snapshot_path.read_text())["counters"]["images_saved_total"] == {"": 9}
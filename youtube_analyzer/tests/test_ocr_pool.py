@@ -0,0 +1,82 @@
+import io
+import os
+import sys
+from concurrent.futures import Future
+
+import pytest
+
+pytest.importorskip("pytesseract")
+from PIL import Image  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "The Best One"))
+from ocr_module import OCRWorkerPool, _preprocess  # noqa: E402
+
+
+class FakeExecutor:
+    """Records submissions; the test resolves the futures by hand."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.jobs.append((args, future))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def png(color=(255, 255, 255), size=(40, 20)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def pool(**kwargs):
+    ocr = OCRWorkerPool(**kwargs)
+    ocr._executor = FakeExecutor()
+    return ocr
+
+
+def test_identical_requests_share_one_job_and_then_hit_the_cache():
+    ocr = pool()
+    first = ocr.submit_png(png())
+    assert ocr.submit_png(png()) is first
+    assert len(ocr._executor.jobs) == 1
+    args, future = ocr._executor.jobs[0]
+    assert [name for name, _ in args[1]] == ["channel_header", "about_body"]
+
+    future.set_result("Channel\n1.2M subscribers")
+    cached = ocr.submit_png(png())
+    assert cached is not first and cached.result() == "Channel\n1.2M subscribers"
+    assert len(ocr._executor.jobs) == 1
+
+    ocr.submit_png(png(), ["about_body"])  # other regions, other key
+    ocr.submit_png(png((0, 0, 0)))  # other image, other key
+    assert len(ocr._executor.jobs) == 3
+
+
+def test_failures_are_not_cached_and_the_cache_is_bounded():
+    ocr = pool(cache_size=2)
+    ocr.submit_png(png())
+    ocr._executor.jobs[0][1].set_exception(RuntimeError("tesseract is not installed"))
+    assert ocr.result(ocr._executor.jobs[0][1]) == ""
+    assert ocr.result(None) == ""
+    ocr.submit_png(png())
+    assert len(ocr._executor.jobs) == 2
+
+    for shade in range(3):
+        ocr.submit_png(png((shade, shade, shade)))
+    for _, future in ocr._executor.jobs[1:]:
+        future.set_result("text")
+    assert len(ocr._cache) == 2 and not ocr._pending
+
+
+def test_preprocess_crops_downsamples_and_makes_dark_pages_dark_on_light():
+    image = Image.new("RGB", (400, 200), (20, 20, 20))
+    image.paste((230, 230, 230), (100, 100, 300, 120))  # light text on a dark theme
+    region = _preprocess(image, (0.0, 0.5, 1.0, 1.0), max_width=200, threshold=150)
+    assert region.mode == "1" and region.size == (200, 50)
+    assert region.getpixel((0, 40)) == 255  # the background ends up white
+    assert region.getpixel((100, 5)) == 0  # and the text black
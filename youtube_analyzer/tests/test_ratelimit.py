@@ -0,0 +1,122 @@
+import email.utils
+import time
+
+import pytest
+import requests
+
+from crawler import ratelimit
+from crawler.metrics import MetricsRegistry
+from crawler.ratelimit import HostRateLimiter, RetryPolicy, get_with_retries, parse_retry_after
+
+
+class Clock:
+    """Stands in for time.monotonic/time.sleep: sleeping just moves the clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(ratelimit.time, "sleep", clock.sleep)
+    return clock
+
+
+class Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def close(self):
+        pass
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(None) is None and parse_retry_after("soon") is None
+    later = email.utils.formatdate(time.time() + 60, usegmt=True)
+    assert 55 <= parse_retry_after(later) <= 60
+
+
+def test_rate_is_per_host(clock):
+    limiter = HostRateLimiter(rate=2, burst=1)
+    assert limiter.reserve("http://a.example/1") == 0
+    assert limiter.reserve("http://a.example/2") == pytest.approx(0.5)
+    assert limiter.reserve("http://b.example/1") == 0  # another host has its own bucket
+    clock.now += 10
+    assert limiter.reserve("http://a.example/3") == 0  # refilled, but only up to burst
+    assert limiter.reserve("http://a.example/4") == pytest.approx(0.5)
+
+
+def test_penalize_halves_the_rate_and_blocks_then_reward_recovers(clock):
+    limiter = HostRateLimiter(rate=4, burst=1)
+    url = "http://a.example/"
+    assert limiter.penalize(url, retry_after=30) == 30
+    assert limiter.host_rate(url) == 2
+    assert limiter.reserve(url) >= 30
+    assert limiter.penalize(url) == 4  # no Retry-After: 2 ** strikes
+    for _ in range(100):
+        limiter.reward(url)
+    assert limiter.host_rate(url) == 4
+
+
+def test_unlimited_host_is_throttled_after_a_429_and_unlimited_again_later(clock):
+    limiter = HostRateLimiter(rate=None, unthrottled_rate=20)
+    url = "http://a.example/"
+    assert limiter.reserve(url) == 0 and limiter.reserve(url) == 0
+    limiter.penalize(url, retry_after=0)
+    assert limiter.host_rate(url) == 10
+    for _ in range(100):
+        limiter.reward(url)
+    assert limiter.host_rate(url) is None
+
+
+def test_get_with_retries_honours_retry_after_and_penalizes(clock):
+    responses = [Response(429, {"Retry-After": "7"}), Response(503), Response(200)]
+    limiter = HostRateLimiter()
+    metrics = MetricsRegistry()
+    response = get_with_retries("http://a.example/x", limiter, RetryPolicy(retries=3, base_delay=0),
+                                log=lambda message: None, get=lambda url, **kwargs: responses.pop(0),
+                                metrics=metrics)
+    assert response.status_code == 200
+    assert clock.slept[0] >= 7  # waited out the Retry-After
+    assert limiter.host_rate("http://a.example/x") is not None  # still slowed down after two pushbacks
+    assert metrics.counter_total("http_retries_total") == 2
+    assert metrics.counter_total("http_requests_total") == 3
+
+
+def test_get_with_retries_gives_up_after_the_last_attempt(clock):
+    def refuse(url, **kwargs):
+        raise requests.ConnectionError("refused")
+
+    with pytest.raises(requests.ConnectionError):
+        get_with_retries("http://a.example/", HostRateLimiter(), RetryPolicy(retries=2, base_delay=0),
+                         log=lambda message: None, get=refuse, metrics=MetricsRegistry())
+
+    response = get_with_retries("http://a.example/", HostRateLimiter(), RetryPolicy(retries=1, base_delay=0),
+                                log=lambda message: None, get=lambda url, **kwargs: Response(500),
+                                metrics=MetricsRegistry())
+    assert response.status_code == 500
+
+
+def test_long_retry_after_is_capped_and_not_waited_for(clock):
+    limiter = HostRateLimiter(max_backoff=60)
+    assert limiter.penalize("http://a.example/", retry_after=86400) == 60
+    assert limiter.reserve("http://a.example/") == pytest.approx(60)
+    assert RetryPolicy(base_delay=0, max_delay=30).backoff(0, retry_after=3600) == 30
+
+    responses = [Response(503, {"Retry-After": "3600"}), Response(200)]
+    response = get_with_retries("http://b.example/", HostRateLimiter(), RetryPolicy(retries=3, max_delay=30),
+                                log=lambda message: None, get=lambda url, **kwargs: responses.pop(0),
+                                metrics=MetricsRegistry())
+    assert response.status_code == 503 and clock.slept == []
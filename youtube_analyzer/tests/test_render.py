@@ -0,0 +1,72 @@
+import pytest
+
+from crawler.metrics import MetricsRegistry
+from crawler.render import PageRenderer, render_reason, STATIC, RENDER
+
+TEXT = "<p>" + "Plenty of server-rendered words about the gallery. " * 10 + "</p>"
+
+
+@pytest.mark.parametrize("html, images, reason", [
+    (b"<html><body><script>" + b"x" * 5000 + b"</script></body></html>", ["a.jpg"], "empty"),
+    (f'<html><body><div id="root"></div>{TEXT}</body></html>'.encode(), ["a.jpg"], "spa"),
+    (f"<html><body><noscript>You need to enable JavaScript to run this app.</noscript>{TEXT}</body></html>".encode(),
+     ["a.jpg"], "spa"),
+    (f"<html><body>{TEXT}</body></html>".encode(), [], "few-images"),
+    (f"<html><body>{TEXT}</body></html>".encode(), ["a.jpg"], None),
+])
+def test_render_reason(html, images, reason):
+    assert render_reason(html, images) == reason
+
+
+class FakeRenderer(PageRenderer):
+    """Renders from a dict of url -> html instead of a browser."""
+
+    def __init__(self, pages, **kwargs):
+        super().__init__(log=lambda message: None, metrics=MetricsRegistry(), **kwargs)
+        self.pages = pages
+        self.rendered = []
+
+    def render(self, url):
+        self.rendered.append(url)
+        return self.pages.get(url)
+
+
+def extract(url, html):
+    return [], [part.split('"')[0] for part in html.decode().split('src="')[1:]]
+
+
+EMPTY = b"<html><body></body></html>"
+
+
+def test_host_is_rendered_only_when_rendering_found_more():
+    renderer = FakeRenderer({"http://spa.example/1": '<img src="a.jpg">', "http://spa.example/2": '<img src="b.jpg">',
+                             "http://static.example/1": ""})
+    assert renderer.improve("http://spa.example/1", EMPTY, [], [], extract) == ([], ["a.jpg"])
+    assert renderer.improve("http://static.example/1", EMPTY, [], [], extract) == ([], [])
+    assert renderer.decisions() == {"spa.example": RENDER, "static.example": STATIC}
+
+    # A host marked RENDER renders even complete-looking pages; a STATIC one never renders again
+    complete = f"<html><body>{TEXT}</body></html>".encode()
+    assert renderer.improve("http://spa.example/2", complete, [], ["x.jpg"], extract) == ([], ["x.jpg", "b.jpg"])
+    renderer.improve("http://static.example/2", EMPTY, [], [], extract)
+    assert renderer.rendered == ["http://spa.example/1", "http://static.example/1", "http://spa.example/2"]
+
+
+def test_complete_pages_are_not_rendered_and_decisions_can_be_restored():
+    renderer = FakeRenderer({})
+    renderer.load({"old.example": STATIC})
+    page = f"<html><body>{TEXT}</body></html>".encode()
+    assert renderer.improve("http://new.example/", page, ["l"], ["a.jpg"], extract) == (["l"], ["a.jpg"])
+    assert renderer.improve("http://old.example/", EMPTY, [], [], extract) == ([], [])
+    assert renderer.rendered == []
+
+
+def test_missing_browser_turns_rendering_off(monkeypatch):
+    renderer = PageRenderer(log=lambda message: None, metrics=MetricsRegistry())
+
+    def no_browser():
+        raise RuntimeError("no chrome")
+
+    monkeypatch.setattr(renderer, "_new_driver", no_browser)
+    assert renderer.improve("http://a.example/", EMPTY, ["l"], [], extract) == (["l"], [])
+    assert renderer.broken and renderer.render("http://a.example/2") is None
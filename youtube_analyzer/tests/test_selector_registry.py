@@ -0,0 +1,61 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("selenium")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "The Best One"))
+from selector_registry_module import SelectorRegistry  # noqa: E402
+
+DEFAULTS = {"title": [("new", "css", "h1.new"), ("old", "css", "h1.old"), ("older", "css", "h1.older")]}
+
+
+class FakeDriver:
+    """find_elements() finds the selectors in present; the rest find nothing."""
+
+    def __init__(self, *present):
+        self.present = set(present)
+
+    def find_elements(self, by, selector):
+        return [f"<{selector}>"] if selector in self.present else []
+
+
+def registry(dead_after=2):
+    return SelectorRegistry(stats_path=None, defaults=DEFAULTS, dead_after=dead_after)
+
+
+def stats(reg):
+    return {info["selector"]: (info["hits"], info["misses"]) for _, info in reg.candidates("title")}
+
+
+def test_hit_records_misses_only_for_candidates_tried_before_it():
+    reg = registry()
+    assert reg.find(FakeDriver("h1.old", "h1.older"), "title", wait_secs=0) == "<h1.old>"
+    assert stats(reg) == {"h1.new": (0, 1), "h1.old": (1, 0), "h1.older": (0, 0)}
+
+
+def test_selector_dies_after_missing_while_another_one_hits():
+    reg = registry(dead_after=1)
+    reg.find(FakeDriver("h1.old"), "title", wait_secs=0)
+    assert [info["selector"] for _, info in reg.candidates("title")] == ["h1.old", "h1.older"]
+
+
+def test_absent_field_kills_no_selector():
+    reg = registry()
+    for _ in range(5):
+        assert reg.find(FakeDriver(), "title", wait_secs=0) is None
+    assert not reg.is_dead("title")
+    assert len(reg.candidates("title")) == 3
+    # The field showing up again still works, with the best selector first
+    assert reg.find(FakeDriver("h1.new"), "title", wait_secs=0) == "<h1.new>"
+
+
+def test_field_missing_from_every_page_gets_a_short_wait_until_it_hits_again():
+    reg = SelectorRegistry(stats_path=None, defaults=DEFAULTS, absent_after=2, absent_wait=0.5)
+    for _ in range(2):
+        assert reg.effective_wait("title", 5) == 5
+        reg.find(FakeDriver(), "title", wait_secs=0)
+    assert reg.effective_wait("title", 5) == 0.5
+    assert reg.effective_wait("other", 5) == 5
+    reg.find(FakeDriver("h1.older"), "title", wait_secs=0)
+    assert reg.effective_wait("title", 5) == 5
@@ -0,0 +1,56 @@
+import threading
+
+from crawler.shard import run_sharded, shard_of, has_pending
+
+CONFIG = {"depth": 3, "threads": 2, "request_delay": 0, "validate_seeds": False, "metrics_port": None}
+
+
+def crawl(config, seeds, processes=2, restart=False, timeout=60):
+    """run_sharded on a thread, failing instead of hanging if it never finishes."""
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(
+        report=run_sharded(config, seeds, processes, log=lambda message: None, restart=restart)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "sharded crawl did not finish"
+    return result["report"]
+
+
+def test_shard_of_is_stable_and_per_host():
+    assert shard_of("http://a.example/x", 4) == shard_of("http://A.example/y?z", 4)
+    assert all(0 <= shard_of(f"http://host{i}.example/", 3) < 3 for i in range(20))
+
+
+def test_exhausted_budget_finishes_the_crawl(site, tmp_path):
+    config = dict(CONFIG, output=str(tmp_path / "out"), budget={"max_pages": 4})
+    report = crawl(config, [site.url])
+    assert report["partial"]
+    assert report["budget"]["exhausted"] == "max pages"
+    assert report["budget"]["pages"] <= 2  # the one shard owning the host gets half the budget
+    assert has_pending(config["output"], 2)
+
+
+def test_resume_keeps_every_shards_visited_pages(site, tmp_path):
+    # Two hosts for one server: the seed host links to pages on "localhost", owned by another shard
+    port = site.server_address[1]
+    other = f"http://localhost:{port}"
+    shards = next(n for n in range(2, 8) if shard_of(site.url, n) != shard_of(other, n))
+    for name in ("b1", "b2"):
+        (site.root / f"{name}.html").write_text("<html><body>other host</body></html>")
+    links = "".join(f'<a href="/p{i}.html">{i}</a>' for i in range(1, 9))
+    (site.root / "index.html").write_text(
+        f'<html><body>{links}<a href="{other}/b1.html">b1</a><a href="{other}/b2.html">b2</a></body></html>')
+    for i in range(1, 9):
+        (site.root / f"p{i}.html").write_text(f'<html><body><a href="{other}/b1.html">b1</a></body></html>')
+
+    # The seed host's shard runs out of budget; the other one finishes and has nothing pending
+    output = str(tmp_path / "out")
+    first = crawl(dict(CONFIG, output=output, budget={"max_pages": 3 * shards}), [site.url], shards)
+    assert first["partial"] and has_pending(output, shards)
+    assert site.hits["/b1.html"] == 1
+
+    report = crawl(dict(CONFIG, output=output), [site.url], shards)
+    assert not report["partial"]
+    assert not has_pending(output, shards)
+    assert all(site.hits[f"/p{i}.html"] == 1 for i in range(1, 9))
+    assert site.hits["/b1.html"] == 1  # the other shard resumed with its visited pages, not from scratch
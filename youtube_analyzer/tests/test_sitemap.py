@@ -0,0 +1,66 @@
+import gzip
+
+from crawler.sitemap import SiteSeeder, parse_crawl_delays, parse_sitemap
+from conftest import PNG_1X1
+from test_engine import crawl
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def urlset(*locs):
+    return f"<urlset {NS}>{''.join(f'<url><loc>{loc}</loc></url>' for loc in locs)}</urlset>".encode()
+
+
+def test_parse_sitemap_reads_indexes_gzip_and_stops_at_bad_xml():
+    index = f"<sitemapindex {NS}><sitemap><loc>/a.xml.gz</loc></sitemap></sitemapindex>".encode()
+    assert parse_sitemap(index) == ([], ["/a.xml.gz"])
+    assert parse_sitemap(gzip.compress(urlset("/p1.html", " /p2.html "))) == (["/p1.html", "/p2.html"], [])
+    broken = urlset("/p1.html", "/p2.html").replace(b"<loc>/p2", b"<loc><broken")
+    assert parse_sitemap(broken) == (["/p1.html"], [])
+
+
+def test_parse_crawl_delays_per_agent_group():
+    lines = ["User-agent: slowbot", "User-agent: *", "Crawl-delay: 0.5  # half a second",
+             "", "User-agent: other", "Disallow: /", "Crawl-delay: soon"]
+    assert parse_crawl_delays(lines) == {"slowbot": 0.5, "*": 0.5}
+
+
+def test_seed_follows_the_declared_sitemaps_and_robots_rules(site):
+    origin = site.url.rsplit("/", 1)[0]
+    (site.root / "robots.txt").write_text(
+        f"User-agent: *\nDisallow: /p2.html\nCrawl-delay: 2\n\nSitemap: {origin}/maps/index.xml\n")
+    (site.root / "maps").mkdir()
+    (site.root / "maps" / "index.xml").write_bytes(
+        f"<sitemapindex {NS}><sitemap><loc>pages.xml.gz</loc></sitemap></sitemapindex>".encode())
+    (site.root / "maps" / "pages.xml.gz").write_bytes(gzip.compress(urlset(
+        f"{origin}/p1.html", f"{origin}/p2.html", "/p3.html", "http://elsewhere.example/p4.html",
+        f"{origin}/p1.html")))
+
+    seeder = SiteSeeder(log=lambda message: None)
+    assert seeder.seed(site.url) == [f"{origin}/p1.html", f"{origin}/p3.html"]
+    assert not seeder.allowed(f"{origin}/p2.html")
+    assert seeder.crawl_delay(site.url) == 2
+    assert seeder.reserve(site.url) == 0
+    assert 1.9 < seeder.reserve(site.url) <= 2  # the next request waits its turn
+    assert site.hits["/robots.txt"] == 1
+
+
+def test_missing_robots_allows_everything_and_uses_the_default_sitemap(site):
+    seeder = SiteSeeder(log=lambda message: None)
+    assert seeder.seed(site.url) == []
+    assert seeder.allowed(site.url) and seeder.crawl_delay(site.url) == 0
+    assert site.hits["/sitemap.xml"] == 1 and site.hits["/sitemap_index.xml"] == 1
+
+
+def test_crawl_seeds_unlinked_pages_and_skips_disallowed_ones(site, tmp_path):
+    origin = site.url.rsplit("/", 1)[0]
+    (site.root / "robots.txt").write_text("User-agent: *\nDisallow: /p3.html\n")
+    (site.root / "orphan.html").write_text('<html><body><img src="/orphan.png"></body></html>')
+    (site.root / "orphan.png").write_bytes(PNG_1X1)
+    (site.root / "sitemap.xml").write_bytes(urlset(f"{origin}/orphan.html", f"{origin}/p1.html"))
+
+    report, _ = crawl([site.url], tmp_path / "out", sitemaps=True)
+    assert not report["partial"]
+    assert site.hits["/orphan.html"] == 1 and (tmp_path / "out" / "orphan.png").exists()
+    assert site.hits["/p1.html"] == 1
+    assert site.hits["/p3.html"] == 0 and not (tmp_path / "out" / "img3.png").exists()
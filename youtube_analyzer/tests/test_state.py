@@ -0,0 +1,84 @@
+import os
+import time
+
+from crawler.engine import ImageCrawler
+from crawler.metrics import MetricsRegistry
+from crawler.state import CrawlStateStore, conditional_headers, NEW, CHANGED, UNCHANGED
+from test_engine import CONFIG, crawl
+
+
+def test_pending_work_survives_a_restart(tmp_path):
+    path = str(tmp_path / "state.sqlite")
+    state = CrawlStateStore(path, commit_every=1000)
+    state.enqueue("http://a.example/1", 2)
+    state.enqueue("http://a.example/2", 2)
+    state.enqueue("http://a.example/3", 1)
+    state.start("http://a.example/1", 2)
+    state.start("http://a.example/2", 2)
+    state.finish("http://a.example/2")
+    state.close()
+
+    state = CrawlStateStore(path)
+    try:
+        assert state.has_pending()
+        assert sorted(state.pending()) == [("http://a.example/1", 2), ("http://a.example/3", 1)]
+        assert state.visited_urls() == ["http://a.example/2"]
+        state.enqueue("https://a.example/2/", 1)  # another spelling of a crawled page
+        assert len(state.pending()) == 2
+    finally:
+        state.close()
+
+
+def test_validators_and_discards_outlive_a_fresh_crawl(tmp_path):
+    state = CrawlStateStore(str(tmp_path / "state.sqlite"))
+    try:
+        url = "http://a.example/page"
+        assert state.record_resource(url, '"e1"', "Mon, 01 Jan 2024 00:00:00 GMT", "s1", links=["b", "a"]) == NEW
+        assert state.record_resource(url, '"e1"', None, "s1", links=["a", "b"]) == UNCHANGED
+        assert state.record_resource(url, '"e2"', None, "s2", links=["a"], images=["i.png"]) == CHANGED
+        state.record_image("http://a.example/i.png", "i.png", "s3", 10)
+        state.record_discard("http://a.example/i.png", "s3", "junk")
+        state.set_meta("depth", 2)
+
+        state.reset()
+        assert state.image_count() == 0 and state.get_meta("depth") is None
+        resource = state.resource(url)
+        assert resource == {"etag": '"e2"', "last_modified": None, "sha1": "s2", "links": ["a"], "images": ["i.png"]}
+        assert conditional_headers(resource) == {"If-None-Match": '"e2"'}
+        assert state.is_discarded("s3") and not state.is_discarded(None)
+    finally:
+        state.close()
+
+
+def test_crawl_stopped_by_its_budget_resumes_where_it_stopped(site, tmp_path):
+    output = tmp_path / "out"
+    report, _ = crawl([site.url], output, budget={"max_pages": 3})
+    assert report["partial"]
+
+    crawler = ImageCrawler(dict(CONFIG, output=str(output)), log=lambda message: None, metrics=MetricsRegistry())
+    try:
+        assert crawler.open()
+        crawler.prepare([], resume=True)
+        report = crawler.run()
+    finally:
+        crawler.close()
+    assert not report["partial"]
+    assert len(list(output.glob("img*.png"))) == 8
+    assert site.hits["/index.html"] == 1
+    assert all(site.hits[f"/p{i}.html"] == 1 for i in range(1, 9))
+
+
+def test_recrawl_reports_what_changed(site, tmp_path):
+    output = tmp_path / "out"
+    report, _ = crawl([site.url], output)
+    assert report["changes"] == {"new": 17, "changed": 0, "unchanged": 0}  # 9 pages, 8 images
+
+    later = time.time() + 60
+    page = site.root / "p1.html"
+    page.write_text(page.read_text().replace("<body>", "<body><p>edited</p>"))
+    os.utime(page, (later, later))
+    os.utime(site.root / "p2.html", (later, later))  # newer, same bytes
+    report, _ = crawl([site.url], output)
+    assert report["changes"] == {"new": 0, "changed": 1, "unchanged": 16}
+    assert site.hits["/img1.png"] == 2  # asked again, answered 304
+    assert len(list(output.glob("img*.png"))) == 8
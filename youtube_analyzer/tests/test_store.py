@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+
+import pytest
+
+from crawler.store import ContentStore, readable_name
+
+
+def save(store, url, data, content_type=None):
+    with store.writer(url, content_type) as writer:
+        writer.write(data)
+    return writer.result
+
+
+def objects(store):
+    return [name for _, _, names in os.walk(store.objects_root) for name in names]
+
+
+@pytest.mark.parametrize("url, content_type, name", [
+    ("http://example.com/img/Cat%20Photo.JPG", None, "Cat_Photo.jpg"),
+    ("http://example.com/", "image/png", "image.png"),
+    ("http://example.com/pic?id=1", "image/jpeg; charset=binary", "pic.jpg"),
+    ("http://example.com/../..%2Fetc%2Fpasswd", None, "etc_passwd"),
+])
+def test_readable_name(url, content_type, name):
+    assert readable_name(url, content_type) == name
+
+
+def test_same_content_under_two_urls_is_stored_once(tmp_path):
+    store = ContentStore(str(tmp_path))
+    first = save(store, "http://a.example/cat.png", b"same bytes")
+    second = save(store, "http://b.example/copy.png", b"same bytes")
+    assert not first["duplicate"] and second["duplicate"]
+    assert first["sha1"] == second["sha1"] == hashlib.sha1(b"same bytes").hexdigest()
+    assert len(objects(store)) == 1
+    assert os.path.samefile(first["path"], second["path"]) or open(second["path"], "rb").read() == b"same bytes"
+    assert store.has_object(first["sha1"])
+
+
+def test_different_content_with_the_same_name_gets_a_suffix(tmp_path):
+    store = ContentStore(str(tmp_path))
+    first = save(store, "http://a.example/logo.png", b"one")
+    second = save(store, "http://b.example/logo.png", b"two")
+    again = save(store, "http://c.example/logo.png", b"one")
+    assert os.path.basename(first["path"]) == "logo.png"
+    assert os.path.basename(second["path"]) == f"logo-{second['sha1'][:10]}.png"
+    assert again["path"] == first["path"]
+    assert open(first["path"], "rb").read() == b"one" and open(second["path"], "rb").read() == b"two"
+
+
+def test_manifest_link_and_annotate(tmp_path):
+    store = ContentStore(str(tmp_path))
+    saved = save(store, "http://a.example/x.gif", b"gif")
+    linked = store.link("http://a.example/x-again.gif", saved["sha1"])
+    store.annotate(saved["url"], saved["sha1"], saved["path"], label="cat")
+    with open(store.manifest_path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["url"] for line in lines] == ["http://a.example/x.gif", "http://a.example/x-again.gif",
+                                               "http://a.example/x.gif"]
+    assert lines[-1]["label"] == "cat" and linked["bytes"] == 3
+    with pytest.raises(FileNotFoundError):
+        store.link("http://a.example/none.gif", "0" * 40)
+
+
+def test_failed_download_leaves_nothing_behind(tmp_path):
+    store = ContentStore(str(tmp_path))
+    with pytest.raises(OSError):
+        with store.writer("http://a.example/broken.png") as writer:
+            writer.write(b"half")
+            raise OSError("connection reset")
+    assert objects(store) == [] and not os.path.exists(store.manifest_path)
@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+from crawler.urls import (canonicalize_url, url_key, VisitedSet, BloomVisitedSet, link_kind, content_kind,
+                          PAGE, IMAGE, SKIP)
+
+
+@pytest.mark.parametrize("url, canonical", [
+    ("HTTP://Example.COM:80/a/./b/../c/", "http://example.com/a/c"),
+    ("https://example.com:443", "https://example.com/"),
+    ("https://example.com:8443/x#frag", "https://example.com:8443/x"),
+    ("http://example.com//a//", "http://example.com/a"),
+    ("http://example.com/p?b=2&utm_source=x&a=1&fbclid=y", "http://example.com/p?a=1&b=2"),
+    ("http://example.com/p?empty=&a=1", "http://example.com/p?a=1&empty="),
+    ("http://user:pw@Example.com/", "http://user:pw@example.com/"),
+])
+def test_canonicalize_url(url, canonical):
+    assert canonicalize_url(url) == canonical
+
+
+def test_url_key_ignores_scheme_and_trivial_differences():
+    assert url_key("http://example.com/a/") == url_key("https://EXAMPLE.com/a#top")
+    assert url_key("http://example.com/a?x=1") != url_key("http://example.com/a?x=2")
+    assert url_key("http://example.com/a") != url_key("http://example.org/a")
+
+
+@pytest.mark.parametrize("visited", [VisitedSet(), BloomVisitedSet(capacity=1000, error_rate=0.01)])
+def test_visited_sets_add_each_key_once(visited):
+    assert visited.add("http://example.com/a")
+    assert not visited.add("https://example.com/a/")
+    assert "http://example.com/a#x" in visited
+    assert "http://example.com/b" not in visited
+    assert len(visited) == 1
+    visited.clear()
+    assert len(visited) == 0 and visited.add("http://example.com/a")
+
+
+def test_visited_set_add_is_atomic():
+    visited = VisitedSet()
+    wins = []
+    barrier = threading.Barrier(8)
+
+    def add():
+        barrier.wait()
+        wins.append(visited.add("http://example.com/same"))
+
+    threads = [threading.Thread(target=add) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert wins.count(True) == 1
+
+
+@pytest.mark.parametrize("url, kind", [
+    ("http://example.com/photo.JPG", IMAGE),
+    ("http://example.com/a%20b.webp?size=2", IMAGE),
+    ("http://example.com/report.pdf", SKIP),
+    ("http://example.com/video.mp4#t=10", SKIP),
+    ("http://example.com/page.html", PAGE),
+    ("http://example.com/section/", PAGE),
+    ("http://example.com/download?file=x.zip", PAGE),
+])
+def test_link_kind(url, kind):
+    assert link_kind(url) == kind
+
+
+@pytest.mark.parametrize("content_type, kind", [
+    ("text/html; charset=utf-8", PAGE),
+    ("application/xhtml+xml", PAGE),
+    (None, PAGE),
+    ("IMAGE/PNG", IMAGE),
+    ("application/pdf", SKIP),
+    ("text/plain", SKIP),
+])
+def test_content_kind(content_type, kind):
+    assert content_kind(content_type) == kind
@@ -0,0 +1,53 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "The Best One"))
+from watch_page_module import extract_watch_page  # noqa: E402
+
+PLAYER = {
+    "videoDetails": {
+        "videoId": "abc123",
+        "title": "A {braced} title; with \"quotes\"",
+        "author": "Some Channel",
+        "channelId": "UC1",
+        "viewCount": "1234567",
+        "lengthSeconds": "215",
+        "thumbnail": {"thumbnails": [{"url": "https://i.ytimg.com/vi/abc123/hq.jpg", "width": 480, "height": 360},
+                                     {"url": "https://i.ytimg.com/vi/abc123/default.jpg", "width": 120, "height": 90}]},
+    },
+    "microformat": {"playerMicroformatRenderer": {
+        "publishDate": "2024-03-01",
+        "uploadDate": "2024-02-29",
+        "thumbnail": {"thumbnails": [{"url": "https://i.ytimg.com/vi/abc123/maxres.jpg", "width": 1280,
+                                      "height": 720},
+                                     {"url": "https://i.ytimg.com/vi/abc123/hq.jpg", "width": 480, "height": 360}]},
+    }},
+}
+INITIAL_DATA = {"contents": {"results": [{"segmentedLikeDislikeButtonViewModel": {"likeButtonViewModel": {
+    "accessibilityText": "like this video along with 45,678 other people"}}}]}}
+
+
+def page(player=PLAYER, initial_data=INITIAL_DATA):
+    scripts = f"<script>var ytInitialPlayerResponse = {json.dumps(player)};var meta = {{}};</script>"
+    if initial_data is not None:
+        scripts += f'<script>window["ytInitialData"] = {json.dumps(initial_data)};</script>'
+    return f"<html><head>{scripts}</head><body></body></html>"
+
+
+def test_extract_watch_page_reads_the_embedded_json():
+    info = extract_watch_page(page())
+    assert info["video_id"] == "abc123" and info["title"] == 'A {braced} title; with "quotes"'
+    assert (info["channel"], info["channel_id"]) == ("Some Channel", "UC1")
+    assert (info["views"], info["likes"], info["duration_seconds"]) == (1234567, 45678, 215)
+    assert (info["publish_date"], info["upload_date"]) == ("2024-03-01", "2024-02-29")
+    assert [t["width"] for t in info["thumbnails"]] == [120, 480, 1280]
+    assert info["thumbnail_url"] == "https://i.ytimg.com/vi/abc123/maxres.jpg"
+
+
+def test_missing_pieces_are_none_and_no_player_response_is_empty():
+    info = extract_watch_page(page(player={"videoDetails": {"videoId": "x", "likeCount": 5}}, initial_data=None))
+    assert info["video_id"] == "x" and info["likes"] is None and info["thumbnail_url"] is None
+    assert extract_watch_page(page(initial_data={"likeCount": "1,024"}))["likes"] == 1024
+    assert extract_watch_page("<html>consent page</html>") == {}
+    assert extract_watch_page("var ytInitialPlayerResponse = {broken") == {}